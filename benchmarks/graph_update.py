@@ -0,0 +1,104 @@
+"""
+Checks of the incremental knowledge graph updater against full rebuilds.
+
+Usage:
+    python -m benchmarks.graph_update [--papers N] [--researchers N]
+
+Feeds synthetic papers and profiles through GraphUpdater and checks that:
+
+- an applied change set answers queries like KnowledgeGraph.from_records over the same records
+- a changed record moves its edges, and the result still matches a rebuild
+- reopening the directory while changes are pending in the delta restores the same graph
+- reopening after a compaction restores the same graph
+
+Prints one line per check and exits with status 1 if any of them fails.
+"""
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+
+from xavier_mind.knowledge_integration.data_graph import GraphUpdater, KnowledgeGraph
+
+
+def make_records(papers, researchers, seed=0):
+    rng = random.Random(seed)
+    names = [f"Researcher {index}" for index in range(researchers)]
+    paper_records = [{"doi": f"10.1000/{index}", "title": f"Paper {index}",
+                      "authors": rng.sample(names, rng.randint(1, 4))} for index in range(papers)]
+    profiles = [{"name": name, "affiliation": f"University {rng.randrange(20)}",
+                 "research_areas": rng.sample(["Cosmology", "Optics", "Topology", "Genomics"], 2)}
+                for name in names]
+    return paper_records, profiles
+
+
+def snapshot(graph, names):
+    # What the queries answer for every researcher, comparable between two graphs
+    return {name: (sorted(graph.papers_of(name)), sorted(graph.coauthors(name))) for name in names}
+
+
+def check_apply(updater, papers, profiles, names):
+    report = updater.apply(papers=papers, profiles=profiles)
+    expected = snapshot(KnowledgeGraph.from_records(papers, profiles), names)
+    assert snapshot(updater.graph, names) == expected, "updated graph differs from a rebuild"
+    return f"{report['added']} records, {report['edges_added']} edges"
+
+
+def check_change(updater, papers, profiles, names):
+    papers[0] = {**papers[0], "authors": names[-2:]}
+    report = updater.apply(papers=papers[:1])
+    expected = snapshot(KnowledgeGraph.from_records(papers, profiles), names)
+    assert report["changed"] == 1, f"{report['changed']} records changed"
+    assert snapshot(updater.graph, names) == expected, "updated graph differs from a rebuild"
+    return f"{report['edges_added']} edges added, {report['edges_removed']} removed"
+
+
+def check_reopen(directory, updater, names):
+    pending = updater.graph.delta_size()
+    assert pending, "nothing pending in the delta"
+    reopened = GraphUpdater(directory)
+    assert snapshot(reopened.graph, names) == snapshot(updater.graph, names), "reopened graph differs"
+    return f"{pending} pending edge changes restored"
+
+
+def check_reopen_compacted(directory, updater, names):
+    updater.compact()
+    reopened = GraphUpdater(directory)
+    assert not reopened.graph.delta_size(), "delta left after compaction"
+    assert snapshot(reopened.graph, names) == snapshot(updater.graph, names), "reopened graph differs"
+    return f"{sum(reopened.graph.stats()['edges'].values())} edges in the base arrays"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--papers", type=int, default=2000, help="Papers in the synthetic set")
+    parser.add_argument("--researchers", type=int, default=500, help="Researchers in the synthetic set")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="graph-update-")
+    papers, profiles = make_records(args.papers, args.researchers)
+    names = [profile["name"] for profile in profiles]
+    updater = GraphUpdater(directory)
+    failures = 0
+    checks = [
+        ("apply", lambda: check_apply(updater, papers, profiles, names)),
+        ("change", lambda: check_change(updater, papers, profiles, names)),
+        ("reopen", lambda: check_reopen(directory, updater, names)),
+        ("reopen compacted", lambda: check_reopen_compacted(directory, updater, names)),
+    ]
+    try:
+        for name, check in checks:
+            try:
+                print(f"{name:<17} ok      {check()}")
+            except AssertionError as e:
+                failures += 1
+                print(f"{name:<17} FAILED  {e}")
+    finally:
+        shutil.rmtree(directory)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
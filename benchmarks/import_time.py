@@ -0,0 +1,77 @@
+"""
+Cold import time of the Telepath modules and the command line.
+
+Usage:
+    python -m benchmarks.import_time [--repeat N] [--no-budget] [MODULE ...]
+
+Every module is imported in a fresh interpreter, so nothing is cached between runs,
+and the best of N runs is reported with the interpreter's own start-up subtracted.
+The default modules have a budget in milliseconds; the exit status is 1 when any of
+them goes over it, so the benchmark can guard start-up time in CI. Heavy dependencies
+(pyarrow, pandas, lxml/parsel, requests) must only be imported where they are used.
+"""
+import argparse
+import subprocess
+import sys
+
+# Module -> import budget in milliseconds on top of a bare interpreter
+BUDGETS = {
+    "xavier_telepath.cli": 25,
+    "xavier_telepath.storage.data_storage": 60,
+    "xavier_telepath.data_collectors.api_integrations": 80,
+    "xavier_telepath.scrapers.arxiv": 120,
+    "xavier_telepath.scrapers.scopus": 120,
+    "xavier_telepath.scrapers.google_scholar": 120,
+}
+
+# Modules that must not be loaded by a plain import of the CLI
+HEAVY = ("pyarrow", "pandas", "lxml", "parsel", "requests", "numpy")
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+print(" ".join(sorted(name for name in {heavy!r} if name in sys.modules)))
+"""
+
+
+def measure(module, repeat):
+    best = float("inf")
+    loaded = []
+    for _ in range(repeat):
+        statement = f"import {module}" if module else "pass"
+        output = subprocess.run([sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY)],
+                                capture_output=True, text=True, check=True).stdout.splitlines()
+        best = min(best, float(output[0]))
+        loaded = output[1].split() if len(output) > 1 else []
+    return best, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", help="Modules to import (default: the budgeted modules)")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--no-budget", action="store_true", help="Report only, never fail")
+    args = parser.parse_args(argv)
+
+    baseline, _ = measure(None, args.repeat)
+    over = []
+    print(f"{'module':<50} {'ms':>8} {'budget':>7}  heavy modules loaded")
+    for module in args.modules or BUDGETS:
+        seconds, loaded = measure(module, args.repeat)
+        milliseconds = (seconds - baseline) * 1e3
+        budget = BUDGETS.get(module)
+        failed = budget is not None and milliseconds > budget
+        if module == "xavier_telepath.cli" and loaded:
+            failed = True
+        if failed:
+            over.append(module)
+        print(f"{module:<50} {milliseconds:>8.1f} {budget if budget is not None else '-':>7}  "
+              f"{' '.join(loaded) or '-'}{'  OVER' if failed else ''}")
+    if over and not args.no_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
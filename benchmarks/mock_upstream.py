@@ -0,0 +1,331 @@
+"""
+Local stand-in for the arXiv, Scopus and Google Scholar endpoints.
+
+Usage:
+    python -m benchmarks.mock_upstream [--port PORT] [--latency MS] [--jitter MS] [--error-rate P]
+                                       [--throttle-rate P] [--retry-after SECONDS] [--fixtures DIR]
+    python -m benchmarks.mock_upstream record [--kind KIND ...] [--fixtures DIR]
+
+The server answers every request with a recorded response from benchmarks/fixtures/.
+It adds configurable latency and fails a configurable share of requests. Failures are
+500 errors, or throttling: 429 responses with an optional Retry-After header, or, for
+Scholar, a CAPTCHA page served with status 200 as Scholar itself does. Point the
+scrapers at it with MockUpstream.point.
+
+/oai2 stands in for arXiv's OAI-PMH interface. It serves ListRecords pages over a
+synthetic set of records with one datestamp per record (oai_per_day records a day,
+ending today), filtered by from/until and paged through resumption tokens.
+
+"record" replaces the fixtures with the latest real responses of each parser kind from
+the raw response archive ($XAVIER_DATA_DIR/raw), so benchmarks can run on recorded
+upstream pages instead of the hand-written ones.
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Parser kind of the raw archive -> (fixture file, content type)
+KINDS = {
+    "arxiv.atom": ("arxiv/query.xml", "application/atom+xml; charset=UTF-8"),
+    "scopus.articles": ("scopus/search_articles.json", "application/json;charset=UTF-8"),
+    "scopus.people": ("scopus/search_author.json", "application/json;charset=UTF-8"),
+    "scholar.articles": ("scholar/search_articles.html", "text/html; charset=UTF-8"),
+    "scholar.authors": ("scholar/search_authors.html", "text/html; charset=UTF-8"),
+    "scholar.profile": ("scholar/profile.html", "text/html; charset=UTF-8"),
+}
+
+OAI_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">\n'
+              '<responseDate>{now}</responseDate>\n<request verb="ListRecords">http://export.arxiv.org/oai2</request>\n')
+
+OAI_RECORD = """<record><header><identifier>oai:arXiv.org:{id}</identifier><datestamp>{datestamp}</datestamp>
+<setSpec>physics:hep-th</setSpec></header><metadata>
+<arXiv xmlns="http://arxiv.org/OAI/arXiv/"><id>{id}</id><created>{datestamp}</created>
+<authors><author><keyname>Rovelli</keyname><forenames>Carlo</forenames></author>
+<author><keyname>Collaboration</keyname></author></authors>
+<title>Synthetic record {index} on {topic}</title><categories>hep-th gr-qc</categories><doi>10.1103/PhysRevD.{index}</doi>
+<abstract>{abstract}</abstract></arXiv></metadata></record>
+"""
+
+CAPTCHA_PAGE = (b"<!doctype html><html><body><div id=\"gs_captcha_ccl\">Please show you're not a robot</div>"
+                b"<p>Our systems have detected unusual traffic from your computer network.</p></body></html>")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that stop reading mid-body (an interrupted harvest) are expected, not errors
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def kind_of(path, query):
+    # Route a request to the parser kind whose fixture answers it
+    if path == "/api/query":
+        return "arxiv.atom"
+    if path == "/oai2":
+        return "arxiv.oai"
+    if path == "/content/search/scopus":
+        return "scopus.articles"
+    if path == "/content/search/author":
+        return "scopus.people"
+    if path == "/scholar":
+        return "scholar.articles"
+    if path == "/citations":
+        return "scholar.authors" if query.get("view_op") == ["search_authors"] else "scholar.profile"
+    return None
+
+
+class MockUpstream:
+    """
+    Threaded HTTP/1.1 server (with keep-alive) replaying fixtures under injected faults.
+    """
+
+    def __init__(self, fixtures=FIXTURES, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0,
+                 retry_after=None, seed=0, host="127.0.0.1", port=0, oai_records=1000, oai_page_size=100,
+                 oai_per_day=50):
+        """
+        Parameters:
+        - fixtures: Directory laid out as KINDS (default: benchmarks/fixtures)
+        - latency: Seconds added to every response
+        - jitter: Extra seconds drawn uniformly from [0, jitter] per response
+        - error_rate: Share of requests answered with a 500 error
+        - throttle_rate: Share of requests throttled (429, or a CAPTCHA page for Scholar)
+        - retry_after: Retry-After seconds sent with 429 responses (None: no header)
+        - seed: Seed of the fault and jitter draws
+        - host, port: Address to listen on (port 0 picks a free port)
+        - oai_records: Records in the synthetic OAI-PMH set
+        - oai_page_size: Records per ListRecords page
+        - oai_per_day: Records sharing a datestamp (the newest ones are dated today)
+        """
+        self.bodies = {}
+        for kind, (name, content_type) in KINDS.items():
+            with open(os.path.join(fixtures, name), "rb") as file:
+                self.bodies[kind] = (file.read(), content_type)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.oai_records = oai_records
+        self.oai_page_size = oai_page_size
+        self.oai_per_day = oai_per_day
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._server = _Server((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def point(self, arxiv=None, scopus=None, scholar=None, oai=None):
+        """
+        Redirect scraper instances (ArxivAPI, ScopusAPI, GoogleScholar, ArxivOAIHarvester) to this server.
+        """
+        if arxiv is not None:
+            arxiv.BASE_URL = f"{self.url}/api/query"
+        if oai is not None:
+            oai.BASE_URL = f"{self.url}/oai2"
+        if scopus is not None:
+            scopus.BASE_URL = f"{self.url}/content/"
+        if scholar is not None:
+            scholar.base_url_article = f"{self.url}/scholar"
+            scholar.base_url_citations = f"{self.url}/citations"
+
+    def stats(self):
+        """
+        Report the responses served per kind and outcome ("ok", "throttled", "error").
+        """
+        with self._lock:
+            return {kind: dict(counts) for kind, counts in self._counts.items()}
+
+    def oai_datestamp(self, index):
+        """
+        Return the datestamp (YYYY-MM-DD) of synthetic OAI record index.
+        """
+        days = (self.oai_records - 1 - index) // self.oai_per_day
+        return (datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=days)).isoformat()
+
+    def oai_page(self, query):
+        """
+        Render the ListRecords page answering an OAI-PMH query (dict of lists, as parse_qs gives).
+
+        Resumption tokens are "<from>|<until>|<offset>", so they carry the whole window as arXiv's do.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        parts = [OAI_HEADER.format(now=now)]
+        token = query.get("resumptionToken", [None])[0]
+        if token is not None:
+            try:
+                from_date, until_date, offset = token.split("|")
+                offset = int(offset)
+            except ValueError:
+                return (parts[0] + '<error code="badResumptionToken">Unknown token</error>\n</OAI-PMH>\n').encode()
+        else:
+            from_date, until_date, offset = query.get("from", [""])[0], query.get("until", [""])[0], 0
+        matching = [index for index in range(self.oai_records)
+                    if (not from_date or self.oai_datestamp(index) >= from_date)
+                    and (not until_date or self.oai_datestamp(index) <= until_date)]
+        if not matching:
+            return (parts[0] + '<error code="noRecordsMatch">No records</error>\n</OAI-PMH>\n').encode()
+        parts.append("<ListRecords>\n")
+        for index in matching[offset:offset + self.oai_page_size]:
+            parts.append(OAI_RECORD.format(id=f"2401.{index:05d}", index=index, datestamp=self.oai_datestamp(index),
+                                           topic=escape("spin foams & loops"),
+                                           abstract="We study the synthetic amplitude. " * 8))
+        following = offset + self.oai_page_size
+        if token is not None or following < len(matching):
+            # The last page of a resumed list carries an empty token, as the protocol asks
+            next_token = f"{from_date}|{until_date}|{following}" if following < len(matching) else ""
+            parts.append(f'<resumptionToken cursor="{offset}" completeListSize="{len(matching)}">'
+                         f'{next_token}</resumptionToken>\n')
+        parts.append("</ListRecords>\n</OAI-PMH>\n")
+        return "".join(parts).encode()
+
+    def _draw(self):
+        # One locked draw per request keeps a seeded run's fault sequence stable
+        with self._lock:
+            roll = self._random.random()
+            delay = self.latency + self._random.uniform(0, self.jitter) if self.jitter else self.latency
+        if roll < self.throttle_rate:
+            return "throttled", delay
+        if roll < self.throttle_rate + self.error_rate:
+            return "error", delay
+        return "ok", delay
+
+    def _count(self, kind, outcome):
+        with self._lock:
+            counts = self._counts.setdefault(kind, {"ok": 0, "throttled": 0, "error": 0})
+            counts[outcome] += 1
+
+    def _handler(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body leave in one segment; written separately they stall on delayed ACKs
+            wbufsize = 1 << 16
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                kind = kind_of(url.path, parse_qs(url.query))
+                if kind is None:
+                    self._reply(404, b"Not found", "text/plain")
+                    return
+                outcome, delay = upstream._draw()
+                if delay:
+                    time.sleep(delay)
+                upstream._count(kind, outcome)
+                if outcome == "throttled" and kind.startswith("scholar."):
+                    self._reply(200, CAPTCHA_PAGE, "text/html; charset=UTF-8")
+                elif outcome == "throttled":
+                    headers = {"Retry-After": str(upstream.retry_after)} if upstream.retry_after is not None else {}
+                    self._reply(429, b'{"error": "Too Many Requests"}', "application/json", headers)
+                elif outcome == "error":
+                    self._reply(500, b'{"error": "Internal Server Error"}', "application/json")
+                elif kind == "arxiv.oai":
+                    self._reply(200, upstream.oai_page(parse_qs(url.query)), "text/xml")
+                else:
+                    self._reply(200, *upstream.bodies[kind])
+
+            def _reply(self, status, body, content_type, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def record(kinds=None, fixtures=FIXTURES):
+    """
+    Copy the latest archived body of each parser kind over its fixture.
+
+    Returns:
+    - A dict of kind -> fixture path, for the kinds found in the archive
+    """
+    from xavier_telepath.storage.data_storage import get_default_archive
+
+    archive = get_default_archive()
+    written = {}
+    for kind in kinds or KINDS:
+        entries = archive.entries(kinds=[kind])
+        if not entries:
+            continue
+        path = os.path.join(fixtures, KINDS[kind][0])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(archive.read(entries[-1]["digest"]))
+        written[kind] = path
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", nargs="?", choices=["serve", "record"], default="serve")
+    parser.add_argument("--fixtures", default=FIXTURES, help="Fixture directory")
+    parser.add_argument("--kind", action="append", choices=sorted(KINDS), help="Kind to record (repeatable)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Milliseconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random milliseconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 500 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of throttled responses")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds of 429 responses")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        written = record(args.kind, args.fixtures)
+        for kind in args.kind or KINDS:
+            print(f"{kind:<18} {written.get(kind, 'not in the archive')}")
+        return
+
+    upstream = MockUpstream(args.fixtures, args.latency / 1e3, args.jitter / 1e3, args.error_rate,
+                            args.throttle_rate, args.retry_after, host=args.host, port=args.port)
+    print(f"Mock upstream on {upstream.url} (arXiv {upstream.url}/api/query, Scopus {upstream.url}/content/, "
+          f"Scholar {upstream.url}/scholar and /citations, OAI-PMH {upstream.url}/oai2)")
+    try:
+        upstream._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        upstream._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Checks of the arXiv OAI-PMH harvester against the local stand-in server.
+
+Usage:
+    python -m benchmarks.oai_harvest [--records N] [--page-size N] [--large-page N]
+
+Runs ArxivOAIHarvester against MockUpstream's /oai2 endpoint and checks that:
+
+- a harvest follows the resumption tokens through every page, under injected 500s and 429s
+- an interrupted harvest resumes from its checkpoint and repeats at most one page
+- the next run only asks for records changed since the day the last harvest ran
+- parsing a single ListRecords page keeps memory flat as the page grows
+
+Prints one line per check and exits with status 1 if any of them fails.
+"""
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+from benchmarks.mock_upstream import MockUpstream
+from xavier_telepath.data_collectors.api_integrations import RateLimitScheduler, SourceClient
+from xavier_telepath.scrapers.arxiv import ArxivOAIHarvester
+
+UNLIMITED = {"rate": 100000, "burst": 1000}
+
+
+def make_harvester(upstream, state_path):
+    scheduler = RateLimitScheduler(limits={"arxiv": UNLIMITED}, backoff_base=0.01, backoff_max=0.05)
+    harvester = ArxivOAIHarvester(state_path, client=SourceClient("arxiv", scheduler=scheduler, cache=False,
+                                                                  archive=False))
+    upstream.point(oai=harvester)
+    return harvester
+
+
+def check_full_harvest(upstream, directory):
+    harvester = make_harvester(upstream, os.path.join(directory, "full.json"))
+    ids = [record["id"] for record in harvester.harvest("hep-th")]
+    expected = {f"2401.{index:05d}" for index in range(upstream.oai_records)}
+    assert len(ids) == len(expected) and set(ids) == expected, f"{len(ids)} records, {len(set(ids))} distinct"
+    return f"{len(ids)} records over {-(-upstream.oai_records // upstream.oai_page_size)} pages"
+
+
+def check_resume(upstream, directory):
+    state_path = os.path.join(directory, "resume.json")
+    stop_after = upstream.oai_page_size * 2 + upstream.oai_page_size // 2
+    first = []
+    for record in make_harvester(upstream, state_path).harvest("hep-th"):
+        first.append(record["id"])
+        if len(first) == stop_after:
+            break  # Interrupted in the middle of the third page
+    second = [record["id"] for record in make_harvester(upstream, state_path).harvest("hep-th")]
+    repeated = len(first) + len(second) - upstream.oai_records
+    assert set(first) | set(second) == {f"2401.{index:05d}" for index in range(upstream.oai_records)}, "records lost"
+    assert 0 <= repeated <= upstream.oai_page_size, f"{repeated} records repeated"
+    return f"resumed after {len(first)} records, {repeated} repeated"
+
+
+def check_incremental(upstream, directory):
+    state_path = os.path.join(directory, "incremental.json")
+    list(make_harvester(upstream, state_path).harvest("hep-th"))
+    delta = list(make_harvester(upstream, state_path).harvest("hep-th"))
+    today = upstream.oai_datestamp(upstream.oai_records - 1)
+    expected = sum(upstream.oai_datestamp(index) >= today for index in range(upstream.oai_records))
+    assert len(delta) == expected, f"{len(delta)} records in the delta, {expected} expected"
+    assert all(record["datestamp"] >= today for record in delta), "delta holds records older than the last run"
+    return f"second run fetched {len(delta)} records dated {today}"
+
+
+def parse_peak(upstream, records):
+    # Peak traced memory while parsing one page of this many records (the body itself excluded)
+    upstream.oai_page_size = records
+    body = io.BytesIO(upstream.oai_page({}))
+    harvester = ArxivOAIHarvester()
+    tracemalloc.start()
+    count = sum(1 for _ in harvester.iter_parse_records(body))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert count == records, f"{count} of {records} records parsed"
+    return peak
+
+
+def check_flat_memory(upstream, large_page):
+    page_size = upstream.oai_page_size
+    upstream.oai_records = large_page
+    try:
+        small, large = parse_peak(upstream, large_page // 20), parse_peak(upstream, large_page)
+    finally:
+        upstream.oai_page_size = page_size
+    assert large < 2 * small, f"peak {large / 2 ** 20:.1f} MiB for {large_page} records vs {small / 2 ** 20:.1f} MiB"
+    return f"peak {small / 2 ** 10:.0f} KiB for {large_page // 20} records, {large / 2 ** 10:.0f} KiB for {large_page}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000, help="Records in the synthetic set")
+    parser.add_argument("--page-size", type=int, default=100, help="Records per ListRecords page")
+    parser.add_argument("--large-page", type=int, default=20000, help="Records in the page of the memory check")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="oai-harvest-")
+    failures = 0
+    checks = [
+        ("full harvest", lambda upstream: check_full_harvest(upstream, directory)),
+        ("resume", lambda upstream: check_resume(upstream, directory)),
+        ("incremental", lambda upstream: check_incremental(upstream, directory)),
+        ("flat memory", lambda upstream: check_flat_memory(upstream, args.large_page)),
+    ]
+    try:
+        for name, check in checks:
+            # Faults only where the harvest is expected to ride them out through retries
+            faults = dict(error_rate=0.1, throttle_rate=0.1, retry_after=0.01) if name == "full harvest" else {}
+            with MockUpstream(oai_records=args.records, oai_page_size=args.page_size, **faults) as upstream:
+                try:
+                    print(f"{name:<14} ok      {check(upstream)}")
+                except AssertionError as e:
+                    failures += 1
+                    print(f"{name:<14} FAILED  {e}")
+    finally:
+        shutil.rmtree(directory)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+ORCID dump ingestion over a synthetic public data file.
+
+Usage:
+    python -m benchmarks.orcid_ingest [--records N] [--workers N] [--chunk-size N] [--keep DIR]
+
+Writes a summaries archive laid out like ORCID's yearly public data file
+(<dump>/<last 3 chars of the iD>/<iD>.xml, schema v3.0) with N synthetic records. A
+few of them are deactivated records (error documents) and one is malformed XML. The
+archive is ingested with scrapers.orcid.ingest_dump and the lookup table is checked
+against the generated records: names, current employers and DOI -> author resolution.
+Reports records/s and exits with status 1 if any check fails.
+"""
+import argparse
+import io
+import os
+import random
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+from xavier_telepath.scrapers.orcid import OrcidLookup, ingest_dump
+
+GIVEN = ["Carlo", "Lee", "Abhay", "Laurent", "Renate", "Daniele", "Bianca", "Jerzy", "Kristina", "Hal", "Maïté"]
+FAMILY = ["Rovelli", "Smolin", "Ashtekar", "Freidel", "Loll", "Oriti", "Dittrich", "Lewandowski", "Giesel", "Haggard"]
+ORGANIZATIONS = [
+    ("Perimeter Institute for Theoretical Physics", "Waterloo", "CA", "ROR", "https://ror.org/013m0ej23"),
+    ("Aix-Marseille Université", "Marseille", "FR", "ROR", "https://ror.org/035xkbk20"),
+    ("Pennsylvania State University", "University Park", "US", "RINGGOLD", "8082"),
+    ("Radboud University Nijmegen", "Nijmegen", "NL", "ROR", "https://ror.org/016xsfp80"),
+    ("Max Planck Institute for Gravitational Physics", "Potsdam", "DE", "ROR", "https://ror.org/03sry2h30"),
+]
+TOPICS = ["Loop quantum gravity", "Spin foams", "Black hole entropy", "Causal dynamical triangulations",
+          "Group field theory", "Quantum cosmology"]
+
+HEADER = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<record:record path="/{orcid}"
+        xmlns:common="http://www.orcid.org/ns/common"
+        xmlns:record="http://www.orcid.org/ns/record"
+        xmlns:person="http://www.orcid.org/ns/person"
+        xmlns:personal-details="http://www.orcid.org/ns/personal-details"
+        xmlns:other-name="http://www.orcid.org/ns/other-name"
+        xmlns:keyword="http://www.orcid.org/ns/keyword"
+        xmlns:history="http://www.orcid.org/ns/history"
+        xmlns:activities="http://www.orcid.org/ns/activities"
+        xmlns:education="http://www.orcid.org/ns/education"
+        xmlns:employment="http://www.orcid.org/ns/employment"
+        xmlns:funding="http://www.orcid.org/ns/funding"
+        xmlns:work="http://www.orcid.org/ns/work">
+    <common:orcid-identifier>
+        <common:uri>https://orcid.org/{orcid}</common:uri>
+        <common:path>{orcid}</common:path>
+        <common:host>orcid.org</common:host>
+    </common:orcid-identifier>
+    <history:history>
+        <history:creation-method>Member-referred</history:creation-method>
+        <history:submission-date>2015-03-02T10:12:09.102Z</history:submission-date>
+        <common:last-modified-date>{modified}</common:last-modified-date>
+        <history:claimed>true</history:claimed>
+        <history:verified-email>true</history:verified-email>
+        <history:verified-primary-email>true</history:verified-primary-email>
+    </history:history>
+    <person:person path="/{orcid}/person">
+        <person:name visibility="public" path="{orcid}">
+            <personal-details:given-names>{given}</personal-details:given-names>
+            <personal-details:family-name>{family}</personal-details:family-name>
+            <personal-details:credit-name>{given_initial}. {family}</personal-details:credit-name>
+        </person:name>
+        <other-name:other-names path="/{orcid}/other-names">
+            <other-name:other-name visibility="public" put-code="1{serial}" display-index="1">
+                <other-name:content>{family}, {given_initial}.</other-name:content>
+            </other-name:other-name>
+        </other-name:other-names>
+        <keyword:keywords path="/{orcid}/keywords">{keywords}
+        </keyword:keywords>
+    </person:person>
+    <activities:activities-summary path="/{orcid}/activities">
+        <activities:educations path="/{orcid}/educations">
+            <activities:affiliation-group>
+                <education:education-summary put-code="2{serial}" display-index="0" visibility="public">
+                    <common:role-title>PhD</common:role-title>
+                    <common:organization>
+                        <common:name>University of Synthetic Data</common:name>
+                        <common:address><common:city>Nowhere</common:city><common:country>GB</common:country></common:address>
+                    </common:organization>
+                </education:education-summary>
+            </activities:affiliation-group>
+        </activities:educations>
+        <activities:employments path="/{orcid}/employments">{employments}
+        </activities:employments>
+        <activities:fundings path="/{orcid}/fundings">
+            <activities:group>
+                <funding:funding-summary put-code="3{serial}" visibility="public">
+                    <funding:title><common:title>Grant on {topic}</common:title></funding:title>
+                    <funding:type>grant</funding:type>
+                </funding:funding-summary>
+            </activities:group>
+        </activities:fundings>
+        <activities:works path="/{orcid}/works">{works}
+        </activities:works>
+    </activities:activities-summary>
+</record:record>
+"""
+
+KEYWORD = """
+            <keyword:keyword visibility="public" put-code="4{serial}{index}" display-index="{index}">
+                <keyword:content>{keyword}</keyword:content>
+            </keyword:keyword>"""
+
+EMPLOYMENT = """
+            <activities:affiliation-group>
+                <employment:employment-summary put-code="5{serial}{index}" display-index="{index}" visibility="public">
+                    <common:department-name>Department of Physics</common:department-name>
+                    <common:role-title>{role}</common:role-title>
+                    <common:start-date><common:year>{start}</common:year><common:month>09</common:month></common:start-date>{end}
+                    <common:organization>
+                        <common:name>{name}</common:name>
+                        <common:address><common:city>{city}</common:city><common:country>{country}</common:country></common:address>
+                        <common:disambiguated-organization>
+                            <common:disambiguated-organization-identifier>{identifier}</common:disambiguated-organization-identifier>
+                            <common:disambiguation-source>{source}</common:disambiguation-source>
+                        </common:disambiguated-organization>
+                    </common:organization>
+                </employment:employment-summary>
+            </activities:affiliation-group>"""
+
+WORK = """
+            <activities:group>
+                <common:external-ids>
+                    <common:external-id><common:external-id-type>doi</common:external-id-type><common:external-id-value>{doi}</common:external-id-value><common:external-id-relationship>self</common:external-id-relationship></common:external-id>
+                </common:external-ids>
+                <work:work-summary put-code="6{serial}{index}" display-index="1" visibility="public">
+                    <work:title><common:title>{title}</common:title></work:title>
+                    <common:external-ids>
+                        <common:external-id><common:external-id-type>doi</common:external-id-type><common:external-id-value>{doi}</common:external-id-value><common:external-id-relationship>self</common:external-id-relationship></common:external-id>
+                        <common:external-id><common:external-id-type>arxiv</common:external-id-type><common:external-id-value>arXiv:{arxiv}v2</common:external-id-value><common:external-id-relationship>self</common:external-id-relationship></common:external-id>
+                        <common:external-id><common:external-id-type>issn</common:external-id-type><common:external-id-value>2470-0010</common:external-id-value><common:external-id-relationship>part-of</common:external-id-relationship></common:external-id>
+                    </common:external-ids>
+                    <work:type>journal-article</work:type>
+                    <common:publication-date><common:year>{year}</common:year></common:publication-date>
+                    <work:journal-title>Physical Review D</work:journal-title>
+                </work:work-summary>
+            </activities:group>"""
+
+ERROR = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<error:error xmlns:error="http://www.orcid.org/ns/error">
+    <error:response-code>409</error:response-code>
+    <error:developer-message>409 Conflict: The ORCID record is deactivated.</error:developer-message>
+    <error:error-code>9044</error:error-code>
+</error:error>
+"""
+
+
+def orcid_checksum(base):
+    # ISO 7064 11,2 check character of the first 15 digits
+    total = 0
+    for digit in base:
+        total = (total + int(digit)) * 2
+    result = (12 - total % 11) % 11
+    return "X" if result == 10 else str(result)
+
+
+def make_orcid(serial):
+    digits = f"0000{serial + 2000000:011d}"
+    digits = digits[:15]
+    return "-".join([digits[0:4], digits[4:8], digits[8:12], digits[12:15] + orcid_checksum(digits)])
+
+
+def synthetic_record(serial, rng):
+    """
+    Return (orcid, XML text, expected values) for one synthetic record.
+    """
+    orcid = make_orcid(serial)
+    given, family = rng.choice(GIVEN), rng.choice(FAMILY)
+    jobs = sorted(rng.sample(ORGANIZATIONS, rng.randint(1, 3)), key=lambda _: rng.random())
+    employments = []
+    start = 2000 + rng.randint(0, 8)
+    for index, (name, city, country, source, identifier) in enumerate(jobs):
+        current = index == len(jobs) - 1
+        end = "" if current else f"<common:end-date><common:year>{start + 3}</common:year></common:end-date>"
+        employments.append(EMPLOYMENT.format(serial=serial, index=index, role="Professor" if current else "Postdoc",
+                                             start=start, end=end, name=escape(name), city=city, country=country,
+                                             identifier=identifier, source=source))
+        start += 3
+    works, dois = [], []
+    for index in range(rng.randint(0, 12)):
+        doi = f"10.1103/PhysRevD.{serial}.{index:04d}"
+        dois.append(doi.lower())
+        title = escape(f"{rng.choice(TOPICS)} & more {index}")
+        works.append(WORK.format(serial=serial, index=index, doi=doi, title=title,
+                                 arxiv=f"{1000 + serial % 9000}.{index:05d}", year=2005 + index))
+    keywords = [KEYWORD.format(serial=serial, index=index, keyword=topic)
+                for index, topic in enumerate(rng.sample(TOPICS, rng.randint(0, 3)))]
+    xml = HEADER.format(orcid=orcid, serial=serial, given=escape(given), family=escape(family), given_initial=given[0],
+                        modified=f"2024-0{1 + serial % 9}-15T08:00:00.000Z", keywords="".join(keywords),
+                        employments="".join(employments), works="".join(works), topic=rng.choice(TOPICS))
+    expected = {"name": f"{family}, {given}", "affiliation": jobs[-1][0], "dois": dois}
+    return orcid, xml, expected
+
+
+def write_synthetic_dump(path, records=1000, seed=0, deactivated=5, malformed=1):
+    """
+    Write a synthetic ORCID summaries archive.
+
+    Returns:
+    - A dict of ORCID iD -> expected {"name", "affiliation", "dois"} for the valid records
+    """
+    rng = random.Random(seed)
+    expected = {}
+    root = "ORCID_2024_10_summaries"
+    with tarfile.open(path, "w:gz") as archive:
+        def add(name, text):
+            data = text.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = 1700000000
+            archive.addfile(info, io.BytesIO(data))
+
+        for serial in range(records):
+            orcid, xml, values = synthetic_record(serial, rng)
+            if serial < deactivated:
+                xml = ERROR
+            elif serial < deactivated + malformed:
+                xml = xml[:len(xml) // 2]
+            else:
+                expected[orcid] = values
+            add(f"{root}/{orcid[-3:]}/{orcid}.xml", xml)
+    return expected
+
+
+def check(lookup, expected, sample=200):
+    failures = []
+    for orcid in list(expected)[:sample]:
+        values = expected[orcid]
+        found = lookup.get_many([orcid]).get(orcid)
+        if not found or found["name"] != values["name"] or found["affiliation"] != values["affiliation"]:
+            failures.append(f"{orcid}: expected {values['name']!r} at {values['affiliation']!r}, got {found}")
+        for doi in values["dois"][:2]:
+            if orcid not in lookup.authors_of("doi", f"https://doi.org/{doi.upper()}"):
+                failures.append(f"{orcid}: not resolved from DOI {doi}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000, help="Records in the synthetic dump")
+    parser.add_argument("--workers", type=int, help="Parser processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Records per worker task")
+    parser.add_argument("--keep", help="Write the dump and lookup table to this directory and keep them")
+    args = parser.parse_args(argv)
+
+    directory = args.keep or tempfile.mkdtemp(prefix="orcid-bench-")
+    os.makedirs(directory, exist_ok=True)
+    try:
+        dump = os.path.join(directory, "ORCID_2024_10_summaries.tar.gz")
+        start = time.perf_counter()
+        expected = write_synthetic_dump(dump, args.records)
+        print(f"Wrote {args.records} records ({os.path.getsize(dump) / 2 ** 20:.1f} MiB) in "
+              f"{time.perf_counter() - start:.1f} s")
+
+        lookup = OrcidLookup(os.path.join(directory, "orcid.sqlite"))
+        report = ingest_dump(dump, lookup, workers=args.workers, chunk_size=args.chunk_size, progress_every=0)
+        print(f"Ingested {report['profiles']} profiles from {report['files']} files ({report['errors']} errors) in "
+              f"{report['seconds']:.2f} s: {report['files'] / report['seconds']:.0f} records/s")
+        failures = check(lookup, expected)
+        if len(lookup) != len(expected):
+            failures.append(f"{len(lookup)} profiles stored, {len(expected)} expected")
+        lookup.close()
+    finally:
+        if not args.keep:
+            shutil.rmtree(directory)
+    for failure in failures[:20]:
+        print(failure)
+    print("OK" if not failures else f"{len(failures)} checks failed")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Parse cost of the Google Scholar extractors over saved HTML pages.
+
+Usage:
+    python -m benchmarks.scholar_parse [--repeat N] [PAGE.html | DIRECTORY ...]
+
+Without arguments the pages in benchmarks/fixtures/scholar/ are used. These are small
+hand-written pages with Scholar's markup, so point the benchmark at archived pages (or
+record them with `python -m benchmarks.mock_upstream record`) for representative numbers.
+Each page is parsed (HTML -> tree) and extracted with the extractor matching its kind,
+and the mean time per page is reported separately for both steps.
+"""
+import argparse
+import glob
+import os
+import time
+
+from parsel import Selector
+
+from xavier_telepath.scrapers.google_scholar import ARTICLE_RESULTS, PROFILE_CARDS, PROFILE_PAGE
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "scholar")
+
+
+def extractor_for(html):
+    # Pick the extractor from the markup so archived pages need no naming convention
+    if "gs_ai_chpr" in html:
+        return "authors", PROFILE_CARDS
+    if "gs_ri" in html:
+        return "articles", ARTICLE_RESULTS
+    return "profile", PROFILE_PAGE
+
+
+def collect(paths):
+    pages = []
+    for path in paths or [FIXTURES]:
+        if os.path.isdir(path):
+            pages.extend(sorted(glob.glob(os.path.join(path, "*.html"))))
+        else:
+            pages.append(path)
+    return pages
+
+
+def bench(path, repeat):
+    with open(path, encoding="utf-8") as file:
+        html = file.read()
+    kind, extractor = extractor_for(html)
+    parse = extract = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        select = Selector(html)
+        parsed = time.perf_counter()
+        items = extractor.extract(select)
+        parse += parsed - start
+        extract += time.perf_counter() - parsed
+    return kind, len(items), parse / repeat, extract / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", help="HTML pages or directories of pages")
+    parser.add_argument("--repeat", type=int, default=200, help="Runs per page")
+    args = parser.parse_args(argv)
+
+    print(f"{'page':<32} {'kind':<9} {'items':>5} {'parse ms':>9} {'extract ms':>11}")
+    for path in collect(args.paths):
+        kind, items, parse, extract = bench(path, args.repeat)
+        print(f"{os.path.basename(path):<32} {kind:<9} {items:>5} {parse * 1e3:>9.3f} {extract * 1e3:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
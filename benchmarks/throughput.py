@@ -0,0 +1,290 @@
+"""
+End-to-end scraper throughput against the local mock upstream.
+
+Usage:
+    python -m benchmarks.throughput [--scenario NAME ...] [--concurrency 1,4,16] [--calls N]
+                                    [--latency MS] [--jitter MS] [--error-rate P] [--throttle-rate P]
+                                    [--retry-after SECONDS] [--label TEXT]
+    python -m benchmarks.throughput --list
+    python -m benchmarks.throughput --compare [RUN [RUN]]
+
+Each scenario calls one public scraper method (ArxivAPI.search, ScopusAPI.search_articles
+and every GoogleScholar.find* method) --calls times from a pool of --concurrency threads.
+The client stack is the real one (SourceClient, rate limiter, session pool) with caching
+and archiving off, pointed at benchmarks/mock_upstream.py. Every scenario and concurrency
+level runs in a fresh interpreter, so peak memory (max RSS) belongs to that run alone.
+
+Reported per run: records/s, calls/s, p50/p99 call latency, p99 request and parse latency
+(from xavier_telepath.metrics), retries, failed calls and peak memory. Results are saved
+as JSON under $XAVIER_DATA_DIR/benchmarks/; --compare prints the change between two saved
+runs (by default the last two).
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.mock_upstream import FIXTURES, MockUpstream
+
+# Scenario -> (source, call(scraper)); scrapers are built by make_scraper
+SCENARIOS = {
+    "arxiv.search": ("arxiv", lambda arxiv: arxiv.search("all", "quantum gravity")),
+    "scopus.search_articles": ("scopus", lambda scopus: scopus.search_articles("TITLE-ABS-KEY", "quantum gravity")),
+    "scholar.findProfessorByUniversity": ("scholar", lambda scholar: scholar.findProfessorByUniversity(
+        "physics", "Perimeter Institute", number_of_iterations=3)),
+    "scholar.findProfessorByField": ("scholar", lambda scholar: scholar.findProfessorByField(
+        "quantum_gravity", number_of_iterations=3)),
+    "scholar.findProfessorByName": ("scholar", lambda scholar: scholar.findProfessorByName("Carlo Rovelli")),
+    "scholar.findProfessorByID": ("scholar", lambda scholar: scholar.findProfessorByID("AbC0xyzAAAAJ")),
+    "scholar.findArticleByProfessorName": ("scholar", lambda scholar: scholar.findArticleByProfessorName(
+        "Carlo Rovelli", number_of_iterations=2)),
+    "scholar.findArticleByField": ("scholar", lambda scholar: scholar.findArticleByField(
+        "loop quantum gravity", number_of_iterations=2)),
+}
+
+# Rate limits high enough that the benchmark measures the pipeline, not the pacing
+UNLIMITED = {"rate": 100000, "burst": 1000}
+
+
+def results_dir():
+    from xavier_telepath.storage.data_storage import _data_dir
+
+    return os.path.join(_data_dir(), "benchmarks")
+
+
+def make_scraper(source, base_url, concurrency, backoff):
+    from xavier_telepath.data_collectors.api_integrations import RateLimitScheduler, SessionPool, SourceClient
+
+    scheduler = RateLimitScheduler(limits={source: UNLIMITED}, backoff_base=backoff, backoff_max=backoff * 8)
+    sessions = SessionPool(pool_maxsize=max(concurrency, 10))
+    options = dict(scheduler=scheduler, cache=False, archive=False, sessions=sessions)
+    if source == "arxiv":
+        from xavier_telepath.scrapers.arxiv import ArxivAPI
+        scraper = ArxivAPI(max_results=25, client=SourceClient("arxiv", **options))
+        scraper.BASE_URL = f"{base_url}/api/query"
+    elif source == "scopus":
+        from xavier_telepath.scrapers.scopus import ScopusAPI
+        scraper = ScopusAPI("benchmark-key", max_results=25,
+                            client=SourceClient("scopus", headers={"X-ELS-APIKey": "benchmark-key"}, **options))
+        scraper.BASE_URL = f"{base_url}/content/"
+    else:
+        from xavier_telepath.scrapers.google_scholar import GoogleScholar
+        scraper = GoogleScholar()
+        scraper.client = SourceClient("scholar", headers=scraper.headers, is_throttled=scraper._is_captcha, **options)
+        scraper.base_url_article = f"{base_url}/scholar"
+        scraper.base_url_citations = f"{base_url}/citations"
+    return scraper
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def run_child(scenario, base_url, concurrency, calls, backoff):
+    # Runs inside the fresh interpreter: drive one scenario and return its measurements
+    from xavier_telepath.metrics import get_default_metrics
+
+    source, call = SCENARIOS[scenario]
+    scraper = make_scraper(source, base_url, concurrency, backoff)
+    call(scraper)  # Warm-up: imports, connection set-up and lazily compiled extractors
+    metrics = get_default_metrics()
+    metrics.reset()
+
+    def timed(_):
+        start = time.perf_counter()
+        try:
+            result = call(scraper)
+        except Exception:
+            return time.perf_counter() - start, None
+        return time.perf_counter() - start, len(result) if isinstance(result, list) else int(bool(result))
+
+    # Scholar's crawl loop prints progress; keep it out of the measurements and the JSON output
+    with contextlib.redirect_stdout(io.StringIO()), \
+            concurrent.futures.ThreadPoolExecutor(concurrency) as pool:
+        start = time.perf_counter()
+        outcomes = list(pool.map(timed, range(calls)))
+        elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in outcomes]
+    records = sum(count for _, count in outcomes if count is not None)
+    snapshot = metrics.snapshot()
+
+    def metric(kind, name, field):
+        return snapshot[kind].get(name, {}).get(source, {}).get(field) if kind == "histograms" else \
+            snapshot[kind].get(name, {}).get(source, 0)
+
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "calls": calls,
+        "failed_calls": sum(count is None for _, count in outcomes),
+        "records": records,
+        "seconds": elapsed,
+        "records_per_second": records / elapsed,
+        "calls_per_second": calls / elapsed,
+        "latency_p50": percentile(latencies, 0.5),
+        "latency_p99": percentile(latencies, 0.99),
+        "request_p99": metric("histograms", "request_seconds", "p99"),
+        "parse_p50": metric("histograms", "parse_seconds", "p50"),
+        "parse_p99": metric("histograms", "parse_seconds", "p99"),
+        "requests": metric("counters", "requests_total", None),
+        "retries": metric("counters", "retries_total", None),
+        "throttled": metric("counters", "throttled_total", None),
+        "peak_memory_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scenarios, levels, calls, upstream_options, backoff, label=None):
+    """
+    Run every scenario at every concurrency level against a fresh mock upstream.
+
+    Returns:
+    - The run record: metadata and one result dict per scenario and level
+    """
+    results = []
+    with MockUpstream(**upstream_options) as upstream:
+        for scenario in scenarios:
+            for concurrency in levels:
+                command = [sys.executable, "-m", "benchmarks.throughput", "--child", scenario, "--base", upstream.url,
+                           "--concurrency", str(concurrency), "--calls", str(calls), "--backoff", str(backoff)]
+                output = subprocess.run(command, capture_output=True, text=True,
+                                        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+                if output.returncode:
+                    print(f"{scenario} x{concurrency} failed:\n{output.stderr}", file=sys.stderr)
+                    continue
+                result = json.loads(output.stdout.splitlines()[-1])
+                results.append(result)
+                print_result(result)
+        served = upstream.stats()
+    return {
+        "label": label,
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "options": {"calls": calls, "backoff": backoff, **upstream_options},
+        "served": served,
+        "results": results,
+    }
+
+
+HEADER = (f"{'scenario':<36} {'conc':>4} {'records/s':>10} {'calls/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'parse p99':>9} {'retries':>7} {'failed':>6} {'peak MB':>8}")
+
+
+def print_result(result):
+    if not getattr(print_result, "header", False):
+        print(HEADER)
+        print_result.header = True
+    parse_p99 = result["parse_p99"] * 1e3 if result["parse_p99"] is not None else float("nan")
+    print(f"{result['scenario']:<36} {result['concurrency']:>4} {result['records_per_second']:>10.1f} "
+          f"{result['calls_per_second']:>8.1f} {result['latency_p50'] * 1e3:>8.1f} {result['latency_p99'] * 1e3:>8.1f} "
+          f"{parse_p99:>9.2f} {result['retries']:>7} {result['failed_calls']:>6} {result['peak_memory_mb']:>8.1f}")
+
+
+def save(run_record, directory=None):
+    directory = directory or results_dir()
+    os.makedirs(directory, exist_ok=True)
+    name = time.strftime("%Y%m%d-%H%M%S") + (f"-{run_record['git']}" if run_record["git"] else "") + ".json"
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(run_record, file, indent=2)
+    return path
+
+
+def saved_runs(directory=None):
+    return sorted(glob.glob(os.path.join(directory or results_dir(), "*.json")))
+
+
+def compare(paths, directory=None):
+    """
+    Print records/s, p99 latency and peak memory of two runs side by side.
+    """
+    paths = [path if os.path.exists(path) else os.path.join(directory or results_dir(), path) for path in paths]
+    # One run is compared with the latest one, no runs means the last two
+    paths = (paths + saved_runs(directory)[-1:] if len(paths) == 1 else paths or saved_runs(directory)[-2:])
+    if len(paths) < 2:
+        raise SystemExit("Need two saved runs to compare")
+    old, new = paths[-2:]
+    with open(old, encoding="utf-8") as file:
+        before = {(r["scenario"], r["concurrency"]): r for r in json.load(file)["results"]}
+    with open(new, encoding="utf-8") as file:
+        after = {(r["scenario"], r["concurrency"]): r for r in json.load(file)["results"]}
+
+    def change(key, field):
+        a, b = before[key][field], after[key][field]
+        return f"{(b - a) / a * 100:+7.1f}%" if a else "      -"
+
+    print(f"{os.path.basename(old)} -> {os.path.basename(new)}")
+    print(f"{'scenario':<36} {'conc':>4} {'records/s':>19} {'p99 ms':>17} {'peak MB':>17}")
+    for key in sorted(set(before) & set(after)):
+        b = after[key]
+        print(f"{key[0]:<36} {key[1]:>4} {b['records_per_second']:>10.1f} {change(key, 'records_per_second')} "
+              f"{b['latency_p99'] * 1e3:>8.1f} {change(key, 'latency_p99')} "
+              f"{b['peak_memory_mb']:>8.1f} {change(key, 'peak_memory_mb')}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable)")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated thread counts")
+    parser.add_argument("--calls", type=int, default=48, help="Method calls per scenario and level")
+    parser.add_argument("--latency", type=float, default=20.0, help="Mock upstream latency in milliseconds")
+    parser.add_argument("--jitter", type=float, default=10.0, help="Extra random latency in milliseconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 500 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of 429 / CAPTCHA responses")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds of 429 responses")
+    parser.add_argument("--backoff", type=float, default=0.05, help="Scheduler backoff base in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the mock upstream's faults")
+    parser.add_argument("--fixtures", default=FIXTURES, help="Fixture directory")
+    parser.add_argument("--label", help="Free-form note stored with the run")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the results")
+    parser.add_argument("--list", action="store_true", help="List scenarios and saved runs")
+    parser.add_argument("--compare", nargs="*", metavar="RUN", help="Compare two saved runs (default: the last two)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--base", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.base, int(args.concurrency), args.calls, args.backoff)))
+        return
+    if args.list:
+        print("\n".join(SCENARIOS))
+        for path in saved_runs():
+            print(path)
+        return
+    if args.compare is not None:
+        compare(args.compare)
+        return
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    upstream_options = {"fixtures": args.fixtures, "latency": args.latency / 1e3, "jitter": args.jitter / 1e3,
+                        "error_rate": args.error_rate, "throttle_rate": args.throttle_rate,
+                        "retry_after": args.retry_after, "seed": args.seed}
+    run_record = run(args.scenario or list(SCENARIOS), levels, args.calls, upstream_options, args.backoff, args.label)
+    if not args.no_save:
+        print(f"Saved to {save(run_record)}")
+
+
+if __name__ == "__main__":
+    main()
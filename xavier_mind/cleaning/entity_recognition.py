@@ -0,0 +1,353 @@
+import itertools
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from array import array
+from urllib.parse import parse_qs, urlparse
+
+
+def normalize_text(text):
+    """
+    Lowercase, strip accents and punctuation and collapse whitespace.
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    return " ".join(re.sub(r"[^\w\s-]", " ", text).replace("_", " ").split())
+
+
+def split_name(name):
+    """
+    Split a personal name into (forenames, surname), accepting both "Given Surname"
+    and "Surname, Given" forms. Both parts are normalized.
+    """
+    if not name:
+        return "", ""
+    if "," in name:
+        surname, _, forenames = name.partition(",")
+    else:
+        parts = name.strip().rsplit(" ", 1)
+        forenames, surname = (parts[0], parts[1]) if len(parts) == 2 else ("", parts[0])
+    return normalize_text(forenames.replace(".", " ")), normalize_text(surname)
+
+
+def forenames_compatible(a, b):
+    """
+    True when two normalized forename strings can belong to the same person:
+    "j" matches "john", "j p" matches "john paul", but "john" does not match "jane".
+    """
+    for left, right in zip(a.split(), b.split()):
+        if len(left) == 1 or len(right) == 1:
+            if left[0] != right[0]:
+                return False
+        elif left != right:
+            return False
+    return True
+
+
+def normalize_doi(doi):
+    if not doi:
+        return None
+    doi = doi.strip().lower()
+    for prefix in ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "http://dx.doi.org/", "doi:"):
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi or None
+
+
+ARXIV_ID = re.compile(r"(\d{4}\.\d{4,5}|[a-z-]+(?:\.[a-z]{2})?/\d{7})(?:v\d+)?", re.IGNORECASE)
+
+
+def normalize_arxiv_id(identifier):
+    # Drops the version and any "arXiv:" or URL prefix: 2101.00001v2 -> 2101.00001
+    match = ARXIV_ID.search(identifier or "")
+    return match.group(1).lower() if match else None
+
+
+def _year(value):
+    match = re.search(r"\b(19|20)\d{2}\b", value or "")
+    return int(match.group(0)) if match else None
+
+
+class _Resolver(ABC):
+    """
+    Incremental union-find over mentions with blocking.
+
+    Every added record is a mention. Mentions sharing a strong key (an identifier
+    such as a DOI or ORCID) are merged right away; mentions without a matching key
+    are compared only with the entities in their block (e.g. same surname and
+    initial), and merged when exactly one of them is compatible. Identifiers of the
+    same type that disagree always keep entities apart. Memory per mention is one
+    slot in a flat parent array plus its keys and block.
+
+    Blocks are split into sub-blocks (e.g. by full first forename), and a mention
+    only looks at the sub-blocks that can hold a compatible entity, so common blocks
+    ("wang|y") are not scanned whole for every mention.
+    """
+
+    def __init__(self):
+        self._parent = array("q")
+        self._keys = {}
+        self._blocks = {}
+        self._facts = {}
+        self.entity_count = 0
+
+    def _find(self, node):
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]  # Path halving
+            node = parent[node]
+        return node
+
+    def _conflict(self, a, b):
+        # Two roots whose identifiers of one type differ are different entities
+        ids_a = self._facts.get(a, {}).get("ids", {})
+        ids_b = self._facts.get(b, {}).get("ids", {})
+        return any(kind in ids_b and ids_b[kind] != value for kind, value in ids_a.items())
+
+    def _union(self, a, b):
+        a, b = self._find(a), self._find(b)
+        if a == b or self._conflict(a, b):
+            return a
+        # Keep the older mention as the root so entity ids stay as stable as possible
+        if b < a:
+            a, b = b, a
+        self._parent[b] = a
+        self.entity_count -= 1
+        facts_b = self._facts.pop(b, None)
+        if facts_b:
+            facts_a = self._facts.setdefault(a, {})
+            before = [(list(facts.get("blocks", ())), self._sub_block(facts)[0]) for facts in (facts_a, facts_b)]
+            self._merge_facts(facts_a, facts_b)
+            key = self._sub_block(facts_a)[0]
+            for blocks, old_key in before:
+                if key != old_key:
+                    # The merged facts (e.g. a fuller forename seen in another block) file the
+                    # entity under a new sub-block key, so it must be findable there too
+                    for block in blocks:
+                        self._blocks.setdefault(block, {}).setdefault(key, []).append(a)
+        return a
+
+    def _merge_facts(self, into, other):
+        into.setdefault("ids", {}).update({k: v for k, v in other.get("ids", {}).items()
+                                           if k not in into.get("ids", {})})
+        blocks = into.setdefault("blocks", [])
+        blocks.extend(block for block in other.get("blocks", ()) if block not in blocks)
+
+    def _add(self, strong_keys, block, facts):
+        node = len(self._parent)
+        self._parent.append(node)
+        self.entity_count += 1
+        if facts:
+            if block:
+                facts["blocks"] = [block]
+            self._facts[node] = facts
+
+        matched = False
+        for key in strong_keys:
+            existing = self._keys.get(key)
+            if existing is None:
+                self._keys[key] = node
+            else:
+                self._union(existing, node)
+                matched = True
+
+        if block:
+            sub_blocks = self._blocks.setdefault(block, {})
+            key, probes = self._sub_block(facts or {})
+            if not matched:
+                if probes is None:
+                    candidates = itertools.chain.from_iterable(sub_blocks.values())
+                else:
+                    candidates = itertools.chain.from_iterable(sub_blocks[probe] for probe in probes
+                                                               if probe in sub_blocks)
+                compatible = self._compatible_roots(self._find(node), candidates)
+                if len(compatible) == 1:
+                    self._union(compatible[0], node)
+            members = sub_blocks.setdefault(key, [])
+            members.append(node)
+            if len(members) >= 64 and not len(members) & (len(members) - 1):
+                # Members of one entity only need one representative; compacting at powers
+                # of two keeps large sub-blocks amortized linear
+                sub_blocks[key] = list({self._find(member): None for member in members})
+        return node
+
+    def _compatible_roots(self, root, members):
+        # Up to two compatible entities: a mention only merges when exactly one fits
+        found, seen = [], {root}
+        for member in members:
+            candidate = self._find(member)
+            if candidate in seen:
+                continue
+            seen.add(candidate)
+            if self._compatible(candidate, root) and not self._conflict(candidate, root):
+                found.append(candidate)
+                if len(found) == 2:
+                    break
+        return found
+
+    def _sub_block(self, facts):
+        """
+        Return (key, probes): the sub-block a mention is filed under, and the sub-blocks
+        that can hold an entity compatible with it (None: all of them).
+        """
+        return None, None
+
+    @abstractmethod
+    def _compatible(self, a, b):
+        """
+        True when the entities rooted at a and b may be the same, judged by their facts.
+        """
+
+    def entity_of(self, mention):
+        """
+        Return the entity id of a mention (the id of its entity's oldest mention).
+        Ids can change when later batches merge two entities, so resolve them when needed.
+        """
+        return self._find(mention)
+
+    def lookup(self, key):
+        """
+        Return the entity id holding a strong key (e.g. 'doi:10.1103/physrevd.1.1'), or None.
+        """
+        node = self._keys.get(key)
+        return None if node is None else self._find(node)
+
+    def clusters(self):
+        """
+        Group all mentions by entity.
+
+        Returns:
+        - A dict of entity id -> list of mention ids
+        """
+        groups = {}
+        for mention in range(len(self._parent)):
+            groups.setdefault(self._find(mention), []).append(mention)
+        return groups
+
+    def stats(self):
+        return {"mentions": len(self._parent), "entities": self.entity_count, "keys": len(self._keys),
+                "blocks": len(self._blocks)}
+
+
+class ResearcherResolver(_Resolver):
+    """
+    Resolves researcher mentions from Scholar profiles, Scopus authors and arXiv
+    author strings into researchers.
+
+    Strong keys: ORCID, Scopus author id and Scholar user id. Block: normalized
+    surname plus first initial; within a block, forenames must be compatible
+    ("J. P. Doe" ~ "John Paul Doe").
+    """
+
+    def add(self, records):
+        """
+        Add a batch of researcher records.
+
+        Parameters:
+        - records: Dicts with any of 'name', 'orcid', 'scopus_id', 'link' (a Scholar
+          profile URL); plain strings are taken as names (e.g. arXiv authors)
+
+        Returns:
+        - The mention ids of the records, in order
+        """
+        return [self.add_one(record) for record in records]
+
+    def add_one(self, record):
+        if isinstance(record, str):
+            record = {"name": record}
+        ids = {}
+        orcid = (record.get("orcid") or "").strip().upper()[-19:]
+        if orcid:
+            ids["orcid"] = orcid
+        scopus_id = (record.get("scopus_id") or "").split(":")[-1].strip()
+        if scopus_id:
+            ids["scopus"] = scopus_id
+        scholar_id = parse_qs(urlparse(record.get("link") or "").query).get("user", [None])[0]
+        if scholar_id:
+            ids["scholar"] = scholar_id
+
+        forenames, surname = split_name(record.get("name"))
+        block = f"{surname}|{forenames[:1]}" if surname else None
+        facts = {"ids": ids, "forenames": forenames} if ids or forenames else None
+        return self._add([f"{kind}:{value}" for kind, value in ids.items()], block, facts)
+
+    def _merge_facts(self, into, other):
+        super()._merge_facts(into, other)
+        # Keep the most complete spelling of the forenames for later comparisons
+        if len(other.get("forenames", "")) > len(into.get("forenames", "")):
+            into["forenames"] = other["forenames"]
+
+    def _sub_block(self, facts):
+        # "jun" can only match roots filed under "jun" or the bare initial "j"; an initial
+        # (or no forename) can match any of them
+        forenames = facts.get("forenames", "").split()
+        first = forenames[0] if forenames else ""
+        return first, ((first, first[0]) if len(first) > 1 else None)
+
+    def _compatible(self, a, b):
+        return forenames_compatible(self._facts.get(a, {}).get("forenames", ""),
+                                    self._facts.get(b, {}).get("forenames", ""))
+
+
+class PublicationResolver(_Resolver):
+    """
+    Resolves paper records from arXiv, Scopus and Scholar into publications.
+
+    Strong keys: DOI, arXiv id (without version) and Scopus id; arXiv and DOI links
+    in Scholar results count as well. Block: normalized title; within a block,
+    publication years (when known) must be at most one year apart.
+    """
+
+    def add(self, records, source=None):
+        """
+        Add a batch of paper records.
+
+        Parameters:
+        - records: Paper dicts as produced by the scrapers ('id', 'doi', 'scopus_id', 'link',
+          'title', 'published' / 'publication_date' / 'journal_info')
+        - source: 'arxiv' when 'id' holds an arXiv id (the default for records that have
+          an 'id' but no 'scopus_id')
+
+        Returns:
+        - The mention ids of the records, in order
+        """
+        return [self.add_one(record, source) for record in records]
+
+    def add_one(self, record, source=None):
+        ids = {}
+        doi = normalize_doi(record.get("doi"))
+        link = record.get("link") or ""
+        if not doi and "doi.org/" in link:
+            doi = normalize_doi(link[link.index("doi.org/") + len("doi.org/"):])
+        if doi:
+            ids["doi"] = doi
+        arxiv_id = None
+        if record.get("id") and (source == "arxiv" or (source is None and not record.get("scopus_id"))):
+            arxiv_id = normalize_arxiv_id(record["id"])
+        elif "arxiv.org/" in link:
+            arxiv_id = normalize_arxiv_id(link.rsplit("/", 1)[-1])
+        if arxiv_id:
+            ids["arxiv"] = arxiv_id
+        scopus_id = (record.get("scopus_id") or "").split(":")[-1].strip()
+        if scopus_id:
+            ids["scopus"] = scopus_id
+
+        title = normalize_text(record.get("title"))
+        year = _year(record.get("published") or record.get("publication_date") or record.get("journal_info"))
+        facts = {"ids": ids, "year": year} if ids or year else None
+        return self._add([f"{kind}:{value}" for kind, value in ids.items()], title or None, facts)
+
+    def _merge_facts(self, into, other):
+        super()._merge_facts(into, other)
+        if into.get("year") is None:
+            into["year"] = other.get("year")
+
+    def _sub_block(self, facts):
+        # Generic titles ("Introduction") form large blocks: only look at neighbouring years
+        year = facts.get("year")
+        return year, (None if year is None else (year - 1, year, year + 1, None))
+
+    def _compatible(self, a, b):
+        year_a = self._facts.get(a, {}).get("year")
+        year_b = self._facts.get(b, {}).get("year")
+        return year_a is None or year_b is None or abs(year_a - year_b) <= 1
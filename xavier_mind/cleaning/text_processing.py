@@ -0,0 +1,215 @@
+import ast
+import itertools
+import re
+
+import numpy as np
+import pandas as pd
+
+# Combining marks left behind by NFKD decomposition (accents, umlauts, cedillas, ...)
+COMBINING_MARKS = r"[̀-ͯ᪰-᫿᷀-᷿⃐-⃿︠-︯]"
+
+# Separators between authors in a single string: other sources use ";" or " and ", Scholar
+# lists "C Rovelli, L Smolin" with commas. Our CSV dumps join with " / ". Names may be written
+# "Doe, Jane" (the Scopus people format), so a comma only separates authors when it does not
+# stand between a surname and its given names (see split_authors).
+AUTHOR_SEPARATORS = r"\s*(?:;|\band\b)\s*"
+CSV_AUTHOR_SEPARATOR = r"\s*/\s*"
+
+# A bare surname, possibly with particles ("van der Berg"), as written before ", Given"
+SURNAME = re.compile(r"^(?:(?:van|von|der|den|de|del|della|di|da|du|le|la|dos|das|ter|ten)\s+)*[^\s,;]+$",
+                     re.IGNORECASE)
+
+# Separators of list values joined into one string (the scrapers' CSV files use ", ")
+LIST_SEPARATOR = r"\s*[,;]\s*"
+
+
+def _text(series):
+    # Missing values stay missing; everything else becomes a string
+    return series.astype("string")
+
+
+def fold_unicode(series):
+    """
+    Decompose compatibility characters and drop combining marks ("Schrödinger" -> "Schrodinger",
+    "ﬁ" -> "fi"), keeping letters of non-Latin scripts.
+    """
+    return _text(series).str.normalize("NFKD").str.replace(COMBINING_MARKS, "", regex=True)
+
+
+def clean_whitespace(series):
+    """
+    Collapse runs of whitespace (including newlines left in abstracts) into single spaces.
+    """
+    return _text(series).str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def clean_titles(series):
+    """
+    Normalize whitespace and strip surrounding quotes and trailing periods from titles.
+    """
+    return clean_whitespace(series).str.strip("\"'“”‘’ ").str.replace(r"\.$", "", regex=True)
+
+
+def canonical_names(series):
+    """
+    Bring personal names to "Given Surname" form with dotted, spaced initials:
+    "Doe, John" -> "John Doe", "J.P. Doe" -> "J. P. Doe", "C Rovelli" -> "C. Rovelli".
+    """
+    names = clean_whitespace(fold_unicode(series))
+    names = names.str.replace(r"^([^,]+),\s*(.+)$", r"\2 \1", regex=True)
+    names = names.str.replace(r"\b([A-Z])\.?(?=\s|[A-Z]\b|[A-Z]\.|$)", r"\1. ", regex=True)
+    return clean_whitespace(names)
+
+
+def split_authors(text):
+    """
+    Split one authors string into names. ";" and " and " always separate authors; commas do
+    too, unless they pair surnames with given names: "Doe, Jane" is one author and
+    "Doe, Jane, Smith, John" two, while "C Rovelli, L Smolin" is two.
+    """
+    names = []
+    for piece in re.split(AUTHOR_SEPARATORS, text):
+        parts = [part.strip() for part in piece.split(",")]
+        if len(parts) % 2 == 0 and all(map(SURNAME.match, parts[0::2])) and all(parts[1::2]):
+            names.extend(f"{surname}, {given}" for surname, given in zip(parts[0::2], parts[1::2]))
+        else:
+            names.extend(parts)
+    return [name for name in names if name]
+
+
+def list_values(value):
+    """
+    Turn a list-valued cell into a list: stored lists stay lists, strings joined by the CSV
+    writers (", "-joined Scopus areas, or the repr pandas writes for Scholar's lists) are
+    split, Scopus {"$": ...} entries are unwrapped and missing values become [].
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith("[") and value.endswith("]"):
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                value = value[1:-1]
+        if isinstance(value, str):
+            return [item for item in re.split(LIST_SEPARATOR, value) if item]
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [item.get("$") if isinstance(item, dict) else item for item in value]
+    return []
+
+
+def author_lists(series):
+    """
+    Turn an authors column holding lists (arXiv) or joined strings (Scholar, Scopus, CSV
+    dumps) into lists of canonical names.
+    """
+    is_text = series.map(lambda value: isinstance(value, str)).to_numpy()
+    split = series.to_numpy(dtype=object).copy()
+    text = series[is_text].astype(str)
+    slashed = text.str.contains("/", regex=False).to_numpy()
+    split[np.flatnonzero(is_text)[slashed]] = text[slashed].str.split(CSV_AUTHOR_SEPARATOR, regex=True).to_numpy()
+    # Comma handling needs a look at each string, so split every distinct string once
+    codes, distinct = pd.factorize(text[~slashed])
+    pieces = pd.Series([split_authors(value) for value in distinct], dtype=object).to_numpy()
+    split[np.flatnonzero(is_text)[~slashed]] = pieces[codes]
+    split = [value if isinstance(value, (list, tuple, np.ndarray)) else () for value in split]
+
+    # Flatten once so the whole column is canonicalized in a single vectorized pass,
+    # then cut the result back into one list per row
+    lengths = np.fromiter(map(len, split), dtype=np.int64, count=len(split))
+    rows = np.repeat(np.arange(len(split)), lengths)
+    # The same author appears on many papers, so only distinct spellings are canonicalized
+    codes, distinct = pd.factorize(np.fromiter(itertools.chain.from_iterable(split), dtype=object, count=lengths.sum()))
+    canonical = canonical_names(pd.Series(distinct, dtype=object)).fillna("").to_numpy(dtype=object)
+    names = canonical[codes]
+    keep = names != ""
+    names = names[keep].tolist()
+    ends = np.cumsum(np.bincount(rows[keep], minlength=len(split))).tolist()
+    return pd.Series([names[start:end] for start, end in zip([0] + ends[:-1], ends)], index=series.index,
+                     dtype=object)
+
+
+def parse_dates(series):
+    """
+    Parse ISO dates and timestamps ("2021-01-01", "2021-01-01T12:00:00Z") into UTC datetimes;
+    unparseable values become NaT.
+    """
+    return pd.to_datetime(_text(series), errors="coerce", utc=True, format="ISO8601")
+
+
+def extract_years(series):
+    """
+    Pull a four-digit publication year out of free text such as Scholar's
+    "Living Reviews in Relativity, 2008 - Springer".
+    """
+    return pd.to_numeric(_text(series).str.extract(r"\b((?:19|20)\d{2})\b", expand=False), errors="coerce").astype("Int64")
+
+
+def citation_counts(series):
+    """
+    Extract the number from citation strings like "Cited by 1,234" (or plain numbers).
+    """
+    digits = _text(series).str.extract(r"(\d[\d,]*)", expand=False).str.replace(",", "", regex=False)
+    return pd.to_numeric(digits, errors="coerce").astype("Int64")
+
+
+def normalize_papers(frame):
+    """
+    Normalize a papers frame (e.g. ParquetStore.read("papers").to_pandas()) column by column.
+
+    Returns:
+    - A new DataFrame; title/summary are cleaned, authors become lists of canonical names,
+      published/updated become UTC datetimes (the year is taken from journal_info where
+      no date exists) and a 'year' column is added
+    """
+    frame = frame.copy()
+    if "title" in frame:
+        frame["title"] = clean_titles(fold_unicode(frame["title"]))
+    if "summary" in frame:
+        frame["summary"] = clean_whitespace(frame["summary"])
+    if "authors" in frame:
+        frame["authors"] = author_lists(frame["authors"])
+    if "publication_date" in frame:
+        published = frame["publication_date"]
+        frame["published"] = published if "published" not in frame else frame["published"].fillna(published)
+        frame = frame.drop(columns="publication_date")
+    for column in ("published", "updated"):
+        if column in frame:
+            frame[column] = parse_dates(frame[column])
+    year = frame["published"].dt.year.astype("Int64") if "published" in frame else pd.Series(pd.NA, index=frame.index, dtype="Int64")
+    if "journal_info" in frame:
+        year = year.fillna(extract_years(frame["journal_info"]))
+    frame["year"] = year
+    return frame
+
+
+def normalize_profiles(frame):
+    """
+    Normalize a researcher frame (Scholar profiles or Scopus authors).
+
+    Returns:
+    - A new DataFrame with canonical names, cleaned affiliations, integer cited_by
+      counts and list-valued interests / research_areas
+    """
+    frame = frame.copy()
+    if "name" in frame:
+        frame["name"] = canonical_names(frame["name"])
+    for column in ("affiliations", "affiliation"):
+        if column in frame:
+            frame[column] = clean_whitespace(fold_unicode(frame[column]))
+    if "cited_by" in frame:
+        frame["cited_by"] = citation_counts(frame["cited_by"])
+    for column in ("interests", "research_areas"):
+        if column in frame:
+            frame[column] = frame[column].map(list_values)
+    return frame
+
+
+def normalize_chunks(frames, kind="papers"):
+    """
+    Normalize an iterable of DataFrame chunks lazily, e.g. pd.read_csv(..., chunksize=1_000_000).
+    """
+    normalize = normalize_papers if kind == "papers" else normalize_profiles
+    for frame in frames:
+        yield normalize(frame)
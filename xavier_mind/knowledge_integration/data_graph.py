@@ -1 +1,725 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
 
+import numpy as np
+
+from xavier_mind.cleaning.entity_recognition import ResearcherResolver, normalize_text, split_name
+
+# Node types and the relations between them; every relation is stored in both directions
+NODE_TYPES = ("researcher", "paper", "institution", "interest")
+RELATIONS = {
+    "authored": ("researcher", "paper"),
+    "affiliated": ("researcher", "institution"),
+    "interested": ("researcher", "interest"),
+}
+
+INSTITUTION_WORDS = re.compile(r"universit|institut|college|school|laborator|academy|centre|center|cern|ecole|polytechn",
+                               re.IGNORECASE)
+
+# An edge is packed into one integer as source << 32 | target, so sorted edge lists are
+# sorted by source first and can be searched with np.searchsorted
+SHIFT = 32
+MASK = (1 << SHIFT) - 1
+
+
+def institution_of(affiliation):
+    """
+    Pick the institution out of a free-form Scholar affiliation line such as
+    "Professor of Physics, Harvard University".
+    """
+    parts = [part.strip() for part in re.split(r"[,;]| at ", affiliation or "") if part.strip()]
+    for part in reversed(parts):
+        if INSTITUTION_WORDS.search(part):
+            return part
+    return parts[-1] if parts else None
+
+
+def _pack(sources, targets):
+    return (np.asarray(sources, dtype=np.int64) << SHIFT) | np.asarray(targets, dtype=np.int64)
+
+
+def _csr(packed, size, counts=None):
+    # Turn sorted packed edges into (indptr, indices, counts); duplicate edges are summed
+    # into their count and edges whose count dropped to zero are left out
+    if not len(packed):
+        return np.zeros(size + 1, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+    first = np.flatnonzero(np.concatenate(([True], packed[1:] != packed[:-1])))
+    counts = np.diff(np.append(first, len(packed))) if counts is None else np.add.reduceat(counts, first)
+    packed = packed[first]
+    keep = counts > 0
+    packed, counts = packed[keep], counts[keep]
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(packed >> SHIFT, minlength=size), out=indptr[1:])
+    return indptr, packed & MASK, counts.astype(np.int32)
+
+
+def _spans(starts, ends):
+    # Positions of several [start, end) ranges at once, without a Python loop over the ranges
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64), lengths
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total), lengths
+
+
+def _contains(sorted_values, values):
+    positions = np.minimum(np.searchsorted(sorted_values, values), len(sorted_values) - 1)
+    return sorted_values[positions] == values
+
+
+def _merge_sorted(values, changed, present):
+    # Remove the changed keys from a sorted array and insert (sorted) those now present:
+    # binary searches plus one delete and one insert, without re-sorting the array
+    positions = np.searchsorted(values, changed)
+    found = positions < len(values)
+    found[found] = values[positions[found]] == changed[found]
+    values = np.delete(values, positions[found])
+    return np.insert(values, np.searchsorted(values, present), present)
+
+
+def _intern(ids, labels, node_type, label, key=None):
+    key = key or normalize_text(label)
+    nodes = ids[node_type]
+    if key not in nodes:
+        nodes[key] = len(labels[node_type])
+        labels[node_type].append(label)
+    return nodes[key]
+
+
+def _names(value):
+    if isinstance(value, str):
+        return [value]
+    return value if value is not None else ()
+
+
+def paper_edges(paper, node):
+    """
+    Create the nodes of a paper record (ParquetStore 'papers' row) and return its edges.
+
+    Parameters:
+    - paper: The record
+    - node: Callable (node_type, label, key=None) -> node id
+
+    Returns:
+    - A list of (relation, source id, target id) tuples
+    """
+    if not paper.get("title"):
+        return []
+    key = paper.get("doi") or paper.get("id") or None
+    paper_id = node("paper", paper["title"], f"id:{key}" if key else None)
+    return [("authored", node("researcher", name), paper_id) for name in _names(paper.get("authors")) if name]
+
+
+def profile_edges(profile, node):
+    """
+    Create the nodes of a researcher record (Scholar profile or Scopus author) and return
+    its institution and interest edges.
+    """
+    if not profile.get("name"):
+        return []
+    researcher = node("researcher", profile["name"])
+    edges = []
+    institution = profile.get("affiliation") or institution_of(profile.get("affiliations"))
+    if institution:
+        edges.append(("affiliated", researcher, node("institution", institution)))
+    interests = profile.get("interests")
+    if interests is None:
+        interests = profile.get("research_areas")
+    for interest in _names(interests):
+        if interest:
+            edges.append(("interested", researcher, node("interest", interest)))
+    return edges
+
+
+def resolve_researchers(papers=(), profiles=(), resolver=None):
+    """
+    Spell every resolved researcher the same way in a set of records.
+
+    Researcher nodes are keyed by normalized name, so "J. Doe" and "John Doe" (or one
+    person named differently by Scopus and Scholar) would otherwise be separate nodes.
+    Profiles and paper authors are fed to a ResearcherResolver, and each mention is
+    renamed to the most complete spelling among its entity's mentions.
+
+    Parameters:
+    - papers: Paper records (ParquetStore 'papers' rows)
+    - profiles: Researcher records (Scholar profiles or Scopus authors)
+    - resolver: ResearcherResolver to use (default: a new one)
+
+    Returns:
+    - (papers, profiles) as new lists of renamed record copies
+    """
+    resolver = resolver if resolver is not None else ResearcherResolver()
+    papers, profiles = list(papers), list(profiles)
+    # Profiles first, so bare author names attach to entities that carry identifiers
+    profile_mentions = resolver.add(profiles)
+    author_mentions = [resolver.add([name for name in _names(paper.get("authors")) if name]) for paper in papers]
+
+    names = {}
+    for record, mention in zip(profiles, profile_mentions):
+        names.setdefault(mention, record.get("name"))
+    for paper, mentions in zip(papers, author_mentions):
+        names.update(zip(mentions, (name for name in _names(paper.get("authors")) if name)))
+    best = {}
+    for mention, name in names.items():
+        if name:
+            # Fullest forenames win, "Given Surname" over "Surname, Given", then the first seen
+            rank = (len(split_name(name)[0]), "," not in name)
+            entity = resolver.entity_of(mention)
+            if entity not in best or rank > best[entity][0]:
+                best[entity] = (rank, name)
+
+    def canonical(mention):
+        return best[resolver.entity_of(mention)][1]
+
+    profiles = [dict(record, name=canonical(mention)) if record.get("name") else record
+                for record, mention in zip(profiles, profile_mentions)]
+    papers = [dict(paper, authors=list(dict.fromkeys(canonical(mention) for mention in mentions)))
+              if mentions else paper for paper, mentions in zip(papers, author_mentions)]
+    return papers, profiles
+
+
+class GraphBuilder:
+    """
+    Collects nodes and edges for a KnowledgeGraph.
+
+    Nodes are interned per type by a normalized key; edges are kept in flat integer
+    arrays until build() turns them into CSR adjacency.
+    """
+
+    def __init__(self):
+        self.ids = {node_type: {} for node_type in NODE_TYPES}
+        self.labels = {node_type: [] for node_type in NODE_TYPES}
+        self.edges = {relation: (array("q"), array("q")) for relation in RELATIONS}
+
+    def node(self, node_type, label, key=None):
+        """
+        Return the id of a node, creating it on first use.
+
+        Parameters:
+        - node_type: One of NODE_TYPES
+        - label: Display label
+        - key: Identity of the node (defaults to the normalized label)
+        """
+        return _intern(self.ids, self.labels, node_type, label, key)
+
+    def edge(self, relation, source, target):
+        sources, targets = self.edges[relation]
+        sources.append(source)
+        targets.append(target)
+
+    def add_paper(self, paper):
+        """
+        Add a paper record (ParquetStore 'papers' row) and its authorship edges.
+        """
+        for relation, source, target in paper_edges(paper, self.node):
+            self.edge(relation, source, target)
+
+    def add_profile(self, profile):
+        """
+        Add a researcher record (Scholar profile or Scopus author) with its institution
+        and interests.
+        """
+        for relation, source, target in profile_edges(profile, self.node):
+            self.edge(relation, source, target)
+
+    def build(self):
+        """
+        Freeze the collected nodes and edges into a KnowledgeGraph.
+        """
+        graph = KnowledgeGraph(self.ids, self.labels)
+        for relation, (sources, targets) in self.edges.items():
+            sources = np.frombuffer(sources, dtype=np.int64) if len(sources) else np.zeros(0, dtype=np.int64)
+            targets = np.frombuffer(targets, dtype=np.int64) if len(targets) else np.zeros(0, dtype=np.int64)
+            graph._index(relation, np.sort(_pack(sources, targets)))
+        return graph
+
+
+class KnowledgeGraph:
+    """
+    Embedded researcher / paper / institution / interest graph.
+
+    Each relation is held as CSR adjacency (an offsets array and a neighbors array)
+    in both directions ("authored" and "~authored"), so every lookup is an index
+    into flat NumPy arrays. Every edge carries a count of the records asserting it.
+
+    Edges changed after the CSR arrays were built are kept in a small delta overlay
+    (added edges and edges whose count dropped to zero) that queries consult next to
+    the base arrays; compact() folds the overlay back into new base arrays.
+    """
+
+    def __init__(self, ids=None, labels=None, adjacency=None, counts=None):
+        self.ids = ids or {node_type: {} for node_type in NODE_TYPES}
+        self.labels = labels or {node_type: [] for node_type in NODE_TYPES}
+        self.adjacency = adjacency or {}
+        self.counts = counts or {}
+        # relation -> {packed edge: [count in the base arrays, change since]}
+        self.delta = {relation: {} for relation in RELATIONS}
+        self._overlay = {}
+        for relation in RELATIONS:
+            if relation not in self.adjacency:
+                self._index(relation, np.zeros(0, dtype=np.int64))
+
+    @classmethod
+    def from_records(cls, papers=(), profiles=(), resolve=False):
+        """
+        Build a graph from iterables of paper and researcher records.
+
+        Parameters:
+        - papers, profiles: Paper and researcher records
+        - resolve: Merge the mentions of one researcher first (see resolve_researchers)
+        """
+        if resolve:
+            papers, profiles = resolve_researchers(papers, profiles)
+        builder = GraphBuilder()
+        for paper in papers:
+            builder.add_paper(paper)
+        for profile in profiles:
+            builder.add_profile(profile)
+        return builder.build()
+
+    @classmethod
+    def from_store(cls, store, sources=None, since=None, until=None, resolve=False):
+        """
+        Bulk load a graph from the record store (papers, Scopus authors and Scholar profiles).
+
+        Parameters:
+        - store: xavier_telepath ParquetStore
+        - sources, since, until: Partition filters passed to ParquetStore.read
+        - resolve: Merge the mentions of one researcher first (see resolve_researchers)
+        """
+        def rows(kind, columns):
+            return store.read(kind, columns=columns, sources=sources, since=since, until=until).to_pylist()
+
+        # ORCID iDs and Scholar links are the resolver's strong keys
+        profiles = rows("authors", ["name", "affiliation", "research_areas", "orcid"]) + \
+            rows("profiles", ["name", "affiliations", "interests", "link"])
+        return cls.from_records(rows("papers", ["id", "doi", "title", "authors"]), profiles, resolve=resolve)
+
+    def _index(self, relation, packed, counts=None):
+        # (Re)build both directions of a relation from sorted packed edges
+        source_type, target_type = RELATIONS[relation]
+        indptr, indices, counts = _csr(packed, len(self.labels[source_type]), counts)
+        sources = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        reverse_indptr, reverse_indices, _ = _csr(np.sort(_pack(indices, sources)), len(self.labels[target_type]))
+        self.adjacency[relation] = (indptr, indices)
+        self.adjacency[f"~{relation}"] = (reverse_indptr, reverse_indices)
+        self.counts[relation] = counts
+
+    def node(self, node_type, label, key=None):
+        """
+        Return the id of a node, creating it on first use (see GraphBuilder.node).
+        """
+        return _intern(self.ids, self.labels, node_type, label, key)
+
+    def _base_count(self, relation, source, target):
+        indptr, indices = self.adjacency[relation]
+        if source >= len(indptr) - 1:
+            return 0
+        start, end = indptr[source], indptr[source + 1]
+        position = start + np.searchsorted(indices[start:end], target)
+        return int(self.counts[relation][position]) if position < end and indices[position] == target else 0
+
+    def change_edges(self, changes):
+        """
+        Add or retract edges without rebuilding the adjacency arrays.
+
+        Parameters:
+        - changes: Iterable of (relation, source id, target id, count change) tuples;
+          +1 for a record asserting the edge, -1 for a record no longer asserting it
+
+        Returns:
+        - The changed (relation, packed edge) pairs
+        """
+        touched = []
+        changed = {}
+        for relation, source, target, change in changes:
+            key = (source << SHIFT) | target
+            entry = self.delta[relation].get(key)
+            if entry is None:
+                entry = self.delta[relation][key] = [self._base_count(relation, source, target), 0]
+            entry[1] += change
+            touched.append((relation, key))
+            changed.setdefault(relation, set()).add(key)
+        for relation, keys in changed.items():
+            self._refresh(relation, keys)
+        return touched
+
+    def _refresh(self, relation, keys):
+        # Update the overlay of one relation for the changed edges only: the sorted added /
+        # dead arrays are searched and spliced, not rebuilt from the whole pending delta
+        delta = self.delta[relation]
+        keys = np.sort(np.fromiter(keys, dtype=np.int64, count=len(keys)))
+        base, change = np.array([delta[key] for key in keys.tolist()], dtype=np.int64).reshape(-1, 2).T
+        is_added = (base == 0) & (base + change > 0)
+        is_dead = (base > 0) & (base + change <= 0)
+        empty = np.zeros(0, dtype=np.int64)
+        added, added_reverse, dead = self._overlay.get(relation, (empty, empty, empty))
+        reverse = _pack(keys & MASK, keys >> SHIFT)
+        self._overlay[relation] = (_merge_sorted(added, keys, keys[is_added]),
+                                   _merge_sorted(added_reverse, reverse, np.sort(reverse[is_added])),
+                                   _merge_sorted(dead, keys, keys[is_dead]))
+
+    def delta_size(self):
+        return sum(len(delta) for delta in self.delta.values())
+
+    def compact(self):
+        """
+        Fold pending edge changes into new base adjacency arrays.
+        """
+        for relation in RELATIONS:
+            if not self.delta[relation]:
+                continue
+            indptr, indices = self.adjacency[relation]
+            delta = self.delta[relation]
+            packed = np.concatenate([_pack(np.repeat(np.arange(len(indptr) - 1), np.diff(indptr)), indices),
+                                     np.fromiter(delta.keys(), dtype=np.int64, count=len(delta))])
+            counts = np.concatenate([self.counts[relation].astype(np.int64),
+                                     np.fromiter((change for _, change in delta.values()), dtype=np.int64,
+                                                 count=len(delta))])
+            order = np.argsort(packed, kind="stable")
+            self._index(relation, packed[order], counts[order])
+            self.delta[relation] = {}
+        self._overlay = {}
+
+    def _id(self, node_type, label):
+        node = self.ids[node_type].get(normalize_text(label))
+        if node is None:
+            raise KeyError(f"Unknown {node_type}: {label}")
+        return node
+
+    def _neighbors(self, direction, node_ids):
+        rows = np.asarray(node_ids, dtype=np.int64)
+        indptr, indices = self.adjacency[direction]
+        # Nodes created after the base arrays were built only have overlay edges
+        base_rows = rows[rows < len(indptr) - 1]
+        positions, lengths = _spans(indptr[base_rows], indptr[base_rows + 1])
+        neighbors = indices[positions]
+        relation = direction.lstrip("~")
+        if relation not in self._overlay:
+            return neighbors
+        added, added_reverse, dead = self._overlay[relation]
+        if len(dead):
+            owners = np.repeat(base_rows, lengths)
+            edges = _pack(neighbors, owners) if direction != relation else _pack(owners, neighbors)
+            neighbors = neighbors[~_contains(dead, edges)]
+        if len(added):
+            keys = added_reverse if direction != relation else added
+            positions, _ = _spans(np.searchsorted(keys, rows << SHIFT), np.searchsorted(keys, (rows + 1) << SHIFT))
+            neighbors = np.concatenate([neighbors, keys[positions] & MASK])
+        return neighbors
+
+    def _labels(self, node_type, node_ids):
+        labels = self.labels[node_type]
+        return [labels[node] for node in node_ids]
+
+    def papers_of(self, researcher):
+        return self._labels("paper", self._neighbors("authored", [self._id("researcher", researcher)]))
+
+    def coauthors(self, researcher, limit=None):
+        """
+        Co-authors of a researcher, most shared papers first.
+
+        Returns:
+        - A list of (name, shared paper count) tuples
+        """
+        node = self._id("researcher", researcher)
+        papers = self._neighbors("authored", [node])
+        authors = self._neighbors("~authored", papers)
+        authors = authors[authors != node]
+        counts = np.bincount(authors, minlength=len(self.labels["researcher"]))
+        ranked = np.flatnonzero(counts)
+        ranked = ranked[np.argsort(-counts[ranked], kind="stable")][:limit]
+        return [(self.labels["researcher"][author], int(counts[author])) for author in ranked]
+
+    def researchers_at(self, institution, interest=None):
+        """
+        Researchers affiliated with an institution, optionally only those with an interest.
+        """
+        members = np.unique(self._neighbors("~affiliated", [self._id("institution", institution)]))
+        if interest is not None:
+            interested = np.unique(self._neighbors("~interested", [self._id("interest", interest)]))
+            members = np.intersect1d(members, interested, assume_unique=True)
+        return self._labels("researcher", members)
+
+    def neighborhood(self, node_type, label, hops=2):
+        """
+        All nodes within a number of hops of a node, across every relation.
+
+        Returns:
+        - A dict of node type -> list of labels (the start node excluded)
+        """
+        seen = {kind: np.zeros(len(self.labels[kind]), dtype=bool) for kind in NODE_TYPES}
+        start = self._id(node_type, label)
+        seen[node_type][start] = True
+        frontier = {node_type: np.array([start], dtype=np.int64)}
+        for _ in range(hops):
+            reached = {}
+            for relation, (source_type, target_type) in RELATIONS.items():
+                for direction, from_type, to_type in ((relation, source_type, target_type),
+                                                      (f"~{relation}", target_type, source_type)):
+                    if from_type in frontier and len(frontier[from_type]):
+                        reached.setdefault(to_type, []).append(self._neighbors(direction, frontier[from_type]))
+            frontier = {}
+            for kind, parts in reached.items():
+                nodes = np.unique(np.concatenate(parts))
+                nodes = nodes[~seen[kind][nodes]]
+                seen[kind][nodes] = True
+                frontier[kind] = nodes
+        seen[node_type][start] = False
+        return {kind: self._labels(kind, np.flatnonzero(mask)) for kind, mask in seen.items() if mask.any()}
+
+    def stats(self):
+        edges = {}
+        for relation in RELATIONS:
+            added, _, dead = self._overlay.get(relation, ((), (), ()))
+            edges[relation] = len(self.adjacency[relation][1]) + len(added) - len(dead)
+        return {"nodes": {kind: len(labels) for kind, labels in self.labels.items()}, "edges": edges,
+                "pending_changes": self.delta_size()}
+
+    def save_arrays(self, path):
+        # Base adjacency only; pending changes are not included
+        arrays = {}
+        for direction, (indptr, indices) in self.adjacency.items():
+            arrays[f"{direction}.indptr"] = indptr
+            arrays[f"{direction}.indices"] = indices
+        for relation, counts in self.counts.items():
+            arrays[f"{relation}.counts"] = counts
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(temporary, path)
+
+    @staticmethod
+    def load_arrays(path):
+        with np.load(path) as arrays:
+            directions = {name.rsplit(".", 1)[0] for name in arrays.files if not name.endswith(".counts")}
+            adjacency = {direction: (arrays[f"{direction}.indptr"], arrays[f"{direction}.indices"])
+                         for direction in directions}
+            counts = {relation: arrays[f"{relation}.counts"] for relation in RELATIONS if f"{relation}.counts" in arrays}
+        return adjacency, counts
+
+    def save(self, directory):
+        """
+        Write the graph to a directory (adjacency arrays as .npz, node tables as JSON).
+        Pending edge changes are compacted first.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.compact()
+        self.save_arrays(os.path.join(directory, "adjacency.npz"))
+        with open(os.path.join(directory, "nodes.json"), "w", encoding="utf-8") as file:
+            json.dump({"ids": self.ids, "labels": self.labels}, file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, "nodes.json"), encoding="utf-8") as file:
+            nodes = json.load(file)
+        adjacency, counts = cls.load_arrays(os.path.join(directory, "adjacency.npz"))
+        return cls(nodes["ids"], nodes["labels"], adjacency, counts)
+
+
+def record_key(kind, record):
+    """
+    Stable identity of a harvested record, used to recognize it in later crawls.
+
+    Parameters:
+    - kind: 'paper' or 'profile'
+    - record: The record dict
+
+    Returns:
+    - A string key, or None for records that cannot be identified
+    """
+    if kind == "paper":
+        key = record.get("doi") or record.get("id") or normalize_text(record.get("title"))
+    else:
+        key = record.get("link") or record.get("scopus_id") or normalize_text(record.get("name"))
+    return f"{kind}:{key}" if key else None
+
+
+def content_hash(record):
+    return hashlib.sha1(json.dumps(record, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class GraphUpdater:
+    """
+    Keeps a KnowledgeGraph current by applying each crawl's records as a change set.
+
+    Every record is identified by record_key() and fingerprinted with a content hash.
+    Unchanged records are skipped; for new and changed records only the difference
+    between their old and new edges is applied to the graph's delta overlay. Record
+    hashes, the edges each record asserts, new nodes, the pending delta and a change
+    log are committed to SQLite in one transaction per change set, so an update costs
+    time in the size of the change set rather than the corpus. The base adjacency
+    arrays are only rewritten when the delta outgrows compact_ratio of the graph.
+    """
+
+    def __init__(self, directory, compact_ratio=0.25, min_compact=100000):
+        """
+        Parameters:
+        - directory: Directory holding graph.sqlite and the base adjacency arrays
+        - compact_ratio: Compact once pending edge changes exceed this fraction of the edges
+        - min_compact: ... but never for fewer pending changes than this
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.compact_ratio = compact_ratio
+        self.min_compact = min_compact
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "graph.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS nodes (type TEXT, id INTEGER, key TEXT, label TEXT, PRIMARY KEY (type, id))")
+        self._db.execute("CREATE TABLE IF NOT EXISTS records (key TEXT PRIMARY KEY, hash TEXT, edges TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS changes ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT, action TEXT, added INTEGER, removed INTEGER,"
+            " applied_at REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS delta (relation TEXT, edge INTEGER, base INTEGER, change INTEGER,"
+            " PRIMARY KEY (relation, edge))"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._db.commit()
+        self.graph = self._load()
+
+    def _generation(self):
+        row = self._db.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _arrays_path(self, generation):
+        return os.path.join(self.directory, f"adjacency-{generation}.npz")
+
+    def _load(self):
+        ids = {node_type: {} for node_type in NODE_TYPES}
+        labels = {node_type: [] for node_type in NODE_TYPES}
+        for node_type, key, label in self._db.execute("SELECT type, key, label FROM nodes ORDER BY type, id"):
+            ids[node_type][key] = len(labels[node_type])
+            labels[node_type].append(label)
+        generation = self._generation()
+        adjacency = counts = None
+        if generation:
+            adjacency, counts = KnowledgeGraph.load_arrays(self._arrays_path(generation))
+        graph = KnowledgeGraph(ids, labels, adjacency, counts)
+        for relation, edge, base, change in self._db.execute("SELECT relation, edge, base, change FROM delta"):
+            graph.delta[relation][edge] = [base, change]
+        for relation in RELATIONS:
+            if graph.delta[relation]:
+                graph._refresh(relation, list(graph.delta[relation]))
+        return graph
+
+    def apply(self, papers=(), profiles=()):
+        """
+        Apply a change set (e.g. one crawl's output) to the graph.
+
+        Parameters:
+        - papers: Paper records (ParquetStore 'papers' rows)
+        - profiles: Researcher records (Scholar profiles or Scopus authors)
+
+        Researcher names are used as given, so resolve them first (see resolve_researchers).
+
+        Returns:
+        - A dict with the number of "added", "changed" and "unchanged" records and of
+          "edges_added" / "edges_removed"
+        """
+        entries = {}
+        for kind, records, edges_of in (("paper", papers, paper_edges), ("profile", profiles, profile_edges)):
+            for record in records:
+                key = record_key(kind, record)
+                if key:
+                    # The last version of a record within one change set wins
+                    entries[key] = (content_hash(record), record, edges_of)
+
+        with self._lock:
+            previous = {}
+            keys = list(entries)
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, hash, edges FROM records WHERE key IN ({','.join('?' * len(batch))})", batch
+                )
+                previous.update({key: (digest, edges) for key, digest, edges in rows})
+
+            graph = self.graph
+            new_nodes = []
+
+            def node(node_type, label, key=None):
+                key = key or normalize_text(label)
+                count = len(graph.labels[node_type])
+                node_id = graph.node(node_type, label, key)
+                if node_id == count:
+                    new_nodes.append((node_type, node_id, key, label))
+                return node_id
+
+            report = {"added": 0, "changed": 0, "unchanged": 0, "edges_added": 0, "edges_removed": 0}
+            now = time.time()
+            changes, records, log = [], [], []
+            for key, (digest, record, edges_of) in entries.items():
+                old = previous.get(key)
+                if old and old[0] == digest:
+                    report["unchanged"] += 1
+                    continue
+                edges = set(edges_of(record, node))
+                old_edges = {tuple(edge) for edge in json.loads(old[1])} if old else set()
+                added, removed = edges - old_edges, old_edges - edges
+                changes.extend((relation, source, target, 1) for relation, source, target in added)
+                changes.extend((relation, source, target, -1) for relation, source, target in removed)
+                action = "changed" if old else "added"
+                report[action] += 1
+                report["edges_added"] += len(added)
+                report["edges_removed"] += len(removed)
+                records.append((key, digest, json.dumps(sorted(edges))))
+                log.append((key, action, len(added), len(removed), now))
+
+            touched = set(graph.change_edges(changes))
+            self._db.executemany("INSERT INTO nodes VALUES (?, ?, ?, ?)", new_nodes)
+            self._db.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?)", records)
+            self._db.executemany("INSERT INTO changes (key, action, added, removed, applied_at) VALUES (?, ?, ?, ?, ?)",
+                                 log)
+            self._db.executemany("INSERT OR REPLACE INTO delta VALUES (?, ?, ?, ?)",
+                                 [(relation, edge, *graph.delta[relation][edge]) for relation, edge in touched])
+            self._db.commit()
+
+            edges = sum(len(graph.adjacency[relation][1]) for relation in RELATIONS)
+            if graph.delta_size() > max(self.min_compact, self.compact_ratio * edges):
+                self._compact()
+        return report
+
+    def compact(self):
+        """
+        Fold the pending delta into new base adjacency arrays.
+        """
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        generation = self._generation()
+        self.graph.compact()
+        self.graph.save_arrays(self._arrays_path(generation + 1))
+        self._db.execute("DELETE FROM delta")
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('generation', ?)", (str(generation + 1),))
+        self._db.commit()
+        if generation and os.path.exists(self._arrays_path(generation)):
+            os.remove(self._arrays_path(generation))
+
+    def changes(self, since=0, limit=None):
+        """
+        Read the change log.
+
+        Parameters:
+        - since: Only entries after this sequence number
+        - limit: Maximum number of entries
+
+        Returns:
+        - A list of {"seq", "key", "action", "added", "removed", "applied_at"} dicts, oldest first
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, key, action, added, removed, applied_at FROM changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (since, -1 if limit is None else limit)
+            ).fetchall()
+        return [dict(zip(("seq", "key", "action", "added", "removed", "applied_at"), row)) for row in rows]
@@ -0,0 +1,136 @@
+import hashlib
+import re
+
+from xavier_mind.cleaning.entity_recognition import normalize_text
+from xavier_mind.knowledge_integration.data_graph import institution_of, record_key
+from xavier_mind.profile_generator.rendering import compile_template, escape_markdown, render_pages
+
+PROFILE_TEMPLATE = """# {name}
+
+{details}
+
+## Research interests
+
+{interests}
+
+## Publications
+
+{publications}
+"""
+
+
+def slug(text, key):
+    # Readable file name plus a short hash of the record key, so namesakes do not collide
+    name = normalize_text(text).replace(" ", "-")[:80] or "unnamed"
+    return f"{name}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}"
+
+
+def paper_year(paper):
+    match = re.search(r"\b(?:19|20)\d{2}\b", str(paper.get("published") or paper.get("publication_date")
+                                                  or paper.get("journal_info") or ""))
+    return match.group(0) if match else None
+
+
+def cited_by(record):
+    # Scholar's "Cited by N" text, or the count once normalized
+    value = record.get("cited_by")
+    return None if value in (None, "") else re.sub(r"^Cited by ", "", str(value))
+
+
+def venue(paper):
+    # Journal title: ORCID "journal", Scopus "publication_name", Scholar's "journal_info" line
+    return paper.get("journal") or paper.get("publication_name") or paper.get("journal_info")
+
+
+def profile_path(profile):
+    key = record_key("profile", profile)
+    return f"researchers/{slug(profile['name'], key)}.md" if key and profile.get("name") else None
+
+
+def profile_context(profile):
+    """
+    Template fields of a researcher page.
+
+    Parameters:
+    - profile: A Scholar profile or Scopus author record, optionally with a 'papers' list
+    """
+    details = []
+    affiliation = profile.get("affiliation") or profile.get("affiliations")
+    if affiliation:
+        details.append(f"- **Affiliation:** {escape_markdown(affiliation)}")
+        institution = institution_of(affiliation)
+        if institution and institution != affiliation:
+            details.append(f"- **Institution:** {escape_markdown(institution)}")
+    if cited_by(profile):
+        details.append(f"- **Cited by:** {escape_markdown(cited_by(profile))}")
+    if profile.get("papers"):
+        details.append(f"- **Documents:** {len(profile['papers'])}")
+    if profile.get("link"):
+        details.append(f"- **Profile:** <{profile['link']}>")
+
+    interests = profile.get("interests")
+    if interests is None:
+        interests = profile.get("research_areas")
+    interests = [escape_markdown(interest) for interest in interests or () if interest]
+
+    publications = []
+    papers = sorted(profile.get("papers") or (), key=lambda paper: paper_year(paper) or "", reverse=True)
+    for paper in papers:
+        line = f"- {escape_markdown(paper.get('title') or 'Untitled')}"
+        year = paper_year(paper)
+        if year:
+            line += f" ({year})"
+        link = paper.get("link") or (f"https://doi.org/{paper['doi']}" if paper.get("doi") else None)
+        if link:
+            line += f" <{link}>"
+        publications.append(line)
+
+    return {
+        "name": escape_markdown(profile.get("name") or ""),
+        "details": "\n".join(details) or "_No details available._",
+        "interests": ", ".join(interests) or "_None listed._",
+        "publications": "\n".join(publications) or "_None found._",
+    }
+
+
+def profile_to_markdown(profile, template=PROFILE_TEMPLATE):
+    """
+    Render one researcher profile to Markdown.
+    """
+    return compile_template(template).render(profile_context(profile))
+
+
+def _with_papers(profiles, papers):
+    # Attach each researcher's papers, matched on the normalized author name
+    by_author = {}
+    for paper in papers:
+        authors = paper.get("authors")
+        for name in [authors] if isinstance(authors, str) else authors or ():
+            by_author.setdefault(normalize_text(name), []).append(
+                {field: paper.get(field) for field in ("title", "published", "publication_date", "journal_info",
+                                                       "doi", "link") if paper.get(field) is not None}
+            )
+    for profile in profiles:
+        yield dict(profile, papers=by_author.get(normalize_text(profile.get("name")), []))
+
+
+def render_profiles(profiles, output_dir, papers=None, template=PROFILE_TEMPLATE, workers=None, chunk_size=500,
+                    force=False):
+    """
+    Render researcher pages to output_dir/researchers/ in parallel, skipping profiles
+    whose data (and papers) did not change since the last run.
+
+    Parameters:
+    - profiles: Iterable of Scholar profile / Scopus author records
+    - output_dir: Root directory of the generated site
+    - papers: Optional iterable of paper records to list on their authors' pages
+    - template: Template text (see PROFILE_TEMPLATE)
+    - workers, chunk_size, force: See rendering.render_pages
+
+    Returns:
+    - A dict with the number of "rendered" and "unchanged" pages
+    """
+    if papers is not None:
+        profiles = _with_papers(profiles, papers)
+    return render_pages(profiles, output_dir, template, profile_context, profile_path, workers=workers,
+                        chunk_size=chunk_size, force=force)
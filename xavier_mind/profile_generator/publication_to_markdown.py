@@ -0,0 +1,77 @@
+from xavier_mind.knowledge_integration.data_graph import record_key
+from xavier_mind.profile_generator.profile_to_markdown import cited_by, paper_year, slug, venue
+from xavier_mind.profile_generator.rendering import compile_template, escape_markdown, render_pages
+
+PUBLICATION_TEMPLATE = """# {title}
+
+{details}
+
+## Authors
+
+{authors}
+
+## Abstract
+
+{summary}
+"""
+
+
+def publication_path(paper):
+    key = record_key("paper", paper)
+    return f"publications/{slug(paper['title'], key)}.md" if key and paper.get("title") else None
+
+
+def publication_context(paper):
+    """
+    Template fields of a publication page (arXiv, Scopus or Scholar paper record).
+    """
+    details = []
+    year = paper_year(paper)
+    if year:
+        details.append(f"- **Year:** {year}")
+    if venue(paper):
+        details.append(f"- **Published in:** {escape_markdown(venue(paper))}")
+    if paper.get("doi"):
+        details.append(f"- **DOI:** <https://doi.org/{paper['doi']}>")
+    if paper.get("id") and not paper.get("scopus_id"):
+        details.append(f"- **arXiv:** {escape_markdown(paper['id'])}")
+    if cited_by(paper):
+        details.append(f"- **Cited by:** {escape_markdown(cited_by(paper))}")
+    if paper.get("link"):
+        details.append(f"- **Link:** <{paper['link']}>")
+
+    authors = paper.get("authors")
+    authors = [authors] if isinstance(authors, str) else authors or ()
+    summary = paper.get("summary") or paper.get("abstract")
+    return {
+        "title": escape_markdown(paper.get("title") or ""),
+        "details": "\n".join(details) or "_No details available._",
+        "authors": "\n".join(f"- {escape_markdown(author)}" for author in authors if author) or "_Unknown._",
+        "summary": escape_markdown(summary) if summary else "_No abstract available._",
+    }
+
+
+def publication_to_markdown(paper, template=PUBLICATION_TEMPLATE):
+    """
+    Render one publication to Markdown.
+    """
+    return compile_template(template).render(publication_context(paper))
+
+
+def render_publications(papers, output_dir, template=PUBLICATION_TEMPLATE, workers=None, chunk_size=500,
+                        force=False):
+    """
+    Render publication pages to output_dir/publications/ in parallel, skipping papers
+    whose record did not change since the last run.
+
+    Parameters:
+    - papers: Iterable of paper records
+    - output_dir: Root directory of the generated site
+    - template: Template text (see PUBLICATION_TEMPLATE)
+    - workers, chunk_size, force: See rendering.render_pages
+
+    Returns:
+    - A dict with the number of "rendered" and "unchanged" pages
+    """
+    return render_pages(papers, output_dir, template, publication_context, publication_path, workers=workers,
+                        chunk_size=chunk_size, force=force)
@@ -0,0 +1,186 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import string
+import threading
+import time
+
+from xavier_telepath.parallel import map_chunks
+
+MARKDOWN_SPECIAL = re.compile(r"([\\`*_\[\]<>])")
+
+
+def escape_markdown(text):
+    return MARKDOWN_SPECIAL.sub(r"\\\1", " ".join(str(text).split()))
+
+
+class Template:
+    """
+    A Markdown template with str.format-style placeholders ("{name}", "{cited_by:>6}").
+
+    The text is parsed once into literal and field pieces, so rendering is a single
+    join over precomputed pieces.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        self._pieces = [(literal, field, spec or "") for literal, field, spec, _ in string.Formatter().parse(text)]
+
+    def render(self, context):
+        parts = []
+        for literal, field, spec in self._pieces:
+            parts.append(literal)
+            if field is not None:
+                parts.append(format(context[field], spec))
+        return "".join(parts)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(text):
+    """
+    Return the compiled Template for a template text, compiling each text once per process.
+    """
+    return Template(text)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_template(path, mtime):
+    with open(path, encoding="utf-8") as file:
+        return compile_template(file.read())
+
+
+def load_template(path):
+    """
+    Compile a template file, reusing the compiled template until the file changes.
+    """
+    return _load_template(path, os.stat(path).st_mtime_ns)
+
+
+def write_atomic(path, text):
+    # Readers of the output directory never see a half-written page
+    temporary = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    with open(temporary, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temporary, path)
+
+
+class RenderState:
+    """
+    Remembers the source hash of every rendered page, so unchanged pages can be skipped.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS pages (path TEXT PRIMARY KEY, hash TEXT, rendered_at REAL)")
+        self._db.commit()
+
+    def hashes(self, paths):
+        """
+        Returns:
+        - A dict of page path -> source hash of its last render, for the paths rendered before
+        """
+        found = {}
+        with self._lock:
+            for start in range(0, len(paths), 500):
+                batch = paths[start:start + 500]
+                found.update(self._db.execute(
+                    f"SELECT path, hash FROM pages WHERE path IN ({','.join('?' * len(batch))})", batch
+                ))
+        return found
+
+    def record(self, pages):
+        """
+        Parameters:
+        - pages: Iterable of (page path, source hash) pairs that were just written
+        """
+        now = time.time()
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)",
+                                 [(path, digest, now) for path, digest in pages])
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM pages")
+            self._db.commit()
+
+
+def source_hash(template, record):
+    # A page depends on its record and on the template it is rendered with
+    data = json.dumps(record, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(f"{template.digest}\n{data}".encode("utf-8")).hexdigest()
+
+
+_worker = {}
+
+
+def _init_worker(template_text, context, path_of, output_dir, state_path, force):
+    # Runs once per worker process: the template is compiled here, not per page
+    _worker.update(template=compile_template(template_text), context=context, path_of=path_of,
+                   output_dir=output_dir, state=None if force else RenderState(state_path), directories=set())
+
+
+def _render_chunk(records):
+    template, context, path_of = _worker["template"], _worker["context"], _worker["path_of"]
+    pages = []
+    for record in records:
+        path = path_of(record)
+        if path:
+            pages.append((path, source_hash(template, record), record))
+    previous = _worker["state"].hashes([path for path, _, _ in pages]) if _worker["state"] else {}
+
+    written = []
+    for path, digest, record in pages:
+        full_path = os.path.join(_worker["output_dir"], path)
+        if previous.get(path) == digest and os.path.exists(full_path):
+            continue
+        directory = os.path.dirname(full_path)
+        if directory not in _worker["directories"]:
+            os.makedirs(directory, exist_ok=True)
+            _worker["directories"].add(directory)
+        write_atomic(full_path, template.render(context(record)))
+        written.append((path, digest))
+    return written, len(pages) - len(written)
+
+
+def render_pages(records, output_dir, template_text, context, path_of, workers=None, chunk_size=500, force=False):
+    """
+    Render records to Markdown pages across a process pool.
+
+    Records are sent to the workers in chunks; each worker compiles the template once,
+    hashes every record together with the template, skips pages whose hash matches the
+    last render and writes the others with atomic renames. Records are consumed lazily,
+    so the input can be a generator over a large store.
+
+    Parameters:
+    - records: Iterable of JSON-serializable record dicts
+    - output_dir: Root directory of the generated pages
+    - template_text: Template source (see Template)
+    - context: Module-level function record -> dict of template fields
+    - path_of: Module-level function record -> page path relative to output_dir (None to skip)
+    - workers: Number of worker processes (default: one per core)
+    - chunk_size: Records per task sent to a worker
+    - force: Render every page even if its source did not change
+
+    Returns:
+    - A dict with the number of "rendered" and "unchanged" pages
+    """
+    state = RenderState(os.path.join(output_dir, ".render_state.sqlite"))
+    report = {"rendered": 0, "unchanged": 0}
+    results = map_chunks(_render_chunk, records, chunk_size, workers=workers, initializer=_init_worker,
+                         initargs=(template_text, context, path_of, output_dir, state.path, force))
+    for _, (written, unchanged) in results:
+        state.record(written)
+        report["rendered"] += len(written)
+        report["unchanged"] += unchanged
+    return report
@@ -0,0 +1,3 @@
+from xavier_oracle.api.routes import main
+
+main()
@@ -1 +1,388 @@
+import json
+import os
+import re
+import threading
+import zlib
 
+import numpy as np
+
+from xavier_mind.cleaning.entity_recognition import normalize_text
+from xavier_mind.knowledge_integration.data_graph import _names, _spans
+from xavier_telepath.storage.data_storage import _data_dir
+
+TOKEN = re.compile(r"[a-z][a-z0-9-]+")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just let may me might more most
+must my myself no nor not now of off on once only or other our ours ourselves out over own same shall she
+should so some such than that the their theirs them themselves then there these they this those through to
+too under until up upon us very was we were what when where which while who whom why will with within
+without would you your yours yourself yourselves via using use used based show shows shown paper study
+studies results result new approach present presents propose proposed also however thus
+""".split())
+
+# Words that describe what is asked for rather than the topic ("quantum gravity professors in Europe")
+QUERY_WORDS = frozenset("""
+professor professors researcher researchers scientist scientists people person group groups lab labs
+supervisor supervisors advisor advisors faculty student students position positions phd postdoc
+paper papers article articles publication publications find looking search working works work
+""".split())
+
+_token_hashes = {}
+
+
+def token_hashes(text, stopwords=STOPWORDS):
+    """
+    CRC32 hashes of the words of a text (stable across processes, unlike hash()).
+    """
+    hashes = []
+    for token in TOKEN.findall((text or "").lower()):
+        if token in stopwords:
+            continue
+        value = _token_hashes.get(token)
+        if value is None:
+            value = _token_hashes[token] = zlib.crc32(token.encode("utf-8"))
+        hashes.append(value)
+    return hashes
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class HashingEmbedder:
+    """
+    TF-IDF vectors over hashed words, folded into a fixed number of signed dimensions
+    (feature hashing), so cosine similarity approximates TF-IDF cosine similarity.
+    Needs no model and no GPU; fit() only counts document frequencies.
+
+    The 32-bit word hash is split into the document-frequency bucket (low 20 bits),
+    the dimension (bits 20-30) and the sign (bit 31).
+    """
+
+    kind = "hashing"
+
+    def __init__(self, dim=512, idf=None):
+        """
+        Parameters:
+        - dim: Number of dimensions, a power of two up to 2048
+        - idf: Inverse document frequencies of the 2^20 buckets (set by fit())
+        """
+        if dim & (dim - 1) or not 0 < dim <= 2048:
+            raise ValueError("dim must be a power of two up to 2048")
+        self.dim = dim
+        self.buckets = 1 << 20
+        self.idf = idf
+
+    def config(self):
+        return {"kind": self.kind, "dim": self.dim}
+
+    def fit(self, texts):
+        document_frequency = np.zeros(self.buckets, dtype=np.int64)
+        count = 0
+        for text in texts:
+            document_frequency[np.unique(np.fromiter(token_hashes(text), dtype=np.int64) & (self.buckets - 1))] += 1
+            count += 1
+        self.idf = (np.log((1 + count) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self
+
+    def embed(self, texts, stopwords=STOPWORDS):
+        """
+        Returns:
+        - A float32 array of L2-normalized vectors, one row per text
+        """
+        rows, hashes = [], []
+        count = 0
+        for row, text in enumerate(texts):
+            text_hashes = token_hashes(text, stopwords)
+            hashes.extend(text_hashes)
+            rows.extend([row] * len(text_hashes))
+            count = row + 1
+        if not count:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        # Term frequencies per (row, word) through one sort instead of a dict per text
+        keys = np.sort((np.array(rows, dtype=np.int64) << 32) | np.array(hashes, dtype=np.int64))
+        first = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1]))) if len(keys) else keys
+        frequency = np.diff(np.append(first, len(keys)))
+        keys = keys[first]
+        rows, hashes = keys >> 32, keys & 0xFFFFFFFF
+
+        weights = (1 + np.log(frequency)) * self.idf[hashes & (self.buckets - 1)]
+        weights = np.where(hashes >> 31, -weights, weights)
+        columns = (hashes >> 20) & (self.dim - 1)
+        vectors = np.bincount(rows * self.dim + columns, weights=weights, minlength=count * self.dim)
+        return _normalize(vectors.reshape(count, self.dim).astype(np.float32))
+
+    def embed_query(self, query):
+        return self.embed([query], stopwords=STOPWORDS | QUERY_WORDS)[0]
+
+
+class SentenceEmbedder:
+    """
+    Dense sentence embeddings computed on the CPU with sentence-transformers.
+    """
+
+    kind = "sentence"
+
+    def __init__(self, model="all-MiniLM-L6-v2", batch_size=64):
+        # Imported here: sentence-transformers loads torch, which the default hashing embedder never needs
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError("SentenceEmbedder requires sentence-transformers "
+                              "(pip install sentence-transformers)") from None
+        self.model_name = model
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def config(self):
+        return {"kind": self.kind, "dim": self.dim, "model": self.model_name}
+
+    def fit(self, texts):
+        return self
+
+    def embed(self, texts):
+        return self.model.encode(list(texts), batch_size=self.batch_size, normalize_embeddings=True,
+                                 convert_to_numpy=True).astype(np.float32)
+
+    def embed_query(self, query):
+        return self.embed([query])[0]
+
+
+def _assign(vectors, centroids, batch_size=8192):
+    # Nearest centroid (highest cosine) of every vector, in batches to bound memory
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), batch_size):
+        batch = np.asarray(vectors[start:start + batch_size], dtype=np.float32)
+        assignment[start:start + batch_size] = (batch @ centroids.T).argmax(axis=1)
+    return assignment
+
+
+def _kmeans(vectors, lists, sample=100000, iterations=10, seed=0):
+    # Spherical k-means on a sample of the vectors
+    rng = np.random.default_rng(seed)
+    picks = np.sort(rng.choice(len(vectors), min(sample, len(vectors)), replace=False))
+    data = np.asarray(vectors[picks], dtype=np.float32)
+    centroids = data[rng.choice(len(data), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = _assign(data, centroids)
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=lists)
+        filled = np.flatnonzero(counts)
+        sums = np.add.reduceat(data[order], np.concatenate(([0], np.cumsum(counts[filled])[:-1])), axis=0)
+        centroids[filled] = _normalize(sums)
+        # Empty lists are restarted from random sample points
+        empty = np.flatnonzero(counts == 0)
+        centroids[empty] = data[rng.choice(len(data), len(empty), replace=False)]
+    return centroids
+
+
+class SemanticIndex:
+    """
+    On-disk vector index over paper titles and abstracts, searched approximately.
+
+    Vectors are grouped into inverted lists around k-means centroids (IVF); a query
+    scores the centroids and then only the vectors of the nprobe closest lists. Every
+    array is a .npy file opened memory-mapped, so opening the index is instant and only
+    the probed lists are read. Paper metadata sits in a JSON lines file with an offsets
+    array, and paper -> author ids in CSR arrays for per-author aggregation.
+    """
+
+    META_FIELDS = ("id", "doi", "title", "link", "published", "journal_info")
+
+    def __init__(self, directory, nprobe=24):
+        """
+        Parameters:
+        - directory: Directory written by SemanticIndex.build
+        - nprobe: Default number of inverted lists scanned per query
+        """
+        self.directory = directory
+        self.nprobe = nprobe
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as file:
+            self.meta = json.load(file)
+        config = self.meta["embedder"]
+        if config["kind"] == "sentence":
+            self.embedder = SentenceEmbedder(config["model"])
+        else:
+            self.embedder = HashingEmbedder(config["dim"], idf=np.load(os.path.join(directory, "idf.npy")))
+
+        def array(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+        self.centroids = np.load(os.path.join(directory, "centroids.npy"))
+        self.lists = np.load(os.path.join(directory, "lists.npy"))
+        self.vectors = array("vectors")
+        self.rows = array("rows")
+        self.paper_offsets = array("paper_offsets")
+        self.author_offsets = array("author_offsets")
+        self.paper_authors = array("paper_authors")
+        with open(os.path.join(directory, "authors.json"), encoding="utf-8") as file:
+            self.authors = json.load(file)
+        self._papers = open(os.path.join(directory, "papers.jsonl"), "rb")
+        self._papers_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def build(cls, records, directory, embedder=None, lists=None, batch_size=10000):
+        """
+        Build an index from paper records, entirely offline on the CPU.
+
+        Parameters:
+        - records: Iterable of paper dicts ('title', 'summary' or 'abstract', 'authors', ids)
+        - directory: Output directory (existing index files are replaced)
+        - embedder: HashingEmbedder (default) or SentenceEmbedder
+        - lists: Number of inverted lists (default: about 2 * sqrt(number of papers))
+        - batch_size: Papers embedded per batch
+
+        Returns:
+        - The opened SemanticIndex
+        """
+        embedder = embedder or HashingEmbedder()
+        os.makedirs(directory, exist_ok=True)
+
+        def path(name):
+            return os.path.join(directory, name)
+
+        texts, offsets, author_ids, author_offsets = [], [0], [], [0]
+        authors = {}
+        author_names = []
+        with open(path("papers.jsonl"), "wb") as papers:
+            for record in records:
+                title = record.get("title") or ""
+                summary = record.get("summary") or record.get("abstract") or ""
+                if not title and not summary:
+                    continue
+                texts.append(f"{title}. {summary}")
+                meta = {field: record[field] for field in cls.META_FIELDS if record.get(field)}
+                offsets.append(offsets[-1] + papers.write((json.dumps(meta, ensure_ascii=False) + "\n").encode("utf-8")))
+                for name in _names(record.get("authors")):
+                    key = normalize_text(name)
+                    if key:
+                        if key not in authors:
+                            authors[key] = len(author_names)
+                            author_names.append(name)
+                        author_ids.append(authors[key])
+                author_offsets.append(len(author_ids))
+        if not texts:
+            raise ValueError("No records with a title or abstract to index")
+
+        embedder.fit(texts)
+        count = len(texts)
+        unsorted = np.lib.format.open_memmap(path("vectors.tmp.npy"), mode="w+", dtype=np.float16,
+                                             shape=(count, embedder.dim))
+        for start in range(0, count, batch_size):
+            unsorted[start:start + batch_size] = embedder.embed(texts[start:start + batch_size])
+        del texts
+
+        lists = min(lists or max(1, int(2 * count ** 0.5)), count)
+        centroids = _kmeans(unsorted, lists)
+        assignment = _assign(unsorted, centroids)
+        order = np.argsort(assignment, kind="stable")
+        vectors = np.lib.format.open_memmap(path("vectors.npy"), mode="w+", dtype=np.float16,
+                                            shape=(count, embedder.dim))
+        for start in range(0, count, batch_size):
+            vectors[start:start + batch_size] = unsorted[order[start:start + batch_size]]
+        vectors.flush()
+        del vectors, unsorted
+        os.remove(path("vectors.tmp.npy"))
+
+        list_offsets = np.zeros(lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=lists), out=list_offsets[1:])
+        np.save(path("centroids.npy"), centroids.astype(np.float32))
+        np.save(path("lists.npy"), list_offsets)
+        np.save(path("rows.npy"), order.astype(np.int32))
+        np.save(path("paper_offsets.npy"), np.array(offsets, dtype=np.int64))
+        np.save(path("paper_authors.npy"), np.array(author_ids, dtype=np.int32))
+        np.save(path("author_offsets.npy"), np.array(author_offsets, dtype=np.int64))
+        if embedder.kind == "hashing":
+            np.save(path("idf.npy"), embedder.idf)
+        with open(path("authors.json"), "w", encoding="utf-8") as file:
+            json.dump(author_names, file, ensure_ascii=False)
+        with open(path("meta.json"), "w", encoding="utf-8") as file:
+            json.dump({"embedder": embedder.config(), "papers": count, "lists": lists}, file)
+        return cls(directory)
+
+    @classmethod
+    def build_from_store(cls, store, directory, embedder=None, sources=None, lists=None):
+        """
+        Build an index over the papers of the record store, streaming record batches.
+        """
+        columns = ["id", "doi", "title", "summary", "authors", "link", "published", "journal_info"]
+        dataset = store.dataset("papers")
+        if sources:
+            import pyarrow.dataset as ds
+            batches = dataset.to_batches(columns=columns, filter=ds.field("source").isin(list(sources)))
+        else:
+            batches = dataset.to_batches(columns=columns)
+        records = (record for batch in batches for record in batch.to_pylist())
+        return cls.build(records, directory, embedder=embedder, lists=lists)
+
+    def search_vectors(self, vector, k=10, nprobe=None):
+        """
+        Approximate nearest papers of a query vector.
+
+        Returns:
+        - (paper numbers, cosine scores) arrays, best first
+        """
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        probed = np.sort(np.argpartition(-(self.centroids @ vector), nprobe - 1)[:nprobe])
+        positions, _ = _spans(self.lists[probed], self.lists[probed + 1])
+        if not len(positions):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        scores = np.asarray(self.vectors[positions], dtype=np.float32) @ vector
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return np.asarray(self.rows[positions[best]], dtype=np.int64), scores[best]
+
+    def search(self, query, k=10, nprobe=None):
+        """
+        Papers most similar to a free-text query.
+
+        Returns:
+        - A list of paper dicts (metadata plus 'score'), best first
+        """
+        papers, scores = self.search_vectors(self.embedder.embed_query(query), k, nprobe)
+        return [dict(self.paper(paper), score=float(score)) for paper, score in zip(papers, scores)]
+
+    def paper(self, number):
+        start, end = self.paper_offsets[number], self.paper_offsets[number + 1]
+        with self._papers_lock:
+            self._papers.seek(int(start))
+            line = self._papers.read(int(end - start))
+        return json.loads(line)
+
+    def authors_of(self, papers):
+        """
+        Author ids of several papers at once.
+
+        Returns:
+        - (author ids, index into papers of the paper each id belongs to)
+        """
+        papers = np.asarray(papers, dtype=np.int64)
+        positions, lengths = _spans(self.author_offsets[papers], self.author_offsets[papers + 1])
+        return np.asarray(self.paper_authors[positions], dtype=np.int64), np.repeat(np.arange(len(papers)), lengths)
+
+    def close(self):
+        self._papers.close()
+
+
+_default_index = None
+
+
+def get_default_index():
+    """
+    Return the process-wide semantic index, kept under $XAVIER_DATA_DIR/semantic_index
+    (default: ~/.local/share/xavier_telepath/semantic_index).
+    """
+    global _default_index
+    if _default_index is None:
+        _default_index = SemanticIndex(os.path.join(_data_dir(), "semantic_index"))
+    return _default_index
@@ -0,0 +1,186 @@
+import asyncio
+import collections
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from xavier_mind.cleaning.entity_recognition import normalize_text
+from xavier_telepath.storage.data_storage import _data_dir
+
+
+class ResultCache:
+    """
+    In-process LRU cache with a time-to-live that also coalesces concurrent misses.
+
+    The first request for a key starts the computation in an executor; identical
+    requests arriving while it runs wait for that same computation instead of starting
+    their own. Results are cached once computed, even if the requests that asked for
+    them were cancelled; failures are not cached. Must be used from a single event loop.
+    """
+
+    def __init__(self, maxsize=4096, ttl=600):
+        """
+        Parameters:
+        - maxsize: Maximum number of cached results
+        - ttl: Seconds a result stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_compute(self, key, compute, executor=None):
+        """
+        Return the cached result for a key, computing it at most once at a time.
+
+        Parameters:
+        - key: Hashable cache key
+        - compute: Blocking function without arguments, run in the executor on a miss
+        - executor: concurrent.futures executor (default: the loop's default executor)
+        """
+        entry = self.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry[1]
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            pending = asyncio.get_running_loop().run_in_executor(executor, compute)
+            self._pending[key] = pending
+            pending.add_done_callback(lambda future: self._finish(key, future))
+        # Shielded so a client disconnecting does not cancel the computation for the others
+        return await asyncio.shield(pending)
+
+    def _finish(self, key, future):
+        self._pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.put(key, future.result())
+
+    def stats(self):
+        return {"entries": len(self._entries), "in_flight": len(self._pending), "hits": self.hits,
+                "misses": self.misses, "coalesced": self.coalesced}
+
+
+class OracleService:
+    """
+    Backend of the Oracle API: researcher search, profiles, recommendations and paper search.
+
+    Every query runs in a thread pool behind a shared ResultCache, so bursts of the same
+    query (a popular professor, a trending topic) are computed once. List results are
+    computed up to max_results once and paginated from the cache.
+    """
+
+    def __init__(self, index=None, graph=None, cache=None, workers=None, max_results=200):
+        """
+        Parameters:
+        - index: SemanticIndex (default: the shared one, opened on first use)
+        - graph: KnowledgeGraph (default: the one kept by GraphUpdater under $XAVIER_DATA_DIR/graph)
+        - cache: ResultCache shared by all endpoints
+        - workers: Threads running queries
+        - max_results: Results computed per list query
+        """
+        self._index = index
+        self._graph = graph
+        self._lock = threading.Lock()
+        self.cache = cache or ResultCache()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="oracle")
+        self.max_results = max_results
+
+    def index(self):
+        with self._lock:
+            if self._index is None:
+                from xavier_oracle.ai.query_processing import get_default_index
+                self._index = get_default_index()
+            return self._index
+
+    def graph(self):
+        with self._lock:
+            if self._graph is None:
+                from xavier_mind.knowledge_integration.data_graph import GraphUpdater
+                self._graph = GraphUpdater(os.path.join(_data_dir(), "graph")).graph
+            return self._graph
+
+    def _cached(self, key, compute):
+        return self.cache.get_or_compute(key, compute, self.executor)
+
+    async def search_researchers(self, query):
+        """
+        Researchers whose name contains every word of the query.
+        """
+        words = normalize_text(query).split()
+
+        def compute():
+            graph = self.graph()
+            labels = graph.labels["researcher"]
+            matches = []
+            for key, node in graph.ids["researcher"].items():
+                if all(word in key for word in words):
+                    matches.append({"name": labels[node]})
+                    if len(matches) >= self.max_results:
+                        break
+            return matches
+
+        return await self._cached(("researchers", tuple(words)), compute)
+
+    async def researcher(self, name):
+        """
+        Profile of one researcher: papers, co-authors, institutions and interests.
+
+        Raises:
+        - KeyError if the researcher is unknown
+        """
+        def compute():
+            graph = self.graph()
+            around = graph.neighborhood("researcher", name, hops=1)
+            return {
+                "name": graph.labels["researcher"][graph._id("researcher", name)],
+                "institutions": around.get("institution", []),
+                "interests": around.get("interest", []),
+                "papers": graph.papers_of(name),
+                "coauthors": [{"name": coauthor, "shared_papers": shared}
+                              for coauthor, shared in graph.coauthors(name, limit=50)],
+            }
+
+        return await self._cached(("researcher", normalize_text(name)), compute)
+
+    async def recommend(self, query):
+        """
+        Researchers recommended for a topic (see recommendation_engine.recommend_researchers).
+        """
+        from xavier_oracle.services.recommendation_engine import recommend_researchers
+
+        return await self._cached(("recommend", normalize_text(query)),
+                                  lambda: recommend_researchers(query, k=self.max_results, index=self.index()))
+
+    async def search_papers(self, query):
+        return await self._cached(("papers", normalize_text(query)),
+                                  lambda: self.index().search(query, k=self.max_results))
+
+    def stats(self):
+        return {"cache": self.cache.stats()}
+
+    def close(self):
+        self.executor.shutdown(wait=False)
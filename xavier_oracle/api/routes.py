@@ -0,0 +1,223 @@
+"""
+Oracle HTTP API.
+
+Usage:
+    python -m xavier_oracle [--host HOST] [--port PORT] [--workers N] [--cache-size N] [--cache-ttl SECONDS]
+
+Endpoints (GET, JSON):
+    /researchers?q=NAME[&page=N&page_size=N]       Researchers by name
+    /researchers/NAME                               Profile of one researcher
+    /recommendations?q=TOPIC[&page=N&page_size=N]   Researchers recommended for a topic
+    /papers?q=TOPIC[&page=N&page_size=N]            Papers nearest to a topic
+    /stats                                          Cache statistics
+"""
+import argparse
+import asyncio
+import json
+import re
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlencode, urlsplit
+
+from xavier_oracle.api.handlers import OracleService, ResultCache
+
+# Path pattern -> (OracleService method, whether the result is a paginated list)
+ROUTES = [
+    (re.compile(r"^/researchers$"), "search_researchers", True),
+    (re.compile(r"^/researchers/(?P<name>[^/]+)$"), "researcher", False),
+    (re.compile(r"^/recommendations$"), "recommend", True),
+    (re.compile(r"^/papers$"), "search_papers", True),
+    (re.compile(r"^/stats$"), "stats", False),
+]
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class OracleServer:
+    """
+    Minimal asyncio HTTP/1.1 server for the Oracle API.
+
+    Connections are kept alive between requests. List endpoints are paginated and
+    streamed with chunked transfer encoding, one result per chunk, so large pages
+    start arriving before they are fully serialized.
+    """
+
+    def __init__(self, service=None, host="127.0.0.1", port=8000, page_size=20, max_page_size=100,
+                 idle_timeout=30, max_body_size=1 << 16):
+        self.service = service or OracleService()
+        self.host = host
+        self.port = port
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.idle_timeout = idle_timeout
+        # No endpoint reads a request body; larger ones are refused rather than read
+        self.max_body_size = max_body_size
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.service.close()
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                        ConnectionError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.split(" ")
+                except ValueError:
+                    await self._send_json(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}, False)
+                    break
+                length = headers.get("content-length", "0") or "0"
+                if not re.fullmatch(r"[0-9]+", length):
+                    await self._send_json(writer, HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}, False)
+                    break
+                if int(length) > self.max_body_size:
+                    await self._send_json(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                          {"error": f"Request body larger than {self.max_body_size} bytes"}, False)
+                    break
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                # Request bodies are not used by any endpoint, but must be consumed to keep the connection usable
+                if int(length):
+                    try:
+                        await asyncio.wait_for(reader.readexactly(int(length)), self.idle_timeout)
+                    except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                        break
+                await self._handle(writer, method, target, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, writer, method, target, keep_alive):
+        try:
+            if method != "GET":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+            url = urlsplit(target)
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            for pattern, name, paginated in ROUTES:
+                match = pattern.match(url.path)
+                if match:
+                    break
+            else:
+                raise HTTPError(HTTPStatus.NOT_FOUND)
+
+            if name == "stats":
+                await self._send_json(writer, HTTPStatus.OK, self.service.stats(), keep_alive)
+            elif not paginated:
+                try:
+                    result = await getattr(self.service, name)(unquote(match.group("name")))
+                except KeyError as e:
+                    raise HTTPError(HTTPStatus.NOT_FOUND, str(e.args[0]) if e.args else None)
+                await self._send_json(writer, HTTPStatus.OK, result, keep_alive)
+            else:
+                query = params.get("q", "").strip()
+                if not query:
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, "Missing query parameter 'q'")
+                page, page_size = self._paging(params)
+                results = await getattr(self.service, name)(query)
+                await self._send_page(writer, url.path, params, results, page, page_size, keep_alive)
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {"error": str(e)}, keep_alive)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            await self._send_json(writer, HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"},
+                                  keep_alive)
+
+    def _paging(self, params):
+        try:
+            page = int(params.get("page", 1))
+            page_size = int(params.get("page_size", self.page_size))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "page and page_size must be integers")
+        if page < 1 or not 0 < page_size <= self.max_page_size:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"page must be >= 1 and page_size in 1..{self.max_page_size}")
+        return page, page_size
+
+    @staticmethod
+    def _head(status, keep_alive, extra):
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}", "Content-Type: application/json; charset=utf-8",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"] + extra
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(self._head(status, keep_alive, [f"Content-Length: {len(body)}"]) + body)
+        await writer.drain()
+
+    async def _send_page(self, writer, path, params, results, page, page_size, keep_alive):
+        start = (page - 1) * page_size
+        items = results[start:start + page_size]
+        next_page = None
+        if start + page_size < len(results):
+            next_page = f"{path}?{urlencode(dict(params, page=page + 1, page_size=page_size))}"
+
+        def chunk(data):
+            return f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n"
+
+        writer.write(self._head(HTTPStatus.OK, keep_alive, ["Transfer-Encoding: chunked"]))
+        header = {"page": page, "page_size": page_size, "total": len(results), "next": next_page}
+        writer.write(chunk(json.dumps(header, ensure_ascii=False)[:-1].encode("utf-8") + b', "results": ['))
+        for position, item in enumerate(items):
+            writer.write(chunk((b", " if position else b"") + json.dumps(item, ensure_ascii=False).encode("utf-8")))
+            await writer.drain()
+        writer.write(chunk(b"]}") + b"0\r\n\r\n")
+        await writer.drain()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Xavier Oracle API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, help="Threads running queries (default: based on the core count)")
+    parser.add_argument("--cache-size", type=int, default=4096, help="Cached query results")
+    parser.add_argument("--cache-ttl", type=float, default=600, help="Seconds a cached result stays valid")
+    args = parser.parse_args(argv)
+
+    service = OracleService(cache=ResultCache(args.cache_size, args.cache_ttl), workers=args.workers)
+    server = OracleServer(service, args.host, args.port)
+
+    async def run():
+        await server.start()
+        print(f"Xavier Oracle listening on http://{server.host}:{server.port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
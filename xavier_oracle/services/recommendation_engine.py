@@ -0,0 +1,62 @@
+import numpy as np
+
+from xavier_oracle.ai.query_processing import get_default_index
+
+
+def recommend_researchers(query, k=10, index=None, candidates=1000, per_author=3, nprobe=None):
+    """
+    Researchers whose papers best match a free-text query such as "quantum gravity".
+
+    The query's nearest papers are looked up in the semantic index; every author of a
+    candidate paper is scored by the sum of the scores of their per_author best
+    candidates, so researchers with several strongly matching papers rank above
+    authors of a single lucky hit.
+
+    Parameters:
+    - query: Free-text query
+    - k: Number of researchers to return
+    - index: SemanticIndex to search (defaults to the shared one)
+    - candidates: Number of nearest papers considered
+    - per_author: Number of best papers counted per researcher
+    - nprobe: Inverted lists scanned (see SemanticIndex.search_vectors)
+
+    Returns:
+    - A list of {"name", "score", "papers"} dicts, best first; "papers" holds the
+      matching papers' metadata with their scores
+    """
+    index = index or get_default_index()
+    papers, scores = index.search_vectors(index.embedder.embed_query(query), candidates, nprobe)
+    if not len(papers):
+        return []
+    authors, owners = index.authors_of(papers)
+    if not len(authors):
+        return []
+
+    # Candidates come best first, so within one author a lower owner index is a better paper
+    order = np.lexsort((owners, authors))
+    authors, owners = authors[order], owners[order]
+    starts = np.flatnonzero(np.concatenate(([True], authors[1:] != authors[:-1])))
+    rank = np.arange(len(authors)) - np.repeat(starts, np.diff(np.append(starts, len(authors))))
+    keep = rank < per_author
+    authors, owners = authors[keep], owners[keep]
+    starts = np.flatnonzero(np.concatenate(([True], authors[1:] != authors[:-1])))
+    totals = np.add.reduceat(scores[owners], starts)
+
+    ends = np.append(starts[1:], len(authors))
+    results = []
+    for group in np.argsort(-totals, kind="stable")[:k]:
+        matched = owners[starts[group]:ends[group]]
+        results.append({
+            "name": index.authors[authors[starts[group]]],
+            "score": float(totals[group]),
+            "papers": [dict(index.paper(papers[owner]), score=float(scores[owner])) for owner in matched],
+        })
+    return results
+
+
+def similar_papers(query, k=10, index=None, nprobe=None):
+    """
+    Papers nearest to a free-text query (see SemanticIndex.search).
+    """
+    index = index or get_default_index()
+    return index.search(query, k, nprobe)
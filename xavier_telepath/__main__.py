@@ -0,0 +1,3 @@
+from xavier_telepath.cli import main
+
+main()
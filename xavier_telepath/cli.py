@@ -0,0 +1,280 @@
+"""
+Command line interface of Xavier Telepath.
+
+Usage:
+    python -m xavier_telepath arxiv search QUERY [--field FIELD] [--subject SUBJECT] [--limit N]
+    python -m xavier_telepath arxiv harvest CATEGORY [--from YYYY-MM-DD] [--until YYYY-MM-DD] [--state PATH]
+    python -m xavier_telepath scopus articles QUERY [--field FIELD] [--subject SUBJECT] [--limit N]
+    python -m xavier_telepath scopus people QUERY [--limit N]
+    python -m xavier_telepath scholar professors UNIVERSITY [--label LABEL] [--pages N]
+    python -m xavier_telepath scholar articles FIELD [--pages N]
+    python -m xavier_telepath scholar author NAME [--pages N]
+    python -m xavier_telepath crawl MANIFEST.json [--workers N]
+    python -m xavier_telepath orcid ingest DUMP.tar.gz [...] [--workers N] [--limit N] [--store]
+    python -m xavier_telepath orcid lookup [ORCID ...] [--doi DOI] [--arxiv ID] [--eid EID]
+    python -m xavier_telepath reparse [--kind KIND ...] [--since DATE] [--until DATE] [--out ROOT] [--dry-run]
+
+Options placed before the subcommand apply to all of them:
+    --metrics PATH                Write request/parse/write metrics on exit (.prom: Prometheus text, else JSON)
+    --metrics-port PORT           Serve /metrics and /metrics.json while the command runs
+    --profile {cprofile,sample}   Profile the command (each task of a crawl separately)
+
+Records are written as JSON lines to stdout, or to --out (.csv or .jsonl), and/or
+appended to the record store with --store. Scrapers and their dependencies are only
+imported by the subcommand that uses them, so the CLI starts quickly.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+
+
+def _arxiv_search(args):
+    from xavier_telepath.scrapers.arxiv import ArxivAPI
+
+    arxiv = ArxivAPI(max_results=min(args.limit or 2000, 2000))
+    return "papers", "arxiv", arxiv.iter_search(args.field, args.query, args.subject, limit=args.limit)
+
+
+def _arxiv_harvest(args):
+    from xavier_telepath.scrapers.arxiv import ArxivOAIHarvester
+
+    harvester = ArxivOAIHarvester(state_path=args.state)
+    return "papers", "arxiv", harvester.harvest(args.category, args.from_date, args.until_date)
+
+
+def _scopus(args):
+    from xavier_telepath.scrapers.scopus import ScopusAPI
+
+    api_key = args.api_key or os.environ.get("SCOPUS_API_KEY")
+    if not api_key:
+        raise SystemExit("A Scopus API key is required (--api-key or $SCOPUS_API_KEY)")
+    return ScopusAPI(api_key)
+
+
+def _scopus_articles(args):
+    records = _scopus(args).iter_articles(args.field, args.query, args.subject, limit=args.limit)
+    return "papers", "scopus", records
+
+
+def _scopus_people(args):
+    return "authors", "scopus", _scopus(args).iter_people(args.query, limit=args.limit)
+
+
+def _scholar():
+    from xavier_telepath.scrapers.google_scholar import GoogleScholar
+
+    return GoogleScholar()
+
+
+def _scholar_professors(args):
+    return "profiles", "scholar", _scholar().findProfessorByUniversity(args.label, args.university, args.pages)
+
+
+def _scholar_articles(args):
+    return "papers", "scholar", _scholar().findArticleByField(args.field, args.pages)
+
+
+def _scholar_author(args):
+    return "papers", "scholar", _scholar().findArticleByProfessorName(args.name, args.pages)
+
+
+def _crawl(args):
+    from xavier_telepath.data_collectors.web_crawler import CrawlPlanner
+    from xavier_telepath.storage.data_storage import get_default_store
+
+    with open(args.manifest, encoding="utf-8") as file:
+        manifest = json.load(file)
+    planner = CrawlPlanner(workers=args.workers, store=get_default_store(), profile=args.profile)
+    planner.run(manifest)
+    json.dump(planner.progress(), sys.stdout, indent=2, default=str)
+    print()
+
+
+def _orcid_ingest(args):
+    from xavier_telepath.scrapers.orcid import ingest_dump
+
+    store = None
+    if args.store:
+        from xavier_telepath.storage.data_storage import get_default_store
+        store = get_default_store()
+    report = ingest_dump(args.dumps, store=store, workers=args.workers, limit=args.limit)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+def _orcid_lookup(args):
+    from xavier_telepath.scrapers.orcid import get_default_orcid_lookup
+
+    lookup = get_default_orcid_lookup()
+    orcids = list(args.orcids)
+    for id_type in ("doi", "arxiv", "eid"):
+        for value in getattr(args, id_type) or []:
+            orcids.extend(lookup.authors_of(id_type, value))
+    for orcid in dict.fromkeys(orcids):
+        profile = lookup.get(orcid)
+        print(json.dumps(profile if profile else {"orcid": orcid, "error": "not found"}, ensure_ascii=False))
+
+
+def _open_writer(path):
+    # Returns (write(record), close()) for stdout / a JSON lines file / a CSV file
+    if path and path.endswith(".csv"):
+        file = open(path, "w", newline="", encoding="utf-8")
+        state = {}
+
+        def write(record):
+            row = {key: " / ".join(map(str, value)) if isinstance(value, list) else value
+                   for key, value in record.items()}
+            if "writer" not in state:
+                # Columns come from the first record, as in the scrapers' own CSV exports
+                state["writer"] = csv.DictWriter(file, fieldnames=list(row), extrasaction="ignore")
+                state["writer"].writeheader()
+            state["writer"].writerow(row)
+
+        return write, file.close
+    file = open(path, "w", encoding="utf-8") if path else sys.stdout
+
+    def write(record):
+        file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    return write, (file.close if path else file.flush)
+
+
+def _emit(kind, source, records, args):
+    write, close = _open_writer(args.out) if args.out or not args.store else (None, None)
+    count = 0
+
+    def written():
+        nonlocal count
+        for record in records or ():
+            count += 1
+            if write:
+                write(record)
+            yield record
+
+    try:
+        if args.store:
+            from xavier_telepath.storage.data_storage import get_default_store
+            get_default_store().append_batches(kind, source, written())
+        else:
+            for _ in written():
+                pass
+    finally:
+        if close:
+            close()
+    print(f"{count} {kind} records from {source}", file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m xavier_telepath", description="Xavier Telepath data collection")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Write metrics on exit (.prom or .txt: Prometheus text, otherwise JSON)")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT", help="Serve /metrics while running")
+    parser.add_argument("--profile", choices=("cprofile", "sample"),
+                        help="Profile the command into $XAVIER_DATA_DIR/profiles (per task for crawl)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def output_options(command):
+        command.add_argument("--out", help="Write records to a .csv or .jsonl file instead of stdout")
+        command.add_argument("--store", action="store_true", help="Append records to the record store")
+        return command
+
+    arxiv = commands.add_parser("arxiv", help="arXiv API search and OAI-PMH bulk harvesting")
+    arxiv_commands = arxiv.add_subparsers(dest="action", required=True)
+    search = output_options(arxiv_commands.add_parser("search", help="Search the arXiv API"))
+    search.add_argument("query")
+    search.add_argument("--field", default="all", help="title, author, abstract, doi, orcid, arxiv_id or all")
+    search.add_argument("--subject", help="arXiv category (e.g. gr-qc)")
+    search.add_argument("--limit", type=int, default=100, help="Maximum number of papers")
+    search.set_defaults(handler=_arxiv_search)
+    harvest = output_options(arxiv_commands.add_parser("harvest", help="Harvest a category over OAI-PMH"))
+    harvest.add_argument("category", help="arXiv archive or OAI set (e.g. hep-th, physics:hep-ph)")
+    harvest.add_argument("--from", dest="from_date", help="First datestamp (YYYY-MM-DD)")
+    harvest.add_argument("--until", dest="until_date", help="Last datestamp (YYYY-MM-DD)")
+    harvest.add_argument("--state", help="State file for resumable, incremental harvests")
+    harvest.set_defaults(handler=_arxiv_harvest)
+
+    scopus = commands.add_parser("scopus", help="Scopus article and author search")
+    scopus.add_argument("--api-key", help="Scopus API key (default: $SCOPUS_API_KEY)")
+    scopus_commands = scopus.add_subparsers(dest="action", required=True)
+    articles = output_options(scopus_commands.add_parser("articles", help="Search articles"))
+    articles.add_argument("query")
+    articles.add_argument("--field", default="TITLE-ABS-KEY", help="Scopus field code (default: TITLE-ABS-KEY)")
+    articles.add_argument("--subject", help="Subject area code (e.g. PHYS)")
+    articles.add_argument("--limit", type=int, default=100, help="Maximum number of articles")
+    articles.set_defaults(handler=_scopus_articles)
+    people = output_options(scopus_commands.add_parser("people", help="Search authors"))
+    people.add_argument("query", help="Author search query (e.g. 'AFFIL(Harvard University)')")
+    people.add_argument("--limit", type=int, default=100, help="Maximum number of authors")
+    people.set_defaults(handler=_scopus_people)
+
+    scholar = commands.add_parser("scholar", help="Google Scholar profiles and articles")
+    scholar_commands = scholar.add_subparsers(dest="action", required=True)
+    professors = output_options(scholar_commands.add_parser("professors", help="Profiles at a university"))
+    professors.add_argument("university")
+    professors.add_argument("--label", default="", help="Field label (e.g. physics)")
+    professors.add_argument("--pages", type=int, default=10, help="Result pages to crawl")
+    professors.set_defaults(handler=_scholar_professors)
+    field = output_options(scholar_commands.add_parser("articles", help="Articles in a field"))
+    field.add_argument("field")
+    field.add_argument("--pages", type=int, default=2, help="Result pages to crawl")
+    field.set_defaults(handler=_scholar_articles)
+    author = output_options(scholar_commands.add_parser("author", help="Articles of a researcher"))
+    author.add_argument("name")
+    author.add_argument("--pages", type=int, default=2, help="Result pages to crawl")
+    author.set_defaults(handler=_scholar_author)
+
+    crawl = commands.add_parser("crawl", help="Run a crawl manifest into the record store")
+    crawl.add_argument("manifest", help="JSON manifest (see CrawlPlanner.plan)")
+    crawl.add_argument("--workers", type=int, default=4)
+    crawl.set_defaults(handler=_crawl)
+
+    orcid = commands.add_parser("orcid", help="ORCID profiles from the public data file")
+    orcid_commands = orcid.add_subparsers(dest="action", required=True)
+    ingest = orcid_commands.add_parser("ingest", help="Load summaries dump archives into the lookup table")
+    ingest.add_argument("dumps", nargs="+", help="ORCID_<year>_summaries.tar.gz archive(s)")
+    ingest.add_argument("--workers", type=int, help="Parser processes (default: one per core)")
+    ingest.add_argument("--limit", type=int, help="Stop after this many records")
+    ingest.add_argument("--store", action="store_true", help="Also append the profiles to the record store")
+    ingest.set_defaults(handler=_orcid_ingest)
+    lookup = orcid_commands.add_parser("lookup", help="Print profiles by ORCID iD or by the works they list")
+    lookup.add_argument("orcids", nargs="*", help="ORCID iDs or orcid.org URLs")
+    lookup.add_argument("--doi", action="append", help="Authors of a DOI (repeatable)")
+    lookup.add_argument("--arxiv", action="append", help="Authors of an arXiv id (repeatable)")
+    lookup.add_argument("--eid", action="append", help="Authors of a Scopus EID (repeatable)")
+    lookup.set_defaults(handler=_orcid_lookup)
+
+    commands.add_parser("reparse", help="Re-parse archived raw responses", add_help=False)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if args.command != "reparse":
+        args = parser.parse_args(argv)
+    if args.metrics or args.metrics_port or args.profile:
+        from xavier_telepath import metrics
+    if args.metrics_port:
+        metrics.serve_metrics(args.metrics_port)
+    try:
+        if args.command == "crawl":
+            return args.handler(args)
+        name = args.command if args.command == "reparse" else f"{args.command}-{args.action}"
+        with (metrics.profile_job(name, args.profile) if args.profile else contextlib.nullcontext()) as profile:
+            if args.command == "reparse":
+                # reparse keeps its own argument parser
+                from xavier_telepath.storage.reparse import main as reparse
+                reparse(rest)
+            elif args.command == "orcid":
+                args.handler(args)
+            else:
+                kind, source, records = args.handler(args)
+                _emit(kind, source, records, args)
+        if profile:
+            print(f"Profile written to {profile}", file=sys.stderr)
+    finally:
+        if args.metrics:
+            metrics.write_metrics(args.metrics)
@@ -0,0 +1,569 @@
+import asyncio
+import contextlib
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from xavier_telepath.metrics import MeteredReader, get_default_metrics
+from xavier_telepath.storage.data_storage import get_default_archive, get_default_cache
+
+
+class AsyncFetcher:
+    """
+    Runs blocking page fetches concurrently on a thread pool, with a bounded
+    number of requests in flight per source.
+
+    The scrapers keep their synchronous page methods; the fetcher only decides
+    how many of them may run at once and gathers the results back in the order
+    the calls were given (i.e. page order).
+    """
+
+    def __init__(self, max_in_flight=4, per_source=None):
+        """
+        Parameters:
+        - max_in_flight: Default number of concurrent requests per source
+        - per_source: Optional dict overriding the limit for specific sources (e.g. {"arxiv": 1})
+        """
+        self.max_in_flight = max_in_flight
+        self.per_source = dict(per_source or {})
+        self._semaphores = {}
+        self._loop = None
+
+    def limit_for(self, source):
+        return self.per_source.get(source, self.max_in_flight)
+
+    def _semaphore(self, source):
+        # asyncio primitives belong to a single event loop, so start over whenever
+        # the fetcher is used from a new one (e.g. successive asyncio.run calls).
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphores = {}
+        if source not in self._semaphores:
+            self._semaphores[source] = asyncio.Semaphore(self.limit_for(source))
+        return self._semaphores[source]
+
+    async def fetch(self, source, func, *args, **kwargs):
+        """
+        Run a blocking call for a source without exceeding its in-flight limit.
+
+        Parameters:
+        - source: Name of the upstream source (e.g. 'arxiv', 'scopus', 'scholar')
+        - func: The blocking callable performing the request
+        - args, kwargs: Arguments passed to func
+
+        Returns:
+        - Whatever func returns
+        """
+        async with self._semaphore(source):
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def gather(self, source, func, arguments):
+        """
+        Fan a blocking call out over a list of argument tuples.
+
+        Parameters:
+        - source: Name of the upstream source
+        - func: The blocking callable performing one request
+        - arguments: An iterable of argument tuples, one per request
+
+        Returns:
+        - A list of results in the same order as arguments
+        """
+        return await asyncio.gather(*(self.fetch(source, func, *args) for args in arguments))
+
+
+_default_fetcher = None
+
+
+def get_default_fetcher():
+    """
+    Return the process-wide fetcher shared by all scrapers.
+    """
+    global _default_fetcher
+    if _default_fetcher is None:
+        _default_fetcher = AsyncFetcher(per_source={"arxiv": 2, "scopus": 4, "scholar": 2})
+    return _default_fetcher
+
+
+class FetchError(Exception):
+    """
+    Raised when a request still fails after the scheduler has exhausted its retries.
+    """
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with additive-increase / multiplicative-decrease pacing.
+
+    The refill rate starts at max_rate, is halved every time the upstream throttles
+    us and creeps back up after each successful request, so the bucket settles just
+    below the rate the source tolerates.
+    """
+
+    def __init__(self, rate, capacity=1, min_rate=None):
+        """
+        Parameters:
+        - rate: Maximum sustained requests per second
+        - capacity: Burst size (tokens that may accumulate while idle)
+        - min_rate: Floor for the adaptive rate (defaults to rate / 16)
+        """
+        self.max_rate = rate
+        self.min_rate = min_rate or rate / 16
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token, going into debt if none is available.
+
+        Returns:
+        - The number of seconds the caller must wait before sending
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds):
+        """
+        Hold back every caller for the given time (used for Retry-After).
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def on_throttle(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+
+# Requests per second and burst sizes per source. arXiv asks for one request every
+# three seconds; Scopus keys allow a few requests per second (see the key's quota);
+# Scholar has no published limit but serves CAPTCHAs quickly when pushed.
+DEFAULT_LIMITS = {
+    "arxiv": {"rate": 1 / 3, "burst": 1},
+    "scopus": {"rate": 6, "burst": 6},
+    "scholar": {"rate": 0.5, "burst": 1},
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+
+def retry_after_seconds(response):
+    """
+    Parse a Retry-After header (delta-seconds or HTTP date) into seconds, or None.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitScheduler:
+    """
+    Paces requests per source with token buckets and retries throttled or failed
+    requests with jittered exponential backoff, honoring Retry-After.
+    """
+
+    def __init__(self, limits=None, max_retries=5, backoff_base=1.0, backoff_max=120.0, metrics=None):
+        """
+        Parameters:
+        - limits: Dict of source -> {"rate": requests/s, "burst": n}; merged over DEFAULT_LIMITS
+        - max_retries: Retries per request before giving up
+        - backoff_base: First backoff delay in seconds
+        - backoff_max: Upper bound for a single backoff delay in seconds
+        - metrics: MetricsRegistry receiving waits, retries and errors (defaults to the shared one)
+        """
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.metrics = metrics or get_default_metrics()
+        self._buckets = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def configure(self, source, rate, burst=1):
+        """
+        Set (or replace) the limit of a source, e.g. for a Scopus key with a larger quota.
+        """
+        with self._lock:
+            self.limits[source] = {"rate": rate, "burst": burst}
+            self._buckets.pop(source, None)
+
+    def _bucket(self, source):
+        with self._lock:
+            if source not in self._buckets:
+                limit = self.limits.get(source, {"rate": 1, "burst": 1})
+                self._buckets[source] = TokenBucket(limit["rate"], limit.get("burst", 1))
+            if source not in self._stats:
+                self._stats[source] = {
+                    "requests": 0, "retries": 0, "throttled": 0, "errors": 0,
+                    "queue_depth": 0, "max_queue_depth": 0, "total_wait": 0.0,
+                }
+            return self._buckets[source]
+
+    def _acquire(self, source):
+        bucket = self._bucket(source)
+        stats = self._stats[source]
+        with self._lock:
+            stats["queue_depth"] += 1
+            stats["max_queue_depth"] = max(stats["max_queue_depth"], stats["queue_depth"])
+        wait = bucket.reserve()
+        try:
+            if wait > 0:
+                time.sleep(wait)
+        finally:
+            with self._lock:
+                stats["queue_depth"] -= 1
+                stats["total_wait"] += wait
+                stats["requests"] += 1
+            self.metrics.observe("rate_limit_wait_seconds", source, wait)
+            self.metrics.inc("requests_total", source)
+        return bucket
+
+    def _backoff(self, attempt):
+        # "Full jitter": a uniform draw below the exponential ceiling keeps retries
+        # from many workers from arriving in lockstep.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _count(self, source, key):
+        with self._lock:
+            self._stats[source][key] += 1
+        self.metrics.inc(f"{key}_total", source)
+
+    def call(self, source, send, is_throttled=None):
+        """
+        Send a request under the source's rate limit, retrying when throttled.
+
+        Parameters:
+        - source: Name of the upstream source
+        - send: Zero-argument callable performing the request and returning a requests.Response
+        - is_throttled: Optional predicate flagging responses that are throttling in disguise
+          (e.g. a CAPTCHA page served with status 200)
+
+        Returns:
+        - The first response that is neither throttled nor a retryable server error.
+          Other non-200 responses are returned as-is for the caller to handle.
+        """
+        import requests
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count(source, "retries")
+            bucket = self._acquire(source)
+            try:
+                response = send()
+            except requests.RequestException as e:
+                self._count(source, "errors")
+                last_error = FetchError(f"Failed to retrieve data: {e}")
+                time.sleep(self._backoff(attempt))
+                continue
+
+            throttled = response.status_code in THROTTLE_STATUSES or bool(is_throttled and is_throttled(response))
+            if not throttled and response.status_code not in RETRY_STATUSES:
+                bucket.on_success()
+                return response
+
+            last_error = FetchError(f"Failed to retrieve data: {response.status_code}", response.status_code)
+            # Hand the connection back to the pool (matters for streamed responses)
+            response.close()
+            if throttled:
+                self._count(source, "throttled")
+                bucket.on_throttle()
+            else:
+                self._count(source, "errors")
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = self._backoff(attempt)
+            # Everyone sharing the bucket waits out the delay, not just this caller.
+            bucket.pause(delay)
+
+        raise last_error
+
+    def stats(self):
+        """
+        Report per-source counters, current queue depth, wait time and adaptive rate.
+
+        Returns:
+        - A dict of source -> stats dict
+        """
+        with self._lock:
+            report = {}
+            for source, stats in self._stats.items():
+                entry = dict(stats)
+                entry["mean_wait"] = stats["total_wait"] / stats["requests"] if stats["requests"] else 0.0
+                entry["rate"] = self._buckets[source].rate
+                report[source] = entry
+            return report
+
+
+_default_scheduler = None
+
+
+def get_default_scheduler():
+    """
+    Return the process-wide scheduler shared by all scrapers.
+    """
+    global _default_scheduler
+    if _default_scheduler is None:
+        _default_scheduler = RateLimitScheduler()
+    return _default_scheduler
+
+
+def _accept_encoding():
+    # urllib3 only decodes brotli when one of the brotli packages is installed
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+        except ImportError:
+            return "gzip, deflate"
+    return "gzip, deflate, br"
+
+
+class SessionPool:
+    """
+    Keeps one pooled keep-alive requests.Session per source so that consecutive
+    pages reuse TCP/TLS connections instead of handshaking for every request.
+    """
+
+    # Headers every request of a source carries unless the caller overrides them
+    DEFAULT_HEADERS = {
+        "scholar": {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.87 Safari/537.36",
+        },
+    }
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, headers=None):
+        """
+        Parameters:
+        - pool_connections: Number of distinct hosts kept in each session's pool
+        - pool_maxsize: Maximum connections kept open per host (should be at least the number of
+          requests a source has in flight)
+        - headers: Dict of source -> default headers, merged over DEFAULT_HEADERS
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.headers = {**self.DEFAULT_HEADERS, **(headers or {})}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, source):
+        """
+        Return the shared session of a source, creating it on first use.
+        """
+        with self._lock:
+            if source not in self._sessions:
+                # requests is imported with the first session, not when the module loads
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["Accept-Encoding"] = _accept_encoding()
+                session.headers.update(self.headers.get(source, {}))
+                self._sessions[source] = session
+            return self._sessions[source]
+
+    def stats(self):
+        """
+        Report, per source, how many requests were sent and how many of them needed
+        a new connection (TCP/TLS handshake) rather than reusing a pooled one.
+
+        Returns:
+        - A dict of source -> {"requests", "new_connections", "reused"}
+        """
+        report = {}
+        with self._lock:
+            sessions = dict(self._sessions)
+        for source, session in sessions.items():
+            sent = connections = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is not None:
+                        sent += pool.num_requests
+                        connections += pool.num_connections
+            report[source] = {"requests": sent, "new_connections": connections, "reused": sent - connections}
+        return report
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+
+
+_default_session_pool = None
+
+
+def get_default_session_pool():
+    """
+    Return the process-wide session pool shared by all scrapers.
+    """
+    global _default_session_pool
+    if _default_session_pool is None:
+        _default_session_pool = SessionPool()
+    return _default_session_pool
+
+
+class SourceClient:
+    """
+    The single entry point scrapers use to talk to their upstream: every GET is
+    served from the response cache when possible and otherwise goes through the
+    shared scheduler for pacing and retries. Fresh bodies of requests tagged with a
+    parser kind are kept in the raw response archive for offline re-parsing.
+    """
+
+    def __init__(self, source, headers=None, scheduler=None, timeout=30, is_throttled=None, cache=None,
+                 sessions=None, archive=None, metrics=None):
+        """
+        Parameters:
+        - source: Name of the upstream source (used to pick its rate limit and cache TTL)
+        - headers: Default headers sent with every request
+        - scheduler: RateLimitScheduler to use (defaults to the shared one)
+        - timeout: Request timeout in seconds
+        - is_throttled: Optional predicate for throttling responses served with status 200
+        - cache: ResponseCache to use (defaults to the shared one); pass False to disable caching
+        - sessions: SessionPool providing the keep-alive session (defaults to the shared one)
+        - archive: RawArchive for fresh response bodies (defaults to the shared one); pass False to disable
+        - metrics: MetricsRegistry receiving latencies and sizes (defaults to the shared one)
+        """
+        self.source = source
+        self.headers = dict(headers or {})
+        self.scheduler = scheduler or get_default_scheduler()
+        self.timeout = timeout
+        self.is_throttled = is_throttled
+        self.cache = get_default_cache() if cache is None else cache
+        self.session = (sessions or get_default_session_pool()).session_for(source)
+        self.archive = get_default_archive() if archive is None else archive
+        self.metrics = metrics or get_default_metrics()
+
+    def _timed(self, send, latencies=None):
+        # Time every attempt; without a latencies list each one is observed right away
+        def timed():
+            start = time.perf_counter()
+            try:
+                return send()
+            finally:
+                elapsed = time.perf_counter() - start
+                if latencies is None:
+                    self.metrics.observe("request_seconds", self.source, elapsed)
+                else:
+                    latencies.append(elapsed)
+
+        return timed
+
+    def _send(self, url, params, headers):
+        def send():
+            return self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+
+        response = self.scheduler.call(self.source, self._timed(send), self.is_throttled)
+        if response.status_code == 200:
+            self.metrics.observe("response_bytes", self.source, len(response.content))
+        return response
+
+    def get(self, url, params=None, headers=None, kind=None, cache=True):
+        """
+        Perform a cached, paced GET request.
+
+        Parameters:
+        - url, params, headers: The request
+        - kind: Parser kind of the body (see storage/reparse.py); when given, bodies fetched
+          from the upstream (not served from the cache) are archived
+        - cache: False to bypass the response cache for this request (e.g. for pages that
+          carry a one-time pagination cursor)
+
+        Returns:
+        - The requests.Response, or a CachedResponse when served from the cache (status 200)
+
+        Raises:
+        - FetchError if the request fails or returns a non-200 status
+        """
+        merged_headers = {**self.headers, **(headers or {})}
+        if self.cache and cache:
+            response = self.cache.fetch(self.source, url, params,
+                                        lambda conditional: self._send(url, params, {**merged_headers, **conditional}))
+        else:
+            response = self._send(url, params, merged_headers)
+        if response.status_code != 200:
+            raise FetchError(f"Failed to retrieve data: {response.status_code}", response.status_code)
+        if getattr(response, "from_cache", False):
+            self.metrics.inc("cache_hits_total", self.source)
+        if kind and self.archive and not getattr(response, "from_cache", False):
+            self.archive.put(self.source, kind, url, params, response.content)
+        return response
+
+    @contextlib.contextmanager
+    def stream(self, url, params=None, headers=None, kind=None):
+        """
+        Perform a paced GET request and expose the body as a file-like stream, so
+        large responses can be parsed incrementally. Streamed responses bypass the
+        response cache; with a kind, bodies read to the end are archived as in get.
+
+        Yields:
+        - The decoded raw body (a readable file object)
+
+        Raises:
+        - FetchError if the request fails or returns a non-200 status
+        """
+        merged_headers = {**self.headers, **(headers or {})}
+
+        def send():
+            return self.session.get(url, params=params, headers=merged_headers, timeout=self.timeout, stream=True)
+
+        # Failed attempts are observed as they happen; the last one once its body has been read
+        latencies = []
+        try:
+            response = self.scheduler.call(self.source, self._timed(send, latencies), self.is_throttled)
+        finally:
+            for elapsed in latencies[:-1]:
+                self.metrics.observe("request_seconds", self.source, elapsed)
+        try:
+            if response.status_code != 200:
+                self.metrics.observe("request_seconds", self.source, latencies[-1])
+                raise FetchError(f"Failed to retrieve data: {response.status_code}", response.status_code)
+            response.raw.decode_content = True
+            raw = MeteredReader(response.raw, self.metrics)
+            body = raw
+            if kind and self.archive:
+                body = self.archive.tee(self.source, kind, url, params, raw)
+            try:
+                yield body
+            finally:
+                if body is not raw:
+                    body.close()
+                self.metrics.observe("request_seconds", self.source, latencies[-1] + raw.seconds)
+                self.metrics.observe("response_bytes", self.source, raw.bytes)
+        finally:
+            response.close()
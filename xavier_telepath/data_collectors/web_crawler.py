@@ -0,0 +1,220 @@
+import itertools
+import queue
+import re
+import threading
+import time
+
+from xavier_telepath.metrics import profile_job
+
+
+class CrawlTask:
+    """
+    One query of a crawl: a (source, label, university) triple with a priority.
+    Lower priority values are dispatched first.
+    """
+
+    def __init__(self, source, label, university, priority=0):
+        self.source = source
+        self.label = label
+        self.university = university
+        self.priority = priority
+
+    @property
+    def key(self):
+        # Queries that differ only in case or spacing hit the same upstream results
+        return (self.source.lower(), _normalize(self.label), _normalize(self.university))
+
+    def __repr__(self):
+        return f"CrawlTask({self.source!r}, {self.label!r}, {self.university!r}, priority={self.priority})"
+
+
+def _normalize(text):
+    return re.sub(r"\s+", " ", (text or "").strip()).casefold()
+
+
+def default_handlers(scholar=None, scopus=None, pages=10, journal=None, scopus_limit=None):
+    """
+    Build handlers for the built-in sources.
+
+    Parameters:
+    - scholar: GoogleScholar instance (one is created when omitted, journaling its crawls)
+    - scopus: ScopusAPI instance (Scopus needs an API key, so it is only handled when given)
+    - pages: Number of result pages to crawl per Scholar query
+    - journal: CrawlJournal of the created GoogleScholar (default: the shared one), so an
+      interrupted crawl resumes each Scholar query from its last committed page
+    - scopus_limit: Maximum number of authors per Scopus query (default: all)
+
+    Returns:
+    - A dict of source -> handler(label, university) returning (kind, records), where
+      kind is the ParquetStore record kind of the records
+    """
+    if scholar is None:
+        from xavier_telepath.scrapers.google_scholar import GoogleScholar
+        from xavier_telepath.storage.data_storage import get_default_journal
+        scholar = GoogleScholar(journal=journal if journal is not None else get_default_journal())
+    handlers = {
+        "scholar": lambda label, university: (
+            "profiles", scholar.findProfessorByUniversity(label, university, number_of_iterations=pages)),
+    }
+    if scopus is not None:
+        def scopus_people(label, university):
+            query = f"AFFIL({university})"
+            if label:
+                query += f" AND SUBJAREA({label})"
+            return "authors", list(scopus.iter_people(query, limit=scopus_limit))
+
+        handlers["scopus"] = scopus_people
+    return handlers
+
+
+class CrawlPlanner:
+    """
+    Expands a manifest of universities x labels x sources into de-duplicated crawl
+    tasks and works through them with a pool of worker threads fed by a priority
+    queue. Pacing stays with each source's SourceClient, so workers of a throttled
+    source simply wait while the others keep going.
+    """
+
+    def __init__(self, handlers=None, workers=4, store=None, on_result=None, profile=None, profile_dir=None):
+        """
+        Parameters:
+        - handlers: Dict of source -> handler(label, university) returning (kind, records)
+          (defaults to default_handlers())
+        - workers: Number of worker threads
+        - store: Optional ParquetStore that receives every task's records
+        - on_result: Optional callback(task, records) called after each successful task
+        - profile: Profile every task with "cprofile" or "sample" (see metrics.profile_job)
+        - profile_dir: Directory of the task profiles (default: $XAVIER_DATA_DIR/profiles)
+        """
+        self.handlers = handlers if handlers is not None else default_handlers()
+        self.workers = workers
+        self.store = store
+        self.on_result = on_result
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._tasks = {}
+        self._status = {}
+        self._records = {}
+        self._errors = {}
+        self._started = None
+        self._finished = None
+
+    def plan(self, manifest):
+        """
+        Expand a manifest into crawl tasks, merging duplicates.
+
+        Parameters:
+        - manifest: A dict, or a list of dicts, with "universities", "labels" and "sources"
+          lists and an optional "priority" (default 0). Every combination becomes a task;
+          combinations repeated across entries are crawled once, at their best priority.
+
+        Returns:
+        - The list of tasks in dispatch order
+
+        Raises:
+        - ValueError if a manifest entry names a source without a handler
+        """
+        entries = [manifest] if isinstance(manifest, dict) else manifest
+        tasks = {}
+        for entry in entries:
+            unknown = set(entry.get("sources", [])) - set(self.handlers)
+            if unknown:
+                raise ValueError(f"No handler for sources: {sorted(unknown)}")
+            # Scopus handlers pass labels on as SUBJAREA codes (e.g. "PHYS")
+            combinations = itertools.product(entry.get("sources", []), entry.get("labels") or [""],
+                                             entry.get("universities", []))
+            for source, label, university in combinations:
+                task = CrawlTask(source, label, university, entry.get("priority", 0))
+                if task.key not in tasks or task.priority < tasks[task.key].priority:
+                    tasks[task.key] = task
+        return sorted(tasks.values(), key=lambda task: task.priority)
+
+    def run(self, manifest):
+        """
+        Plan a manifest and crawl all of its tasks (see plan and run_tasks).
+        """
+        return self.run_tasks(self.plan(manifest))
+
+    def run_tasks(self, tasks):
+        """
+        Crawl a list of tasks and block until all of them are done. Failed tasks are
+        recorded and do not stop the crawl.
+
+        Returns:
+        - A dict of task key -> records for the successful tasks
+        """
+        work = queue.PriorityQueue()
+        with self._lock:
+            self._reset()
+            self._started = time.time()
+            for sequence, task in enumerate(tasks):
+                self._tasks[task.key] = task
+                self._status[task.key] = "pending"
+                # The sequence number keeps equal priorities in manifest order
+                work.put((task.priority, sequence, task))
+
+        threads = [threading.Thread(target=self._work, args=(work,), daemon=True)
+                   for _ in range(min(self.workers, len(tasks)) or 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with self._lock:
+            self._finished = time.time()
+            return {key: records for key, records in self._records.items()}
+
+    def _work(self, work):
+        while True:
+            try:
+                _, _, task = work.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                self._status[task.key] = "running"
+            try:
+                name = "-".join(part for part in (task.source, task.label, task.university) if part)
+                with profile_job(name, self.profile, self.profile_dir):
+                    kind, records = self.handlers[task.source](task.label, task.university)
+                if self.store is not None:
+                    self.store.append(kind, task.source, records)
+                if self.on_result:
+                    self.on_result(task, records)
+            except Exception as e:
+                with self._lock:
+                    self._status[task.key] = "failed"
+                    self._errors[task.key] = str(e)
+                continue
+            with self._lock:
+                self._status[task.key] = "done"
+                self._records[task.key] = records
+
+    def progress(self):
+        """
+        Report the state of the current (or last) run; safe to call from another thread.
+
+        Returns:
+        - A dict with the task counts per state overall and per source, the number of
+          records collected, elapsed seconds and the errors of failed tasks
+        """
+        with self._lock:
+            states = ("pending", "running", "done", "failed")
+            report = {state: 0 for state in states}
+            per_source = {}
+            for key, status in self._status.items():
+                report[status] += 1
+                source_counts = per_source.setdefault(key[0], {state: 0 for state in states})
+                source_counts[status] += 1
+            end = self._finished or time.time()
+            report.update(
+                total=len(self._status),
+                records=sum(len(records) for records in self._records.values()),
+                per_source=per_source,
+                elapsed=end - self._started if self._started else 0.0,
+                errors={repr(self._tasks[key]): error for key, error in self._errors.items()},
+            )
+            return report
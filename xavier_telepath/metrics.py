@@ -0,0 +1,482 @@
+"""
+Instrumentation of the harvesting pipeline.
+
+The shared MetricsRegistry keeps per-source histograms and counters:
+
+    request_seconds           Network time of one request (to the end of the body)
+    rate_limit_wait_seconds   Time a request waited for its source's token bucket
+    parse_seconds             Parse time of one page (network reads of streamed bodies excluded)
+    response_bytes            Body size of one response fetched from the upstream
+    records_per_page          Records parsed from one page
+    write_seconds             Time of one write to the record store or a CSV file
+    requests_total, retries_total, throttled_total, errors_total, cache_hits_total,
+    records_written_total
+
+Snapshots export as JSON or Prometheus text (write_metrics, serve_metrics). profile_job
+runs a block under cProfile or a sampling profiler and writes the result next to the
+data directory, so a single slow job can be inspected without profiling the whole run.
+"""
+import bisect
+import contextlib
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+SECONDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES = tuple(1024 * 4 ** power for power in range(9))  # 1 KiB .. 64 MiB
+RECORDS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2000, 5000, 10000)
+
+# Histogram name -> (bucket upper bounds, help text)
+HISTOGRAMS = {
+    "request_seconds": (SECONDS, "Network time of one request, to the end of the body"),
+    "rate_limit_wait_seconds": (SECONDS, "Time a request waited for its rate limit"),
+    "parse_seconds": (SECONDS, "Parse time of one page"),
+    "response_bytes": (BYTES, "Body size of one response fetched from the upstream"),
+    "records_per_page": (RECORDS, "Records parsed from one page"),
+    "write_seconds": (SECONDS, "Time of one write to the record store or a CSV file"),
+}
+
+COUNTERS = {
+    "requests_total": "Requests sent upstream, retries included",
+    "retries_total": "Requests repeated after a throttled or failed attempt",
+    "throttled_total": "Attempts answered with throttling (429/503/CAPTCHA)",
+    "errors_total": "Attempts that failed with a connection error or a server error",
+    "cache_hits_total": "Responses served from the response cache",
+    "records_written_total": "Records written to the record store or a CSV file",
+}
+
+PREFIX = "xavier_telepath_"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with the count, sum and extremes of its observations.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)  # The last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """
+        Estimate a quantile by linear interpolation inside its bucket.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            if count and seen + count >= rank:
+                lower = self.bounds[index - 1] if index else min(self.min, self.bounds[0])
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([*map(str, self.bounds), "+Inf"], self.buckets)),
+        }
+
+
+class _Page:
+    # Collects the record count of the page being parsed (see MetricsRegistry.parsing)
+    records = None
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of per-source histograms and counters.
+    """
+
+    def __init__(self, enabled=True):
+        """
+        Parameters:
+        - enabled: Record observations; a disabled registry ignores them at almost no cost
+        """
+        self.enabled = enabled
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        # Seconds each thread has spent reading streamed bodies (see MeteredReader)
+        self._network = threading.local()
+        self._started = time.time()
+
+    def observe(self, name, source, value):
+        """
+        Add an observation to the histogram name of a source.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get((name, source))
+            if histogram is None:
+                histogram = self._histograms[(name, source)] = Histogram(HISTOGRAMS[name][0])
+            histogram.observe(value)
+
+    def inc(self, name, source, amount=1):
+        """
+        Increment the counter name of a source.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[(name, source)] = self._counters.get((name, source), 0) + amount
+
+    @contextlib.contextmanager
+    def timer(self, name, source):
+        """
+        Observe the duration of a block in the histogram name of a source.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, source, time.perf_counter() - start)
+
+    @contextlib.contextmanager
+    def parsing(self, source):
+        """
+        Time the parsing of one page. Set the yielded object's records attribute to the
+        number of records parsed to also observe records_per_page.
+        """
+        page = _Page()
+        start = time.perf_counter()
+        try:
+            yield page
+        finally:
+            self.observe("parse_seconds", source, time.perf_counter() - start)
+            if page.records is not None:
+                self.observe("records_per_page", source, page.records)
+
+    def parsed(self, source, records):
+        """
+        Wrap the records of an incrementally parsed page: time spent producing them,
+        minus the time this thread spent reading the network, is observed as the
+        page's parse time once the iterator is exhausted or closed.
+
+        Yields:
+        - The records, unchanged
+        """
+        parse = 0.0
+        count = 0
+        iterator = iter(records)
+        try:
+            while True:
+                start = time.perf_counter()
+                network = self.network_seconds()
+                try:
+                    record = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    parse += time.perf_counter() - start - (self.network_seconds() - network)
+                count += 1
+                yield record
+        finally:
+            self.observe("parse_seconds", source, max(parse, 0.0))
+            self.observe("records_per_page", source, count)
+
+    def add_network_seconds(self, seconds):
+        self._network.seconds = self.network_seconds() + seconds
+
+    def network_seconds(self):
+        return getattr(self._network, "seconds", 0.0)
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+            self._started = time.time()
+
+    def snapshot(self):
+        """
+        Report every histogram and counter.
+
+        Returns:
+        - A dict with "histograms" (name -> source -> summary with buckets and quantiles),
+          "counters" (name -> source -> value) and the collection period in seconds
+        """
+        with self._lock:
+            histograms = {}
+            for (name, source), histogram in sorted(self._histograms.items()):
+                histograms.setdefault(name, {})[source] = histogram.snapshot()
+            counters = {}
+            for (name, source), value in sorted(self._counters.items()):
+                counters.setdefault(name, {})[source] = value
+            return {"since": self._started, "seconds": time.time() - self._started,
+                    "histograms": histograms, "counters": counters}
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self):
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            histograms = sorted((key, (list(h.buckets), h.count, h.sum)) for key, h in self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = []
+        described = set()
+        for (name, source), (buckets, count, total) in histograms:
+            metric = PREFIX + name
+            if name not in described:
+                described.add(name)
+                lines += [f"# HELP {metric} {HISTOGRAMS[name][1]}", f"# TYPE {metric} histogram"]
+            label = f'source="{_escape(source)}"'
+            cumulative = 0
+            for bound, bucket in zip([*map(_number, HISTOGRAMS[name][0]), "+Inf"], buckets):
+                cumulative += bucket
+                lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines += [f"{metric}_sum{{{label}}} {_number(total)}", f"{metric}_count{{{label}}} {count}"]
+        for (name, source), value in counters:
+            metric = PREFIX + name
+            if name not in described:
+                described.add(name)
+                lines += [f"# HELP {metric} {COUNTERS[name]}", f"# TYPE {metric} counter"]
+            lines.append(f'{metric}{{source="{_escape(source)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MeteredReader:
+    """
+    File-like wrapper of a streamed response body that counts the bytes read and the
+    time spent waiting for them, so that parsers reading the stream can tell network
+    time apart from their own.
+    """
+
+    def __init__(self, raw, metrics):
+        self.raw = raw
+        self.metrics = metrics
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def read(self, size=-1):
+        start = time.perf_counter()
+        data = self.raw.read(size)
+        self._account(start, len(data))
+        return data
+
+    def readinto(self, buffer):
+        start = time.perf_counter()
+        read = self.raw.readinto(buffer)
+        self._account(start, read or 0)
+        return read
+
+    def _account(self, start, size):
+        elapsed = time.perf_counter() - start
+        self.seconds += elapsed
+        self.bytes += size
+        self.metrics.add_network_seconds(elapsed)
+
+    def readable(self):
+        return True
+
+    def close(self):
+        self.raw.close()
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+def write_metrics(path, registry=None):
+    """
+    Write a metrics snapshot to a file: Prometheus text for .prom/.txt files, JSON otherwise.
+    """
+    registry = registry or get_default_metrics()
+    text = registry.to_prometheus() if path.endswith((".prom", ".txt")) else registry.to_json()
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temporary, path)
+    return path
+
+
+def serve_metrics(port=9108, host="127.0.0.1", registry=None):
+    """
+    Serve the metrics over HTTP from a daemon thread: /metrics in Prometheus text and
+    /metrics.json as JSON. Meant for long harvests that a Prometheus server scrapes.
+
+    Returns:
+    - The http.server instance (call shutdown() to stop it)
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registry = registry or get_default_metrics()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = registry.to_prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = registry.to_json(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            body = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread at a fixed interval from a background thread.
+    The overhead does not depend on how many calls the profiled code makes, so it
+    can stay on for whole production jobs, unlike cProfile.
+    """
+
+    def __init__(self, interval=0.005, thread_id=None):
+        """
+        Parameters:
+        - interval: Seconds between samples
+        - thread_id: Thread to sample (default: the thread calling start)
+        """
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.thread_id = self.thread_id or threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def write(self, path):
+        """
+        Write the samples as collapsed stacks (one "frame;frame;frame count" line per
+        stack), the input format of flamegraph.pl and speedscope.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]):
+                file.write(f"{stack} {count}\n")
+
+
+def _profile_dir():
+    from xavier_telepath.storage.data_storage import _data_dir
+
+    return os.path.join(_data_dir(), "profiles")
+
+
+@contextlib.contextmanager
+def profile_job(name, mode="cprofile", directory=None, interval=0.005):
+    """
+    Profile the block in the calling thread.
+
+    Parameters:
+    - name: Job name, used in the output file name
+    - mode: "cprofile" (deterministic, writes a pstats .prof file), "sample" (sampling,
+      writes collapsed stacks to a .folded file) or None to disable profiling
+    - directory: Output directory (default: $XAVIER_DATA_DIR/profiles)
+    - interval: Sampling interval in seconds (mode "sample")
+
+    Yields:
+    - The path the profile will be written to, or None when profiling is disabled
+    """
+    if not mode:
+        yield None
+        return
+    if mode not in ("cprofile", "sample"):
+        raise ValueError("mode must be 'cprofile' or 'sample'")
+    directory = directory or _profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)[:80]
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    suffix = ".prof" if mode == "cprofile" else ".folded"
+    path = os.path.join(directory, f"{safe_name}-{stamp}-{threading.get_ident()}{suffix}")
+
+    if mode == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield path
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+    else:
+        profiler = SamplingProfiler(interval).start()
+        try:
+            yield path
+        finally:
+            profiler.stop()
+            profiler.write(path)
+
+
+_default_metrics = None
+
+
+def get_default_metrics():
+    """
+    Return the process-wide metrics registry shared by the clients, scrapers and store.
+    Setting $XAVIER_METRICS=0 disables recording.
+    """
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = MetricsRegistry(enabled=os.environ.get("XAVIER_METRICS", "1") != "0")
+    return _default_metrics
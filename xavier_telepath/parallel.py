@@ -0,0 +1,43 @@
+"""
+Chunked fan-out of CPU-bound work to a process pool.
+
+map_chunks is shared by the batch jobs that parse or render more records than fit in
+memory (the ORCID dump ingest, the raw-archive replay, xavier_mind's page rendering).
+"""
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def map_chunks(function, items, chunk_size, workers=None, initializer=None, initargs=()):
+    """
+    Apply function to successive chunks of items in a process pool.
+
+    Items are consumed lazily and only a bounded number of chunks (two per worker) is in
+    flight at a time, so the input can be a generator far larger than memory. Results
+    come back in input order.
+
+    Parameters:
+    - function: Module-level function taking a list of items
+    - items: Iterable of picklable items
+    - chunk_size: Items per task sent to a worker
+    - workers: Number of worker processes (default: one per core)
+    - initializer, initargs: Run once in every worker process, as for ProcessPoolExecutor
+
+    Returns:
+    - An iterator of (chunk, function(chunk)) pairs
+    """
+    workers = workers or os.cpu_count() or 1
+    items = iter(items)
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        pending = deque()
+        while True:
+            chunk = list(itertools.islice(items, chunk_size))
+            if chunk:
+                pending.append((chunk, pool.submit(function, chunk)))
+            if pending and (len(pending) >= 2 * workers or not chunk):
+                done, future = pending.popleft()
+                yield done, future.result()
+            if not chunk and not pending:
+                break
@@ -1,6 +1,45 @@
-import requests
 import xml.etree.ElementTree as ET
 import csv
+import json
+import os
+
+from xavier_telepath.data_collectors.api_integrations import FetchError, SourceClient, get_default_fetcher
+from xavier_telepath.metrics import get_default_metrics
+from xavier_telepath.storage.data_storage import get_default_store
+
+# Fully qualified Atom tag names, built once instead of resolving a namespace map per lookup
+ATOM = "{http://www.w3.org/2005/Atom}"
+ENTRY = ATOM + "entry"
+ID = ATOM + "id"
+TITLE = ATOM + "title"
+AUTHOR = ATOM + "author"
+NAME = ATOM + "name"
+PUBLISHED = ATOM + "published"
+UPDATED = ATOM + "updated"
+SUMMARY = ATOM + "summary"
+
+# OAI-PMH envelope and arXiv metadata format tag names
+OAI = "{http://www.openarchives.org/OAI/2.0/}"
+OAI_LIST_RECORDS = OAI + "ListRecords"
+OAI_RECORD = OAI + "record"
+OAI_HEADER = OAI + "header"
+OAI_DATESTAMP = OAI + "datestamp"
+OAI_METADATA = OAI + "metadata"
+OAI_ERROR = OAI + "error"
+OAI_RESPONSE_DATE = OAI + "responseDate"
+OAI_RESUMPTION_TOKEN = OAI + "resumptionToken"
+ARXIV_META = "{http://arxiv.org/OAI/arXiv/}"
+META_ROOT = ARXIV_META + "arXiv"
+META_ID = ARXIV_META + "id"
+META_CREATED = ARXIV_META + "created"
+META_UPDATED = ARXIV_META + "updated"
+META_AUTHOR = ARXIV_META + "authors/" + ARXIV_META + "author"
+META_KEYNAME = ARXIV_META + "keyname"
+META_FORENAMES = ARXIV_META + "forenames"
+META_TITLE = ARXIV_META + "title"
+META_CATEGORIES = ARXIV_META + "categories"
+META_DOI = ARXIV_META + "doi"
+META_ABSTRACT = ARXIV_META + "abstract"
 
 
 class ArxivAPI:
@@ -17,8 +56,10 @@ class ArxivAPI:
         "all": ""
     }
 
-    def __init__(self, max_results=10):
+    def __init__(self, max_results=10, fetcher=None, client=None):
         self.max_results = max_results
+        self.fetcher = fetcher or get_default_fetcher()
+        self.client = client or SourceClient("arxiv")
 
     def search(self, field, query, subject=None, start_index=0):
         """
@@ -33,6 +74,14 @@ class ArxivAPI:
         Returns:
         - A list of dictionaries containing paper information
         """
+        params = self._search_params(field, query, subject, start_index, self.max_results)
+        response = self.client.get(self.BASE_URL, params=params, kind="arxiv.atom")
+        with get_default_metrics().parsing("arxiv") as page:
+            papers = self.parse_response(response.content)
+            page.records = len(papers)
+        return papers
+
+    def _search_params(self, field, query, subject, start_index, max_results):
         if field not in self.SEARCH_FIELDS:
             raise ValueError(f"Invalid search field. Valid options are: {list(self.SEARCH_FIELDS.keys())}")
 
@@ -42,20 +91,56 @@ class ArxivAPI:
         if subject:
             full_query += f"+AND+cat:{subject}"
 
-        params = {
+        return {
             "search_query": full_query,
             "start": start_index,
-            "max_results": self.max_results
+            "max_results": max_results
         }
 
+    def iter_search(self, field, query, subject=None, start_index=0, limit=None):
+        """
+        Lazily page through all results of a search, streaming each page.
+
+        Pages of max_results entries (arXiv allows up to 2000) are requested one at a
+        time and parsed incrementally, so memory stays flat regardless of how many
+        entries are harvested. Streamed pages bypass the response cache.
+
+        Parameters:
+        - field, query, subject, start_index: Same as search
+        - limit: Maximum number of papers to yield (optional, default: all)
 
-        response = requests.get(self.BASE_URL, params=params)
+        Yields:
+        - Dictionaries containing paper information, one at a time
+        """
+        yielded = 0
+        start = start_index
+        while limit is None or yielded < limit:
+            page_size = self.max_results if limit is None else min(self.max_results, limit - yielded)
+            params = self._search_params(field, query, subject, start, page_size)
+            on_page = 0
+            with self.client.stream(self.BASE_URL, params=params, kind="arxiv.atom") as body:
+                for paper in get_default_metrics().parsed("arxiv", self.iter_parse_response(body)):
+                    on_page += 1
+                    yield paper
+            yielded += on_page
+            start += on_page
+            if on_page < page_size:
+                break  # Last page
 
-        if response.status_code != 200:
-            raise Exception(f"Failed to retrieve data: {response.status_code}")
+    async def search_async(self, field, query, subject=None, start_index=0, pages=1):
+        """
+        Fetch several consecutive result pages concurrently.
 
+        Parameters:
+        - field, query, subject, start_index: Same as search
+        - pages: Number of pages of max_results entries to fetch
 
-        return self.parse_response(response.content)
+        Returns:
+        - A list of dictionaries containing paper information, in page order
+        """
+        offsets = [(field, query, subject, start_index + page * self.max_results) for page in range(pages)]
+        results = await self.fetcher.gather("arxiv", self.search, offsets)
+        return [paper for page in results for paper in page]
 
     def parse_response(self, xml_data):
         """
@@ -68,22 +153,35 @@ class ArxivAPI:
         - A list of dictionaries, each representing a paper
         """
         root = ET.fromstring(xml_data)
-        namespace = {"atom": "http://www.w3.org/2005/Atom"}
-        papers = []
-
-        for entry in root.findall("atom:entry", namespace):
-            paper = {
-                "id": entry.find("atom:id", namespace).text.split("/")[-1],  # Extract arXiv ID from the URL
-                "title": entry.find("atom:title", namespace).text.strip(),
-                "authors": [author.find("atom:name", namespace).text for author in
-                            entry.findall("atom:author", namespace)],
-                "published": entry.find("atom:published", namespace).text,
-                "updated": entry.find("atom:updated", namespace).text,
-                "summary": entry.find("atom:summary", namespace).text.strip().replace("\n", " "),
-            }
-            papers.append(paper)
+        return [self._parse_entry(entry) for entry in root.iterfind(ENTRY)]
 
-        return papers
+    def iter_parse_response(self, source):
+        """
+        Incrementally parse an arXiv Atom feed, yielding one paper at a time.
+
+        Parameters:
+        - source: A file name or readable binary file object (e.g. a streamed response body)
+
+        Yields:
+        - Dictionaries, each representing a paper
+        """
+        events = ET.iterparse(source, events=("start", "end"))
+        _, root = next(events)
+        for event, element in events:
+            if event == "end" and element.tag == ENTRY:
+                yield self._parse_entry(element)
+                # Drop the parsed entry (and anything before it) from the tree
+                root.clear()
+
+    def _parse_entry(self, entry):
+        return {
+            "id": entry.find(ID).text.split("/")[-1],  # Extract arXiv ID from the URL
+            "title": entry.find(TITLE).text.strip(),
+            "authors": [author.find(NAME).text for author in entry.iterfind(AUTHOR)],
+            "published": entry.find(PUBLISHED).text,
+            "updated": entry.find(UPDATED).text,
+            "summary": entry.find(SUMMARY).text.strip().replace("\n", " "),
+        }
 
     def save_to_csv(self, papers, file_path):
         """
@@ -93,13 +191,226 @@ class ArxivAPI:
         - papers: A list of dictionaries, each representing a paper.
         - file_path: The path where the CSV file will be saved.
         """
-        with open(file_path, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=["id", "title", "authors", "published", "updated", "summary"])
+        metrics = get_default_metrics()
+        written = 0
+        with metrics.timer("write_seconds", "arxiv"), open(file_path, mode='w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=["id", "title", "authors", "published", "updated", "summary"],
+                                    extrasaction="ignore")
             writer.writeheader()
             for paper in papers:
-                paper['authors'] = ' / '.join(paper['authors'])
-                writer.writerow(paper)
+                writer.writerow({**paper, 'authors': ' / '.join(paper['authors'])})
+                written += 1
+        metrics.inc("records_written_total", "arxiv", written)
 
+    def save_to_store(self, papers, store=None):
+        """
+        Append papers to the columnar record store (partitioned by source and harvest date).
+
+        Parameters:
+        - papers: An iterable of dictionaries, each representing a paper
+        - store: ParquetStore to write to (defaults to the shared one)
+
+        Returns:
+        - The number of papers written
+        """
+        return (store or get_default_store()).append_batches("papers", "arxiv", papers)
+
+
+class ArxivOAIHarvester:
+    """
+    Bulk harvester for whole arXiv categories over the OAI-PMH interface.
+
+    ListRecords pages are streamed and parsed one record at a time and followed
+    through their resumption tokens. The token of the page being harvested is kept
+    in a small JSON state file, so an interrupted harvest resumes where it stopped,
+    and the date of the last completed harvest of each set is remembered so the
+    next run only asks for records changed since then.
+    """
+
+    BASE_URL = "http://export.arxiv.org/oai2"
+
+    def __init__(self, state_path=None, metadata_prefix="arXiv", client=None):
+        """
+        Parameters:
+        - state_path: JSON file holding resumption tokens and completed dates (optional;
+          without it harvests can neither be resumed nor continued incrementally)
+        - metadata_prefix: OAI metadata format to request (only 'arXiv' is parsed)
+        - client: SourceClient to use (defaults to one sharing the arXiv rate limit)
+        """
+        self.state_path = state_path
+        self.metadata_prefix = metadata_prefix
+        self.client = client or SourceClient("arxiv")
+
+    @staticmethod
+    def set_spec(category):
+        """
+        Map an arXiv archive (e.g. 'hep-ph', 'cs', 'math') to its OAI set spec.
+        """
+        if ":" in category:
+            return category
+        top_level = {"cs", "econ", "eess", "math", "q-bio", "q-fin", "stat"}
+        return category if category in top_level else f"physics:{category}"
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def _save_state(self, state):
+        if not self.state_path:
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        # Write-then-rename so a crash never leaves a truncated state file behind
+        temporary = self.state_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(state, file, indent=2)
+        os.replace(temporary, self.state_path)
+
+    def harvest(self, category, from_date=None, until_date=None):
+        """
+        Harvest every record of a category changed within a date window.
+
+        Records are yielded as they are parsed. The resumption token of the next page
+        is checkpointed only after every record of the current page has been handed
+        to the caller, so a harvest restarted with the same window repeats at most
+        the page that was in progress.
+
+        Parameters:
+        - category: arXiv archive or OAI set spec (e.g. 'hep-ph', 'physics:gr-qc')
+        - from_date: First datestamp (YYYY-MM-DD) to include; defaults to the day the
+          last completed harvest of this set ran, or the beginning of the archive
+        - until_date: Last datestamp (YYYY-MM-DD) to include (optional)
+
+        Yields:
+        - Dictionaries containing paper information (the ArxivAPI fields plus
+          categories, doi and datestamp); deleted records are skipped
+        """
+        set_spec = self.set_spec(category)
+        state = self._load_state()
+        entry = state.get(set_spec, {})
+        if from_date is None:
+            from_date = entry.get("completed_until")
+        window = {"from": from_date, "until": until_date}
+
+        token = None
+        if entry.get("window") == window and entry.get("token"):
+            token = entry["token"]
+            response_date = entry.get("response_date")
+        else:
+            entry = {"completed_until": entry.get("completed_until"), "window": window, "harvested": 0}
+            response_date = None
+
+        while True:
+            if token:
+                params = {"verb": "ListRecords", "resumptionToken": token}
+            else:
+                params = {"verb": "ListRecords", "metadataPrefix": self.metadata_prefix, "set": set_spec,
+                          "from": from_date, "until": until_date}
+            page = {}
+            with self.client.stream(self.BASE_URL, params=params, kind="arxiv.oai") as body:
+                for record in get_default_metrics().parsed("arxiv", self.iter_parse_records(body, page)):
+                    entry["harvested"] += 1
+                    yield record
+            response_date = response_date or page.get("response_date")
+            token = page.get("token")
+            if not token:
+                break
+            entry.update(token=token, response_date=response_date)
+            state[set_spec] = entry
+            self._save_state(state)
+
+        # The next incremental run starts on the day this harvest began
+        state[set_spec] = {"completed_until": until_date or (response_date or "")[:10] or None,
+                           "harvested": entry["harvested"]}
+        self._save_state(state)
+
+    def harvest_to_jsonl(self, category, file_path, from_date=None, until_date=None):
+        """
+        Append the harvested records of a category to a JSON Lines file.
+
+        The file is flushed before each checkpoint, so after a crash rerunning the same
+        call continues the harvest; records of the interrupted page may appear twice
+        and should be deduplicated by id downstream.
+
+        Returns:
+        - The number of records written by this call
+        """
+        written = 0
+        with open(file_path, mode="a", encoding="utf-8") as file:
+            for record in self.harvest(category, from_date=from_date, until_date=until_date):
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                written += 1
+                file.flush()
+        return written
+
+    def iter_parse_records(self, source, page=None):
+        """
+        Incrementally parse one OAI-PMH ListRecords response.
+
+        Parameters:
+        - source: A file name or readable binary file object
+        - page: Optional dict that receives the page's 'token' (None on the last page)
+          and 'response_date' once the response has been read
+
+        Yields:
+        - Dictionaries, each representing a paper
+
+        Raises:
+        - FetchError when the repository answers with an OAI error other than noRecordsMatch
+        """
+        page = {} if page is None else page
+        container = None
+        for event, element in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if element.tag == OAI_LIST_RECORDS:
+                    container = element
+                continue
+            if element.tag == OAI_RECORD:
+                record = self._parse_record(element)
+                # Drop the parsed record from ListRecords, which the tree builder keeps appending to,
+                # so memory stays flat however many records a page holds
+                if container is not None:
+                    container.remove(element)
+                if record is not None:
+                    yield record
+            elif element.tag == OAI_RESPONSE_DATE:
+                page["response_date"] = element.text
+            elif element.tag == OAI_RESUMPTION_TOKEN:
+                page["token"] = (element.text or "").strip() or None
+            elif element.tag == OAI_ERROR:
+                if element.get("code") != "noRecordsMatch":
+                    raise FetchError(f"OAI-PMH error {element.get('code')}: {(element.text or '').strip()}")
+
+    def _parse_record(self, record):
+        header = record.find(OAI_HEADER)
+        if header.get("status") == "deleted":
+            return None
+        metadata = record.find(OAI_METADATA + "/" + META_ROOT)
+
+        def text(tag):
+            node = metadata.find(tag)
+            return " ".join(node.text.split()) if node is not None and node.text else None
+
+        authors = []
+        for author in metadata.iterfind(META_AUTHOR):
+            forenames = author.findtext(META_FORENAMES)
+            keyname = author.findtext(META_KEYNAME)
+            authors.append(f"{forenames} {keyname}" if forenames else keyname)
+
+        return {
+            "id": text(META_ID),
+            "title": text(META_TITLE),
+            "authors": authors,
+            "published": text(META_CREATED),
+            "updated": text(META_UPDATED),
+            "summary": text(META_ABSTRACT),
+            "categories": (text(META_CATEGORIES) or "").split(),
+            "doi": text(META_DOI),
+            "datestamp": header.findtext(OAI_DATESTAMP),
+        }
 
 
 if __name__ == "__main__":
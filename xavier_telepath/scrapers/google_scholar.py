@@ -1,30 +1,160 @@
-import requests
 import re
-from parsel import Selector
-import pandas as pd
 import os
 
+from xavier_telepath.data_collectors.api_integrations import FetchError, SessionPool, SourceClient, get_default_fetcher
+from xavier_telepath.metrics import get_default_metrics
+from xavier_telepath.storage.data_storage import CrawlJournal, get_default_store
+
+
+# XPath test for an element carrying a CSS class (what ".name" matches in a CSS selector)
+def _has_class(name: str) -> str:
+    return f"contains(@class, '{name}') and contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class BlockExtractor:
+    """
+    Declarative extraction of one dict per result block.
+
+    Blocks are located with a compiled XPath. Each block is then walked once,
+    handing every element whose class (".name") or id ("#name") a field asks for
+    to that field, whose small relative XPath picks the value from there.
+    The XPaths are compiled on first use, so defining an extractor needs no lxml.
+
+    Field modes: 'first' (first match or None), 'all' (list of matches), 'join'
+    (all matches concatenated) and 'normalize' (whitespace-normalized text of the
+    first matching element, or None).
+    """
+
+    def __init__(self, block: str, fields: dict):
+        self.block_path = block
+        self.block = None
+        self.fields = []
+        self._by_class = {}
+        self._by_id = {}
+        for name, (selector, path, mode) in fields.items():
+            index = self._by_id if selector.startswith("#") else self._by_class
+            index.setdefault(selector[1:], []).append(name)
+            self.fields.append((name, path, mode))
+
+    def _compile(self):
+        from lxml import etree
+
+        self._element = etree.Element
+        self.fields = [(name, etree.XPath(path, smart_strings=False) if isinstance(path, str) else path, mode)
+                       for name, path, mode in self.fields]
+        self.block = etree.XPath(self.block_path, smart_strings=False)
+
+    def extract(self, document) -> list:
+        # Accepts a parsel Selector or a bare lxml element
+        if self.block is None:
+            self._compile()
+        root = getattr(document, "root", document)
+        return [self._extract_block(block) for block in self.block(root)]
+
+    def _match(self, block) -> dict:
+        matches = {}
+        for element in block.iter(self._element):
+            if self._by_id:
+                for name in self._by_id.get(element.get("id"), ()):
+                    matches.setdefault(name, []).append(element)
+            classes = element.get("class")
+            if classes:
+                for token in classes.split():
+                    for name in self._by_class.get(token, ()):
+                        matches.setdefault(name, []).append(element)
+        return matches
+
+    def _extract_block(self, block) -> dict:
+        matches = self._match(block)
+        item = {}
+        for name, xpath, mode in self.fields:
+            elements = matches.get(name, ())
+            if mode == "normalize":
+                item[name] = " ".join("".join(elements[0].itertext()).split()) if elements else None
+            elif mode == "first":
+                item[name] = next((values[0] for values in map(xpath, elements) if values), None)
+            else:
+                values = [value for element in elements for value in xpath(element)]
+                item[name] = "".join(values) if mode == "join" else values
+        return item
+
+
+# Author cards of a search_authors page
+PROFILE_CARDS = BlockExtractor(f"//*[{_has_class('gs_ai_chpr')}]", {
+    "name": (".gs_ai_name", ".//a/text()", "first"),
+    "link": (".gs_ai_name", ".//a/@href", "first"),
+    "affiliations": (".gs_ai_aff", None, "normalize"),
+    "email": (".gs_ai_eml", "text()", "first"),
+    "cited_by": (".gs_ai_cby", "text()", "first"),  # Cited by <count>
+    "interests": (".gs_ai_one_int", "text()", "all"),
+})
+
+# Results of a /scholar article search
+ARTICLE_RESULTS = BlockExtractor(f"//*[{_has_class('gs_ri')}]", {
+    "title": (".gs_rt", ".//a//text()", "join"),
+    "link": (".gs_rt", ".//a/@href", "first"),
+    "authors_journal": (".gs_a", None, "normalize"),
+})
+
+# Header of a single citations profile (the whole page is one block)
+PROFILE_PAGE = BlockExtractor("/*", {
+    "name": ("#gsc_prf_in", "text()", "first"),
+    "affiliations": (".gsc_prf_il", "text()", "first"),
+    "interests": (".gsc_prf_inta", f".//*[{_has_class('gsc_prf_inta')}]/text()", "all"),
+    "cited_by": ("#gsc_rsb_st", f".//*[{_has_class('gsc_rsb_std')}]/text()", "first"),
+})
+
+# "Next" button of a search_authors page (the walk over a block includes the block itself)
+NEXT_AUTHOR_PAGE = BlockExtractor(f"//button[{_has_class('gs_btnPR')}]", {
+    "onclick": (".gs_btnPR", "@onclick", "first"),
+})
+AFTER_AUTHOR = re.compile(r"after_author\\x3d(.*)\\x26")
+
 
 class GoogleScholar:
-    def __init__(self):
-        # Default headers for all requests
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.87 Safari/537.36",
-        }
+    # journal: optional CrawlJournal; author searches then commit every page and resume
+    # from the last committed one when rerun
+    def __init__(self, fetcher=None, client=None, journal=None):
+        # Default headers for all requests (the Scholar session already carries them)
+        self.headers = dict(SessionPool.DEFAULT_HEADERS["scholar"])
         self.base_url_citations = "https://scholar.google.com/citations"
         self.base_url_article = "https://scholar.google.com/scholar"
-    # Utility method for fetching the HTML content
-    def _fetch_html(self, params, look_for: str = "citations"):
+        self.fetcher = fetcher or get_default_fetcher()
+        self.client = client or SourceClient("scholar", headers=self.headers, timeout=30,
+                                             is_throttled=self._is_captcha)
+        self.journal = journal
+
+    # Scholar answers over-eager clients with a CAPTCHA page (sometimes with status 200)
+    @staticmethod
+    def _is_captcha(response) -> bool:
+        return "/sorry/" in response.url or "gs_captcha" in response.text or "unusual traffic" in response.text
+
+    # Utility method for fetching the HTML content. With a parse callable, the page is parsed
+    # (HTML -> tree -> records) under the parse timer and parse's result is returned instead
+    def _fetch_html(self, params, look_for: str = "citations", parse=None):
+        if look_for == "citations":
+            url = self.base_url_citations
+            # The citations endpoint serves both author searches and single profiles
+            kind = "scholar.authors" if params.get("view_op") == "search_authors" else "scholar.profile"
+        elif look_for == "articles":
+            url = self.base_url_article
+            kind = "scholar.articles"
+        else:
+            return None
         try:
-            if look_for == "citations":
-                response = requests.get(self.base_url_citations, params=params, headers=self.headers, timeout=30)
-                return Selector(response.text)
-            elif look_for == "articles":
-                response = requests.get(self.base_url_article, params=params, headers=self.headers, timeout=30)
-                return Selector(response.text)
-            else:
-                return None
-        except requests.RequestException as e:
+            response = self.client.get(url, params=params, kind=kind)
+            from parsel import Selector
+            with get_default_metrics().parsing("scholar") as page:
+                select = Selector(response.text)
+                if parse is None:
+                    return select
+                result = parse(select)
+                # Author pages parse to (profiles, next page token)
+                records = result[0] if isinstance(result, tuple) else result
+                page.records = len(records) if isinstance(records, list) else 1
+            return result
+        except FetchError as e:
+            # Retries and backoff already happened in the scheduler
             print(f"Error fetching data: {e}")
             return None
 
@@ -36,50 +166,89 @@ class GoogleScholar:
             "hl": "en",  # Set language to English
             "astart": 0  # Starting page for pagination
         }
-        iteration_count = 0
-        profile_results = []
-        profiles_is_present = True
+        crawl = CrawlJournal.crawl_key("authors", label, university_name)
+        profile_results, params, iteration_count, done = self._resume_crawl(crawl, params)
+        if done:
+            return profile_results
 
         # Loop through multiple pages (pagination)
-        while profiles_is_present and iteration_count < number_of_iterations:
+        while iteration_count < number_of_iterations:
             print(f"Extracting authors from page #{params['astart']}")
-            select = self._fetch_html(params)
-            if not select:
+            page = self._fetch_html(params, parse=self._parse_author_page)
+            if not page:
                 break
 
-            # Parse the profiles on the current page
-            for profile in select.css(".gs_ai_chpr"):
-                name = profile.css(".gs_ai_name a::text").get()
-                link = f"https://scholar.google.com{profile.css('.gs_ai_name a::attr(href)').get()}"
-                affiliations = profile.css(".gs_ai_aff").xpath('normalize-space()').get()
-                email = profile.css(".gs_ai_eml::text").get()
-                cited_by = profile.css(".gs_ai_cby::text").get()  # Cited by <count>
-                interests = profile.css(".gs_ai_one_int::text").getall()
-
-                profile_results.append({
-                    "name": name,
-                    "link": link,
-                    "affiliations": affiliations,
-                    "email": email,
-                    "cited_by": cited_by,
-                    "interests": interests
-                })
-
-            # Check if there is a next page
-            if select.css("button.gs_btnPR::attr(onclick)").get():
-                next_page_token = re.search(r"after_author\\x3d(.*)\\x26",
-                                            select.css("button.gs_btnPR::attr(onclick)").get())
-                if next_page_token:
-                    params["after_author"] = next_page_token.group(1)  # Pagination token
-                    params["astart"] += 10  # Move to the next page
-                    iteration_count += 1
-                else:
-                    profiles_is_present = False
-            else:
-                profiles_is_present = False
+            page_results, next_page = page
+            profile_results.extend(page_results)
+            has_next = self._advance_author_page(next_page, params)
+            self._journal_page(crawl, iteration_count, page_results, params, not has_next)
+            if not has_next:
+                break
+            iteration_count += 1
 
         return profile_results
 
+    # Async variant: each page needs the after_author token of the previous one, so pages are
+    # awaited in turn, but the calling event loop stays free while the request is in flight.
+    async def findProfessorByUniversityAsync(self, label: str, university_name: str,
+                                             number_of_iterations: int = 10) -> list:
+        params = {
+            "view_op": "search_authors",
+            "mauthors": f'label:{label} "{university_name}"',
+            "hl": "en",
+            "astart": 0
+        }
+        crawl = CrawlJournal.crawl_key("authors", label, university_name)
+        profile_results, params, iteration_count, done = self._resume_crawl(crawl, params)
+        if done:
+            return profile_results
+
+        while iteration_count < number_of_iterations:
+            page = await self.fetcher.fetch("scholar", self._fetch_html, dict(params), parse=self._parse_author_page)
+            if not page:
+                break
+
+            page_results, next_page = page
+            profile_results.extend(page_results)
+            has_next = self._advance_author_page(next_page, params)
+            self._journal_page(crawl, iteration_count, page_results, params, not has_next)
+            if not has_next:
+                break
+            iteration_count += 1
+
+        return profile_results
+
+    async def findProfessorByFieldAsync(self, field: str, number_of_iterations: int = 10) -> list:
+        return await self.findProfessorByUniversityAsync(label="", university_name=f"{field}",
+                                                         number_of_iterations=number_of_iterations)
+
+    # Pick up a journaled crawl: results so far, the params of the next page, pages done and
+    # whether the last page was reached. Without a journal every crawl starts fresh.
+    def _resume_crawl(self, crawl, params):
+        if not self.journal:
+            return [], params, 0, False
+        results, cursor, pages, done = self.journal.resume(crawl)
+        return results, cursor or params, pages, done
+
+    # Commit a parsed page with the cursor (after_author/astart) of the page that follows it
+    def _journal_page(self, crawl, page, results, params, done):
+        if self.journal:
+            self.journal.record_page(crawl, page, results, params, done)
+
+    # Parse a search_authors page into its profiles and the after_author token of the next page
+    def _parse_author_page(self, select) -> tuple:
+        onclick = [button["onclick"] for button in NEXT_AUTHOR_PAGE.extract(select) if button["onclick"]]
+        next_page_token = AFTER_AUTHOR.search(onclick[0]) if onclick else None
+        return self._parse_profile_page(select), next_page_token.group(1) if next_page_token else None
+
+    # Move params to the next author page; returns False when there is none
+    def _advance_author_page(self, next_page_token, params) -> bool:
+        if not next_page_token:
+            return False
+        params["after_author"] = next_page_token  # Pagination token
+        params["astart"] += 10  # Move to the next page
+        return True
+
     # Method to find professors by field of study
     def findProfessorByField(self, field: str, number_of_iterations: int = 10) -> list:
         return self.findProfessorByUniversity(label="", university_name=f"{field}",
@@ -97,24 +266,12 @@ class GoogleScholar:
 
     # Method to find professor by Google Scholar ID (profile link)
     def findProfessorByID(self, scholar_id: str) -> dict:
-        profile_url = f"https://scholar.google.com/citations?hl=en&user={scholar_id}"
-        select = self._fetch_html({"user": scholar_id, "hl": "en"})
-        if not select:
-            return {}
-
-        name = select.css("#gsc_prf_in::text").get()
-        affiliations = select.css(".gsc_prf_il::text").get()
-        interests = select.css(".gsc_prf_inta .gsc_prf_inta::text").getall()
-        cited_by = select.css("#gsc_rsb_st .gsc_rsb_std::text").get()
-
-        return {
-            "name": name,
-            "affiliations": affiliations,
-            "interests": interests,
-            "cited_by": cited_by
-        }
+        return self._fetch_html({"user": scholar_id, "hl": "en"}, parse=self._parse_profile) or {}
+
+    # Internal utility to parse the header of a citations profile page
+    def _parse_profile(self, select) -> dict:
+        return PROFILE_PAGE.extract(select)[0]
 
-    # Method to find articles by professor's name
     # Method to find articles by professor's name
     def findArticleByProfessorName(self, professor_name: str, number_of_iterations: int = 2) -> list:
         """
@@ -149,62 +306,85 @@ class GoogleScholar:
         """
         article_results = []
 
-
         for page in range(number_of_iterations):
-            params = {
-                "q": query,
-                "hl": "en",
-                "start": page * 10,  # Pagination: 10 results per page
-                "as_sdt": "0,5"
-            }
-
-            # Fetch the HTML content
-            select = self._fetch_html(params, "articles")
-            if not select:
+            articles = self._fetch_article_page(query, page)
+            if articles is None:
                 break  # Stop if no more results
+            article_results.extend(articles)
 
-            # Extract article info from the div.gs_ri
-            for article in select.css(".gs_ri"):
-                title = "".join(article.css(".gs_rt a").xpath(".//text()").getall()).replace("\"", "")
-                link = article.css(".gs_rt a::attr(href)").get()
-                authors_journal = article.css(".gs_a").xpath('normalize-space()').get()
+        return article_results
 
-                # Split the authors and journal info
-                authors = authors_journal.split(" - ")[0]
-                journal_info = authors_journal.split(" - ")[1] if len(authors_journal.split(" - ")) > 1 else None
+    # Internal utility to fetch and parse a single page of article results
+    def _fetch_article_page(self, query: str, page: int):
+        """
+        Fetch one page of article results.
 
-                article_results.append({
-                    "title": title,
-                    "link": link,
-                    "authors": authors,
-                    "journal_info": journal_info
-                })
+        :param query: The query string (field or professor's name).
+        :param page: Zero-based page number (10 results per page).
+        :return: List of articles on the page, or None if the page could not be fetched.
+        """
+        params = {
+            "q": query,
+            "hl": "en",
+            "start": page * 10,  # Pagination: 10 results per page
+            "as_sdt": "0,5"
+        }
 
+        # Fetch and parse the HTML content (None if the page could not be fetched)
+        return self._fetch_html(params, "articles", self._parse_article_page)
+
+    # Internal utility to parse the results of a /scholar search page
+    def _parse_article_page(self, select) -> list:
+        article_results = []
+        # Extract article info from the div.gs_ri
+        for article in ARTICLE_RESULTS.extract(select):
+            # Split the authors and journal info
+            parts = (article["authors_journal"] or "").split(" - ")
+
+            article_results.append({
+                "title": article["title"].replace("\"", ""),
+                "link": article["link"],
+                "authors": parts[0],
+                "journal_info": parts[1] if len(parts) > 1 else None
+            })
+
+        return article_results
+
+    # Async variant of _find_articles: all page offsets are known up front, so fetch them concurrently
+    async def _find_articles_async(self, query: str, number_of_iterations: int) -> list:
+        """
+        Concurrent version of _find_articles. Pages are returned in order and
+        everything after the first page that fails to load is dropped, as in
+        the sequential version.
+
+        :param query: The query string (field or professor's name).
+        :param number_of_iterations: Number of pages to fetch.
+        :return: List of articles (with title, link, authors, and journal).
+        """
+        pages = await self.fetcher.gather("scholar", self._fetch_article_page,
+                                          [(query, page) for page in range(number_of_iterations)])
+        article_results = []
+        for articles in pages:
+            if articles is None:
+                break
+            article_results.extend(articles)
         return article_results
 
+    async def findArticleByProfessorNameAsync(self, professor_name: str, number_of_iterations: int = 2) -> list:
+        return await self._find_articles_async(f'"{professor_name}"', number_of_iterations)
+
+    async def findArticleByFieldAsync(self, field: str, number_of_iterations: int = 2) -> list:
+        return await self._find_articles_async(field, number_of_iterations)
+
     # Internal utility to extract profiles
     def _extract_profiles(self, params):
-        profile_results = []
-        select = self._fetch_html(params)
-        if not select:
-            return profile_results
+        return self._fetch_html(params, parse=self._parse_profile_page) or []
 
-        for profile in select.css(".gs_ai_chpr"):
-            name = profile.css(".gs_ai_name a::text").get()
-            link = f"https://scholar.google.com{profile.css('.gs_ai_name a::attr(href)').get()}"
-            affiliations = profile.css(".gs_ai_aff").xpath('normalize-space()').get()
-            email = profile.css(".gs_ai_eml::text").get()
-            cited_by = profile.css(".gs_ai_cby::text").get()
-            interests = profile.css(".gs_ai_one_int::text").getall()
-
-            profile_results.append({
-                "name": name,
-                "link": link,
-                "affiliations": affiliations,
-                "email": email,
-                "cited_by": cited_by,
-                "interests": interests
-            })
+    # Internal utility to parse the author cards of a search_authors page
+    def _parse_profile_page(self, select) -> list:
+        profile_results = PROFILE_CARDS.extract(select)
+        for profile in profile_results:
+            profile["link"] = f"https://scholar.google.com{profile['link']}"
         return profile_results
 
 
@@ -215,13 +395,35 @@ class GoogleScholar:
         if not os.path.exists(directory):
             os.makedirs(directory)
 
-        # Convert the list of dictionaries to a DataFrame
-        df = pd.DataFrame(data)
+        # Convert the list of dictionaries to a DataFrame (pandas is only loaded for CSV export)
+        import pandas as pd
+        metrics = get_default_metrics()
+        with metrics.timer("write_seconds", "scholar"):
+            df = pd.DataFrame(data)
 
-        # Save the DataFrame to the specified CSV path
-        df.to_csv(path, index=False)
+            # Save the DataFrame to the specified CSV path
+            df.to_csv(path, index=False)
+        metrics.inc("records_written_total", "scholar", len(df))
         print(f"Data saved to {path}")
 
+    # Append profiles ('profiles') or articles ('papers') to the columnar record store
+    def _save_to_store(self, data: list, kind: str, store=None) -> int:
+        return (store or get_default_store()).append_batches(kind, "scholar", data)
+
+    def findProfessorByUniversityAndStore(self, label: str, university_name: str, number_of_iterations: int = 10,
+                                          store=None) -> int:
+        data = self.findProfessorByUniversity(label, university_name, number_of_iterations)
+        return self._save_to_store(data, "profiles", store)
+
+    def findArticleByFieldAndStore(self, field: str, number_of_iterations: int = 2, store=None) -> int:
+        data = self.findArticleByField(field, number_of_iterations)
+        return self._save_to_store(data, "papers", store)
+
+    def findArticleByProfessorNameAndStore(self, professor_name: str, number_of_iterations: int = 2,
+                                           store=None) -> int:
+        data = self.findArticleByProfessorName(professor_name, number_of_iterations)
+        return self._save_to_store(data, "papers", store)
+
     # 1. Save professors by university to CSV
     def findProfessorByUniversityAndSave(self, label: str, university_name: str, path: str,
                                          number_of_iterations: int = 10):
@@ -1,15 +1,27 @@
-import requests
-import json
 import csv
 
+from xavier_telepath.data_collectors.api_integrations import SourceClient, get_default_fetcher
+from xavier_telepath.metrics import get_default_metrics
+from xavier_telepath.storage.data_storage import get_default_store
+
 
 class ScopusAPI:
     BASE_URL = "https://api.elsevier.com/content/"
 
-    def __init__(self, api_key, max_results=10):
+    # Only the fields read by parse_article_results / parse_people_results are requested
+    # in the high-volume methods, which keeps payloads (and quota use) small
+    ARTICLE_FIELDS = "dc:identifier,dc:title,dc:creator,prism:publicationName,prism:doi,dc:description,prism:coverDate"
+    PEOPLE_FIELDS = "dc:identifier,preferred-name,affiliation-current,orcid,subject-area,author-profile"
+
+    # Identifiers OR-ed into a single lookup query
+    LOOKUP_BATCH_SIZE = 25
+
+    def __init__(self, api_key, max_results=10, fetcher=None, client=None):
         self.api_key = api_key
         self.max_results = max_results
         self.headers = {"X-ELS-APIKey": self.api_key}
+        self.fetcher = fetcher or get_default_fetcher()
+        self.client = client or SourceClient("scopus", headers=self.headers)
 
     def search_articles(self, field, query, subject=None, start_index=0):
         """
@@ -25,23 +37,93 @@ class ScopusAPI:
         - A list of dictionaries containing article information
         """
         url = f"{self.BASE_URL}search/scopus"
+        params = {
+            "query": self._article_query(field, query, subject),
+            "start": start_index,
+            "count": self.max_results
+        }
+
+        response = self.client.get(url, params=params, kind="scopus.articles")
+        return self._parse_page(response, self.parse_article_results)[1]
+
+    def _article_query(self, field, query, subject):
         query_str = f"{field}({query})"
 
         if subject:
             query_str += f" AND SUBJAREA({subject})"  # Add subject to the query
+        return query_str
+
+    def iter_articles(self, field, query, subject=None, page_size=25, limit=None):
+        """
+        Page through every article of a search with cursor-based pagination.
+
+        Unlike search_articles, this is not limited by the Scopus offset cap, does not
+        slow down at deep offsets and requests only ARTICLE_FIELDS.
+
+        Parameters:
+        - field, query, subject: Same as search_articles
+        - page_size: Entries per request (the key's maximum count, usually 25)
+        - limit: Maximum number of articles to yield (optional, default: all)
 
+        Yields:
+        - Dictionaries containing article information, one at a time
+        """
+        url = f"{self.BASE_URL}search/scopus"
         params = {
-            "query": query_str,
-            "start": start_index,
-            "count": self.max_results
+            "query": self._article_query(field, query, subject),
+            "cursor": "*",
+            "count": page_size,
+            "field": self.ARTICLE_FIELDS,
         }
+        yielded = 0
+        while limit is None or yielded < limit:
+            # Never cached: a replayed page would hand back a stale @next cursor
+            response = self.client.get(url, params=params, kind="scopus.articles", cache=False)
+            data, articles = self._parse_page(response, self.parse_article_results)
+            for article in articles[:None if limit is None else limit - yielded]:
+                yielded += 1
+                yield article
+            next_cursor = data.get('search-results', {}).get('cursor', {}).get('@next')
+            if len(articles) < page_size or not next_cursor or next_cursor == params["cursor"]:
+                break  # Last page
+            params = {**params, "cursor": next_cursor}
+
+    def lookup_articles(self, dois=(), eids=()):
+        """
+        Retrieve articles by DOI and/or EID, LOOKUP_BATCH_SIZE identifiers per request.
+
+        Parameters:
+        - dois: Iterable of DOIs
+        - eids: Iterable of Scopus EIDs (e.g. '2-s2.0-85012345678')
+
+        Returns:
+        - A list of dictionaries containing article information (identifiers Scopus
+          does not know are simply missing)
+        """
+        url = f"{self.BASE_URL}search/scopus"
+        terms = [f'DOI("{doi}")' for doi in dict.fromkeys(dois)] + [f"EID({eid})" for eid in dict.fromkeys(eids)]
+        articles = []
+        for start in range(0, len(terms), self.LOOKUP_BATCH_SIZE):
+            batch = terms[start:start + self.LOOKUP_BATCH_SIZE]
+            params = {"query": " OR ".join(batch), "count": len(batch), "field": self.ARTICLE_FIELDS}
+            response = self.client.get(url, params=params, kind="scopus.articles")
+            articles.extend(self._parse_page(response, self.parse_article_results)[1])
+        return articles
 
-        response = requests.get(url, headers=self.headers, params=params)
-        if response.status_code != 200:
-            raise Exception(f"Failed to retrieve data: {response.status_code}")
+    async def search_articles_async(self, field, query, subject=None, start_index=0, pages=1):
+        """
+        Fetch several consecutive article result pages concurrently.
 
-        data = response.json()
-        return self.parse_article_results(data)
+        Parameters:
+        - field, query, subject, start_index: Same as search_articles
+        - pages: Number of pages of max_results entries to fetch
+
+        Returns:
+        - A list of dictionaries containing article information, in page order
+        """
+        offsets = [(field, query, subject, start_index + page * self.max_results) for page in range(pages)]
+        results = await self.fetcher.gather("scopus", self.search_articles, offsets)
+        return [article for page in results for article in page]
 
     def search_people(self, query, start_index=0):
         """
@@ -54,19 +136,64 @@ class ScopusAPI:
         Returns:
         - A list of dictionaries containing author information
         """
-        url = f"{self.BASE_URL}content/author"
+        url = f"{self.BASE_URL}search/author"
         params = {
             "query": query,
             "start": start_index,
             "count": self.max_results
         }
 
-        response = requests.get(url, headers=self.headers, params=params)
-        if response.status_code != 200:
-            raise Exception(f"Failed to retrieve data: {response.status_code}")
+        response = self.client.get(url, params=params, kind="scopus.people")
+        return self._parse_page(response, self.parse_people_results)[1]
+
+    def iter_people(self, query, page_size=25, limit=None):
+        """
+        Page through every author of a search, requesting only PEOPLE_FIELDS.
+
+        The Author Search API has no cursor, so pages are still requested by offset.
+
+        Parameters:
+        - query: Same as search_people
+        - page_size: Entries per request (the key's maximum count, usually 25)
+        - limit: Maximum number of authors to yield (optional, default: all)
 
-        data = response.json()
-        return self.parse_people_results(data)
+        Yields:
+        - Dictionaries containing author information, one at a time
+        """
+        url = f"{self.BASE_URL}search/author"
+        start = 0
+        while limit is None or start < limit:
+            params = {"query": query, "start": start, "count": page_size, "field": self.PEOPLE_FIELDS}
+            response = self.client.get(url, params=params, kind="scopus.people")
+            people = self._parse_page(response, self.parse_people_results)[1]
+            for person in people[:None if limit is None else limit - start]:
+                yield person
+            start += len(people)
+            if len(people) < page_size:
+                break  # Last page
+
+    async def search_people_async(self, query, start_index=0, pages=1):
+        """
+        Fetch several consecutive author result pages concurrently.
+
+        Parameters:
+        - query, start_index: Same as search_people
+        - pages: Number of pages of max_results entries to fetch
+
+        Returns:
+        - A list of dictionaries containing author information, in page order
+        """
+        offsets = [(query, start_index + page * self.max_results) for page in range(pages)]
+        results = await self.fetcher.gather("scopus", self.search_people, offsets)
+        return [person for page in results for person in page]
+
+    def _parse_page(self, response, parse):
+        # Decoding the JSON body is part of the page's parse cost
+        with get_default_metrics().parsing("scopus") as page:
+            data = response.json()
+            results = parse(data)
+            page.records = len(results)
+        return data, results
 
     def parse_article_results(self, data):
         """
@@ -78,7 +205,8 @@ class ScopusAPI:
         Returns:
         - A list of dictionaries, each representing an article
         """
-        entries = data.get('search-results', {}).get('entry', [])
+        # An empty result set comes back as a single {"error": "Result set was empty"} entry
+        entries = [entry for entry in data.get('search-results', {}).get('entry', []) if 'error' not in entry]
         articles = []
 
         for entry in entries:
@@ -105,7 +233,7 @@ class ScopusAPI:
         Returns:
         - A list of dictionaries, each representing an author
         """
-        entries = data.get('search-results', {}).get('entry', [])
+        entries = [entry for entry in data.get('search-results', {}).get('entry', []) if 'error' not in entry]
         people = []
 
         for entry in entries:
@@ -138,14 +266,36 @@ class ScopusAPI:
         else:
             raise ValueError("Invalid data_type. Expected 'articles' or 'people'.")
 
-        with open(file_path, mode='w', newline='', encoding='utf-8') as file:
+        metrics = get_default_metrics()
+        written = 0
+        with metrics.timer("write_seconds", "scopus"), open(file_path, mode='w', newline='', encoding='utf-8') as file:
             writer = csv.DictWriter(file, fieldnames=fieldnames)
             writer.writeheader()
             for entry in data:
                 if data_type == "people":
-                    # Join research areas for CSV
-                    entry['research_areas'] = ', '.join([area.get('$', '') for area in entry.get('research_areas', [])])
+                    # Join research areas for CSV (on a copy, the caller's dicts stay intact)
+                    entry = {**entry,
+                             'research_areas': ', '.join([area.get('$', '') for area in entry.get('research_areas', [])])}
                 writer.writerow(entry)
+                written += 1
+        metrics.inc("records_written_total", "scopus", written)
+
+    def save_to_store(self, data, data_type="articles", store=None):
+        """
+        Append search results to the columnar record store (partitioned by source and harvest date).
+
+        Parameters:
+        - data: A list of dictionaries (articles or author information).
+        - data_type: Type of data to save ('articles' or 'people').
+        - store: ParquetStore to write to (defaults to the shared one)
+
+        Returns:
+        - The number of records written
+        """
+        kinds = {"articles": "papers", "people": "authors"}
+        if data_type not in kinds:
+            raise ValueError("Invalid data_type. Expected 'articles' or 'people'.")
+        return (store or get_default_store()).append_batches(kinds[data_type], "scopus", data)
 
 
 # Example usage
@@ -0,0 +1,721 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+
+from xavier_telepath.metrics import get_default_metrics
+
+# pyarrow is only needed by ParquetStore and is imported when the first store is opened,
+# so the response cache (and everything importing this module) starts without it
+pa = ds = pq = None
+
+
+def _require_arrow():
+    global pa, ds, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.dataset
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("ParquetStore requires pyarrow (pip install pyarrow)") from None
+        pa, ds, pq = pyarrow, pyarrow.dataset, pyarrow.parquet
+
+
+class CachedResponse:
+    """
+    Minimal stand-in for requests.Response, served from the response cache.
+    """
+
+    def __init__(self, status_code, content, headers, url):
+        # Cached responses only exist once requests is in use, so importing it here costs nothing
+        from requests.structures import CaseInsensitiveDict
+
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers)
+        self.url = url
+        self.from_cache = True
+
+    @property
+    def text(self):
+        content_type = self.headers.get("Content-Type", "")
+        encoding = "utf-8"
+        if "charset=" in content_type:
+            encoding = content_type.split("charset=")[-1].split(";")[0].strip()
+        return self.content.decode(encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ResponseCache:
+    """
+    On-disk HTTP response cache shared by the scrapers.
+
+    Entries are keyed by URL plus normalized query parameters and live in a single
+    SQLite file. Each source has its own TTL; once an entry is stale it is revalidated
+    with If-None-Match / If-Modified-Since when the upstream sent an ETag or
+    Last-Modified header, and refetched otherwise. The cache is bounded in size and
+    evicts the least recently used entries first.
+    """
+
+    # Seconds an entry is served without contacting the upstream
+    DEFAULT_TTLS = {
+        "arxiv": 24 * 3600,
+        "scopus": 7 * 24 * 3600,
+        "scholar": 24 * 3600,
+    }
+
+    def __init__(self, path, ttls=None, default_ttl=24 * 3600, max_bytes=512 * 1024 * 1024):
+        """
+        Parameters:
+        - path: Path of the SQLite cache file (parent directories are created)
+        - ttls: Dict of source -> TTL in seconds, merged over DEFAULT_TTLS
+        - default_ttl: TTL for sources not listed in ttls
+        - max_bytes: Upper bound for the total size of cached bodies
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, source TEXT, url TEXT, status INTEGER, headers TEXT, body BLOB,"
+            " etag TEXT, last_modified TEXT, stored_at REAL, last_access REAL, size INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._db.commit()
+        # Running total of the cached body sizes, kept in step with every insert and delete
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def cache_key(url, params=None):
+        """
+        Build the cache key from the URL and its parameters, independent of their order.
+        """
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None)
+        return hashlib.sha256(f"{url}?{urlencode(items)}".encode("utf-8")).hexdigest()
+
+    def ttl_for(self, source):
+        return self.ttls.get(source, self.default_ttl)
+
+    def _load(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, etag, last_modified, stored_at, url FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row:
+                self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+        return row
+
+    def _touch(self, key):
+        # A 304 restarts the entry's TTL
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, key))
+            self._db.commit()
+
+    def _store(self, key, source, response):
+        from requests.structures import CaseInsensitiveDict
+
+        headers = CaseInsensitiveDict(response.headers)
+        body = response.content
+        now = time.time()
+        with self._lock:
+            replaced = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if replaced:
+                self._size -= replaced[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, source, response.url, response.status_code, json.dumps(dict(headers)), body,
+                 headers.get("ETag"), headers.get("Last-Modified"), now, now, len(body))
+            )
+            self._size += len(body)
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # Called with the lock held
+        if self._size <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._size -= size
+            if self._size <= self.max_bytes:
+                break
+
+    def _count(self, counter):
+        # The cache is shared by the fetcher's worker threads
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def fetch(self, source, url, params, send):
+        """
+        Serve a GET from the cache, revalidating or refetching when needed.
+
+        Parameters:
+        - source: Name of the upstream source (selects the TTL)
+        - url, params: The request being made
+        - send: Callable taking a dict of extra (conditional) headers and performing the request
+
+        Returns:
+        - A CachedResponse for cache hits and successful revalidations, otherwise the
+          response returned by send (only status 200 responses are stored)
+        """
+        key = self.cache_key(url, params)
+        row = self._load(key)
+        if row:
+            status, headers, body, etag, last_modified, stored_at, cached_url = row
+            cached = CachedResponse(status, body, json.loads(headers), cached_url)
+            if time.time() - stored_at < self.ttl_for(source):
+                self._count("hits")
+                return cached
+
+            conditional = {}
+            if etag:
+                conditional["If-None-Match"] = etag
+            if last_modified:
+                conditional["If-Modified-Since"] = last_modified
+            if conditional:
+                response = send(conditional)
+                if response.status_code == 304:
+                    self._count("revalidated")
+                    self._touch(key)
+                    return cached
+                if response.status_code == 200:
+                    self._store(key, source, response)
+                self._count("misses")
+                return response
+
+        self._count("misses")
+        response = send({})
+        if response.status_code == 200:
+            self._store(key, source, response)
+        return response
+
+    def clear(self, source=None):
+        """
+        Drop every cached entry, or only those of one source.
+        """
+        with self._lock:
+            if source:
+                self._db.execute("DELETE FROM responses WHERE source = ?", (source,))
+                self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            else:
+                self._db.execute("DELETE FROM responses")
+                self._size = 0
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"entries": entries, "bytes": self._size, "hits": self.hits, "misses": self.misses,
+                    "revalidated": self.revalidated}
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """
+    Return the process-wide response cache, stored under $XAVIER_CACHE_DIR
+    (default: ~/.cache/xavier_telepath).
+    """
+    global _default_cache
+    if _default_cache is None:
+        directory = os.environ.get("XAVIER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "xavier_telepath"))
+        _default_cache = ResponseCache(os.path.join(directory, "responses.sqlite"))
+    return _default_cache
+
+
+class CrawlJournal:
+    """
+    Durable per-page journal for long paginated crawls.
+
+    Each fetched page is committed together with its results and the cursor needed
+    to request the next page, so a crawl that dies halfway can be restarted and
+    continue from its last committed page instead of from scratch. Crawls are
+    identified by a caller-chosen key (e.g. the query that drives them).
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+        - path: Path of the SQLite journal file (parent directories are created)
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " crawl TEXT, page INTEGER, cursor TEXT, results TEXT, done INTEGER, recorded_at REAL,"
+            " PRIMARY KEY (crawl, page))"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def crawl_key(*parts):
+        return json.dumps([str(part) for part in parts], ensure_ascii=False)
+
+    def resume(self, crawl):
+        """
+        Load what a crawl has committed so far.
+
+        Returns:
+        - A (results, cursor, pages, done) tuple: every committed result in page order,
+          the cursor for the next page (None if the crawl never started), the number of
+          committed pages and whether the crawl reached its last page
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT cursor, results, done FROM pages WHERE crawl = ? ORDER BY page", (crawl,)
+            ).fetchall()
+        results = []
+        for _, page_results, _ in rows:
+            results.extend(json.loads(page_results))
+        if not rows:
+            return results, None, 0, False
+        cursor, _, done = rows[-1]
+        return results, json.loads(cursor), len(rows), bool(done)
+
+    def record_page(self, crawl, page, results, cursor, done=False):
+        """
+        Commit one page of a crawl.
+
+        Parameters:
+        - crawl: Key of the crawl
+        - page: Zero-based page number
+        - results: The JSON-serializable results parsed from the page
+        - cursor: JSON-serializable state needed to request the following page
+        - done: True when this was the last page
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (crawl, page, json.dumps(cursor), json.dumps(results, ensure_ascii=False), int(done), time.time())
+            )
+            self._db.commit()
+
+    def reset(self, crawl=None):
+        """
+        Forget a crawl (or every crawl) so it starts over on its next run.
+        """
+        with self._lock:
+            if crawl:
+                self._db.execute("DELETE FROM pages WHERE crawl = ?", (crawl,))
+            else:
+                self._db.execute("DELETE FROM pages")
+            self._db.commit()
+
+    def crawls(self):
+        """
+        Summarize every journaled crawl.
+
+        Returns:
+        - A dict of crawl key -> {"pages", "results", "done"}
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT crawl, COUNT(*), SUM(json_array_length(results)), MAX(done) FROM pages GROUP BY crawl"
+            ).fetchall()
+        return {crawl: {"pages": pages, "results": count or 0, "done": bool(done)} for crawl, pages, count, done in rows}
+
+
+class RawArchive:
+    """
+    Content-addressed archive of raw response bodies.
+
+    Bodies are stored gzip-compressed under objects/<sha256[:2]>/<sha256>.gz, so
+    identical responses are kept once; a SQLite index records every fetch (source,
+    parser kind, URL, parameters, time) and the blob it produced. Archived bodies can
+    be replayed through the current parsers (see storage/reparse.py) without
+    contacting the upstream again.
+    """
+
+    def __init__(self, root, compresslevel=6):
+        """
+        Parameters:
+        - root: Directory holding the blobs and the index (created when missing)
+        - compresslevel: gzip level used for new blobs
+        """
+        self.root = root
+        self.compresslevel = compresslevel
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fetches ("
+            " id INTEGER PRIMARY KEY, digest TEXT, source TEXT, kind TEXT, url TEXT, params TEXT, fetched_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS fetches_kind ON fetches (kind, fetched_at)")
+        self._db.commit()
+
+    @staticmethod
+    def blob_path(root, digest):
+        return os.path.join(root, "objects", digest[:2], f"{digest}.gz")
+
+    def path_for(self, digest):
+        return self.blob_path(self.root, digest)
+
+    def _index(self, digest, source, kind, url, params):
+        items = {str(k): str(v) for k, v in (params or {}).items() if v is not None}
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO fetches (digest, source, kind, url, params, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, source, kind, url, json.dumps(items, sort_keys=True), time.time())
+            )
+            self._db.commit()
+
+    def put(self, source, kind, url, params, body):
+        """
+        Archive a complete response body.
+
+        Parameters:
+        - source: Name of the upstream source
+        - kind: Parser kind of the body (a key of reparse.PARSERS, e.g. 'scopus.people')
+        - url, params: The request that produced it
+        - body: The raw (decoded) response bytes
+
+        Returns:
+        - The SHA-256 digest addressing the body
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.path_for(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+            with gzip.open(temporary, "wb", compresslevel=self.compresslevel) as file:
+                file.write(body)
+            os.replace(temporary, path)
+        self._index(digest, source, kind, url, params)
+        return digest
+
+    def tee(self, source, kind, url, params, stream):
+        """
+        Wrap a readable stream so that everything read from it is archived.
+
+        The body is only archived once the reader has been read to the end and closed;
+        partially consumed streams are discarded.
+        """
+        return _ArchivingReader(self, source, kind, url, params, stream)
+
+    def read(self, digest):
+        """
+        Return the decompressed body of a blob.
+        """
+        with gzip.open(self.path_for(digest), "rb") as file:
+            return file.read()
+
+    def entries(self, kinds=None, since=None, until=None):
+        """
+        List archived fetches, oldest first.
+
+        Parameters:
+        - kinds: Only these parser kinds
+        - since, until: Only fetches made in this inclusive date range (YYYY-MM-DD, UTC)
+
+        Returns:
+        - A list of dicts with digest, source, kind, url, params, fetched_at
+        """
+        query = "SELECT digest, source, kind, url, params, fetched_at FROM fetches WHERE 1 = 1"
+        arguments = []
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            arguments.extend(kinds)
+        if since:
+            query += " AND fetched_at >= ?"
+            arguments.append(_day_start(since))
+        if until:
+            query += " AND fetched_at < ?"
+            arguments.append(_day_start(until) + 24 * 3600)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY fetched_at", arguments).fetchall()
+        return [{"digest": digest, "source": source, "kind": kind, "url": url, "params": json.loads(params),
+                 "fetched_at": fetched_at} for digest, source, kind, url, params, fetched_at in rows]
+
+
+def _day_start(day):
+    date = datetime.date.fromisoformat(day)
+    return datetime.datetime(date.year, date.month, date.day, tzinfo=datetime.timezone.utc).timestamp()
+
+
+class _ArchivingReader:
+    # File-like wrapper used by RawArchive.tee: hashes and compresses the body to a
+    # temporary blob while it is being read and moves it into place on close.
+
+    def __init__(self, archive, source, kind, url, params, stream):
+        self._archive = archive
+        self._request = (source, kind, url, params)
+        self._stream = stream
+        self._hash = hashlib.sha256()
+        self._temporary = os.path.join(archive.root, "objects", f".{uuid.uuid4().hex}.tmp")
+        self._file = gzip.open(self._temporary, "wb", compresslevel=archive.compresslevel)
+        self._finished = False
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        if data:
+            self._hash.update(data)
+            self._file.write(data)
+        elif size != 0:
+            self._finished = True
+        return data
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if not self._finished:
+            os.remove(self._temporary)
+            return
+        digest = self._hash.hexdigest()
+        path = self._archive.path_for(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(self._temporary, path)
+        self._archive._index(digest, *self._request)
+
+
+def _record_schemas():
+    # Stable column sets for every record kind. Scrapers fill what their source provides
+    # and leave the rest null, so partitions written by different sources scan together.
+    text, texts = pa.string(), pa.list_(pa.string())
+    return {
+        "papers": pa.schema([
+            ("id", text), ("title", text), ("authors", texts), ("published", text), ("updated", text),
+            ("summary", text), ("categories", texts), ("doi", text), ("publication_name", text),
+            ("journal_info", text), ("link", text),
+        ]),
+        "authors": pa.schema([
+            ("id", text), ("name", text), ("affiliation", text), ("orcid", text), ("email", text),
+            ("research_areas", texts),
+        ]),
+        "profiles": pa.schema([
+            ("id", text), ("name", text), ("link", text), ("affiliations", text), ("email", text),
+            ("cited_by", text), ("interests", texts),
+        ]),
+    }
+
+
+class ParquetStore:
+    """
+    Append-only columnar store for harvested records.
+
+    Every append writes one Parquet file under <root>/<kind>/source=<source>/harvest_date=<date>/,
+    so runs never overwrite each other and readers can prune whole partitions.
+    Records are projected onto a fixed schema per kind (papers, authors, profiles)
+    without modifying the caller's dicts.
+    """
+
+    PARTITIONING = ("source", "harvest_date")
+
+    # Source field names that map onto a schema column of a different name
+    ALIASES = {
+        "scopus_id": "id",
+        "abstract": "summary",
+        "publication_date": "published",
+    }
+
+    def __init__(self, root):
+        """
+        Parameters:
+        - root: Directory holding the store (created when missing)
+        """
+        _require_arrow()
+        if not os.path.exists(root):
+            os.makedirs(root)
+        self.root = root
+        self.schemas = _record_schemas()
+
+    def _schema(self, kind):
+        if kind not in self.schemas:
+            raise ValueError(f"Invalid kind. Expected one of: {list(self.schemas.keys())}")
+        return self.schemas[kind]
+
+    @staticmethod
+    def _as_list(value):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return [value]
+        # Scopus subject areas arrive as {"$": name, ...} dicts
+        return [item.get("$", "") if isinstance(item, dict) else str(item) for item in value]
+
+    def _columns(self, schema, records):
+        columns = {name: [] for name in schema.names}
+        for record in records:
+            row = {self.ALIASES.get(key, key): value for key, value in record.items()}
+            for field in schema:
+                value = row.get(field.name)
+                if pa.types.is_list(field.type):
+                    value = self._as_list(value)
+                elif value is not None and not isinstance(value, str):
+                    value = str(value)
+                columns[field.name].append(value)
+        return columns
+
+    def append(self, kind, source, records, harvest_date=None):
+        """
+        Append a batch of records as a new Parquet file in their partition.
+
+        Parameters:
+        - kind: 'papers', 'authors' or 'profiles'
+        - source: Name of the upstream source (e.g. 'arxiv', 'scopus', 'scholar')
+        - records: An iterable of dictionaries as returned by the scrapers
+        - harvest_date: Partition date (YYYY-MM-DD); defaults to today (UTC)
+
+        Returns:
+        - The path of the written file, or None if records was empty
+        """
+        schema = self._schema(kind)
+        records = list(records)
+        if not records:
+            return None
+        start = time.perf_counter()
+        harvest_date = harvest_date or datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+        table = pa.Table.from_pydict(self._columns(schema, records), schema=schema)
+
+        directory = os.path.join(self.root, kind, f"source={source}", f"harvest_date={harvest_date}")
+        if not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+        # Write under a temporary name so readers never pick up a half-written file
+        temporary = os.path.join(directory, f".{os.path.basename(path)}.tmp")
+        pq.write_table(table, temporary, compression="zstd")
+        os.replace(temporary, path)
+        metrics = get_default_metrics()
+        metrics.observe("write_seconds", source, time.perf_counter() - start)
+        metrics.inc("records_written_total", source, len(records))
+        return path
+
+    def append_batches(self, kind, source, records, batch_size=10000, harvest_date=None):
+        """
+        Append a (possibly unbounded) iterable of records in files of batch_size rows.
+
+        Returns:
+        - The number of records written
+        """
+        written = 0
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self.append(kind, source, batch, harvest_date)
+                written += len(batch)
+                batch = []
+        if batch:
+            self.append(kind, source, batch, harvest_date)
+            written += len(batch)
+        return written
+
+    def dataset(self, kind):
+        """
+        Return the pyarrow dataset of a kind, with source and harvest_date as partition columns.
+        """
+        schema = self._schema(kind)
+        partitioning = ds.partitioning(
+            pa.schema([(name, pa.string()) for name in self.PARTITIONING]), flavor="hive"
+        )
+        full_schema = schema
+        for name in self.PARTITIONING:
+            full_schema = full_schema.append(pa.field(name, pa.string()))
+        directory = os.path.join(self.root, kind)
+        if not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        # Files starting with "." (in-progress writes) are ignored by default
+        return ds.dataset(directory, schema=full_schema, format="parquet", partitioning=partitioning)
+
+    def read(self, kind, columns=None, filter=None, sources=None, since=None, until=None):
+        """
+        Read records of a kind, scanning only the needed columns and partitions.
+
+        Parameters:
+        - kind: 'papers', 'authors' or 'profiles'
+        - columns: List of columns to load (default: all, including source and harvest_date)
+        - filter: Optional pyarrow.dataset expression, e.g. ds.field("doi").is_valid()
+        - sources: Only read these sources
+        - since, until: Only read harvest dates in this inclusive range (YYYY-MM-DD)
+
+        Returns:
+        - A pyarrow.Table (call .to_pandas() for a DataFrame)
+        """
+        expression = filter
+        conditions = []
+        if sources:
+            conditions.append(ds.field("source").isin(list(sources)))
+        if since:
+            conditions.append(ds.field("harvest_date") >= since)
+        if until:
+            conditions.append(ds.field("harvest_date") <= until)
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return self.dataset(kind).to_table(columns=columns, filter=expression)
+
+
+def _data_dir():
+    return os.environ.get("XAVIER_DATA_DIR", os.path.join(os.path.expanduser("~"), ".local", "share", "xavier_telepath"))
+
+
+_default_archive = None
+
+
+def get_default_archive():
+    """
+    Return the process-wide raw response archive, kept under $XAVIER_DATA_DIR
+    (default: ~/.local/share/xavier_telepath).
+    """
+    global _default_archive
+    if _default_archive is None:
+        _default_archive = RawArchive(os.path.join(_data_dir(), "raw"))
+    return _default_archive
+
+
+_default_journal = None
+
+
+def get_default_journal():
+    """
+    Return the process-wide crawl journal, kept under $XAVIER_DATA_DIR
+    (default: ~/.local/share/xavier_telepath).
+    """
+    global _default_journal
+    if _default_journal is None:
+        _default_journal = CrawlJournal(os.path.join(_data_dir(), "crawl_journal.sqlite"))
+    return _default_journal
+
+
+_default_store = None
+
+
+def get_default_store():
+    """
+    Return the process-wide record store, kept under $XAVIER_DATA_DIR
+    (default: ~/.local/share/xavier_telepath).
+    """
+    global _default_store
+    if _default_store is None:
+        _default_store = ParquetStore(os.path.join(_data_dir(), "store"))
+    return _default_store
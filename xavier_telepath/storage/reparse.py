@@ -0,0 +1,176 @@
+"""
+Replay archived raw responses through the current parsers.
+
+Usage:
+    python -m xavier_telepath.storage.reparse [--kind KIND ...] [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+                                              [--workers N] [--out ROOT] [--dry-run]
+
+Every archived body of the selected kinds is decompressed and parsed in a process
+pool, and the records are written under the date the body was originally fetched.
+Nothing is requested from the upstream. The records go to a separate record store
+(by default a new $XAVIER_DATA_DIR/reparsed/<UTC time> directory), never into the
+crawl store that already holds the original parses of the same bodies. A body
+archived by several fetches is parsed once.
+"""
+import argparse
+import datetime
+import gzip
+import io
+import json
+import os
+
+from xavier_telepath.parallel import map_chunks
+from xavier_telepath.storage.data_storage import ParquetStore, RawArchive, _data_dir, get_default_archive
+
+
+class _OfflineClient:
+    # Handed to the scrapers so that only their parsers are usable
+    def get(self, *args, **kwargs):
+        raise RuntimeError("Re-parsing runs offline")
+
+    stream = get
+
+
+_scrapers = {}
+
+
+def _scraper(name):
+    # Created once per worker process, without any network or cache setup
+    if name not in _scrapers:
+        if name == "arxiv":
+            from xavier_telepath.scrapers.arxiv import ArxivAPI
+            _scrapers[name] = ArxivAPI(client=_OfflineClient())
+        elif name == "oai":
+            from xavier_telepath.scrapers.arxiv import ArxivOAIHarvester
+            _scrapers[name] = ArxivOAIHarvester(client=_OfflineClient())
+        elif name == "scopus":
+            from xavier_telepath.scrapers.scopus import ScopusAPI
+            _scrapers[name] = ScopusAPI(None, client=_OfflineClient())
+        elif name == "scholar":
+            from xavier_telepath.scrapers.google_scholar import GoogleScholar
+            _scrapers[name] = GoogleScholar(client=_OfflineClient())
+    return _scrapers[name]
+
+
+def _scholar_page(body):
+    from parsel import Selector
+    return Selector(body.decode("utf-8", errors="replace"))
+
+
+# Parser kind -> (record store kind, function turning a raw body into records)
+PARSERS = {
+    "arxiv.atom": ("papers", lambda body: _scraper("arxiv").parse_response(body)),
+    "arxiv.oai": ("papers", lambda body: list(_scraper("oai").iter_parse_records(io.BytesIO(body)))),
+    "scopus.articles": ("papers", lambda body: _scraper("scopus").parse_article_results(json.loads(body))),
+    "scopus.people": ("authors", lambda body: _scraper("scopus").parse_people_results(json.loads(body))),
+    "scholar.authors": ("profiles", lambda body: _scraper("scholar")._parse_profile_page(_scholar_page(body))),
+    "scholar.profile": ("profiles", lambda body: [_scraper("scholar")._parse_profile(_scholar_page(body))]),
+    "scholar.articles": ("papers", lambda body: _scraper("scholar")._parse_article_page(_scholar_page(body))),
+}
+
+
+def _parse_blob(root, entry):
+    # Read and parse one blob, reporting errors instead of raising
+    try:
+        with gzip.open(RawArchive.blob_path(root, entry["digest"]), "rb") as file:
+            body = file.read()
+        return PARSERS[entry["kind"]][1](body), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _parse_blobs(tasks):
+    # Runs in a worker process
+    return [_parse_blob(root, entry) for root, entry in tasks]
+
+
+def default_output_root():
+    """
+    Return a new output directory for a replay: $XAVIER_DATA_DIR/reparsed/<UTC time>.
+    """
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S")
+    return os.path.join(_data_dir(), "reparsed", stamp)
+
+
+def reparse(archive=None, store=None, kinds=None, since=None, until=None, workers=None, batch_size=10000):
+    """
+    Parse archived bodies with the current parsers and write the records to a store.
+
+    Parameters:
+    - archive: RawArchive to read (defaults to the shared one)
+    - store: ParquetStore to write to (default: a new one under default_output_root()); pass
+      False for a dry run. It should not be the crawl store, whose partitions already hold
+      the original parses of the same bodies
+    - kinds: Parser kinds to replay (default: all of PARSERS)
+    - since, until: Only bodies fetched in this inclusive date range (YYYY-MM-DD, UTC)
+    - workers: Number of worker processes (default: one per core)
+    - batch_size: Records buffered per store partition before a file is written
+
+    Returns:
+    - A dict of kind -> {"bodies", "records", "errors"}
+    """
+    archive = archive or get_default_archive()
+    store = ParquetStore(default_output_root()) if store is None else store
+    entries, seen = [], set()
+    # The same body fetched again is archived under the same digest: parse it once, at its first fetch
+    for entry in archive.entries(kinds=list(kinds or PARSERS), since=since, until=until):
+        if entry["kind"] in PARSERS and entry["digest"] not in seen:
+            seen.add(entry["digest"])
+            entries.append(entry)
+
+    report = {}
+    buffers = {}
+
+    def flush(key):
+        store_kind, source, day = key
+        store.append(store_kind, source, buffers.pop(key), harvest_date=day)
+
+    tasks = ((archive.root, entry) for entry in entries)
+    for chunk, results in map_chunks(_parse_blobs, tasks, 16, workers=workers):
+        for (_, entry), (records, error) in zip(chunk, results):
+            counts = report.setdefault(entry["kind"], {"bodies": 0, "records": 0, "errors": 0})
+            counts["bodies"] += 1
+            if error:
+                counts["errors"] += 1
+                print(f"Failed to parse {entry['digest']} ({entry['kind']}, {entry['url']}): {error}")
+                continue
+            counts["records"] += len(records)
+            if not store or not records:
+                continue
+            day = datetime.datetime.fromtimestamp(entry["fetched_at"], datetime.timezone.utc).date().isoformat()
+            key = (PARSERS[entry["kind"]][0], entry["source"], day)
+            buffers.setdefault(key, []).extend(records)
+            if len(buffers[key]) >= batch_size:
+                flush(key)
+    for key in list(buffers):
+        flush(key)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--kind", action="append", choices=sorted(PARSERS), help="Parser kind to replay (repeatable)")
+    parser.add_argument("--since", help="First fetch date to replay (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Last fetch date to replay (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--out", help="Root of the record store to write (default: a new "
+                                          "$XAVIER_DATA_DIR/reparsed/<UTC time> directory); must be empty")
+    parser.add_argument("--dry-run", action="store_true", help="Parse without writing any records")
+    args = parser.parse_args(argv)
+
+    store = False
+    if not args.dry_run:
+        root = args.out or default_output_root()
+        # Replaying twice into one root would store every record twice
+        if os.path.isdir(root) and os.listdir(root):
+            parser.error(f"{root} is not empty; pass a new --out directory")
+        store = ParquetStore(root)
+    report = reparse(store=store, kinds=args.kind, since=args.since, until=args.until, workers=args.workers)
+    if store:
+        print(f"Records written to {store.root}")
+    for kind, counts in sorted(report.items()):
+        print(f"{kind:<18} {counts['bodies']:>8} bodies {counts['records']:>10} records {counts['errors']:>6} errors")
+
+
+if __name__ == "__main__":
+    main()